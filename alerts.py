@@ -0,0 +1,221 @@
+"""
+Scan Alerts - Diff Engine & Sinks
+Compares consecutive snapshots of a screener (keyed on Ticker) and emits
+only the changes: new entries, decision changes, score jumps and new
+reason tags (e.g. VolSpike)
+"""
+
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+SCORE_JUMP = 2.0  # Minimum |score change| reported as SCORE_JUMP
+REASON_COLUMNS = ['Reasons', 'ReasonCodes']
+
+# Alert types
+NEW = "NEW"
+DROPPED = "DROPPED"
+DECISION = "DECISION"
+SCORE_JUMP_ALERT = "SCORE_JUMP"
+REASON = "REASON"
+
+# ========================================
+# DIFF
+# ========================================
+
+def _reason_tags(text):
+    if not isinstance(text, str):
+        return set()
+    return {t.strip() for t in text.replace(';', ',').replace('|', ',').split(',') if t.strip()}
+
+def diff_scans(prev, curr, score_col='Score', score_jump=SCORE_JUMP, include_dropped=False):
+    """
+    Changes between two result tables of the same screener
+
+    Args:
+        prev, curr: result DataFrames (prev may be None / empty)
+        score_col: column compared for score jumps
+        score_jump: minimum absolute change reported
+        include_dropped: also report tickers that left the result
+
+    Returns:
+        DataFrame with columns Ticker, Type, Old, New, Score (one row per
+        change, in curr order)
+    """
+    columns = ['Ticker', 'Type', 'Old', 'New', 'Score']
+    if curr is None or curr.empty or 'Ticker' not in curr.columns:
+        return pd.DataFrame(columns=columns)
+    if prev is None or prev.empty or 'Ticker' not in prev.columns:
+        prev = pd.DataFrame(columns=['Ticker'])
+
+    tracked = [c for c in [score_col, 'Decision'] + REASON_COLUMNS if c in curr.columns]
+    curr_cols = curr[['Ticker'] + tracked].drop_duplicates('Ticker')
+    prev_cols = prev[['Ticker'] + [c for c in tracked if c in prev.columns]].drop_duplicates('Ticker')
+    merged = curr_cols.merge(prev_cols, on='Ticker', how='outer', suffixes=('', '_prev'), indicator=True)
+
+    score = merged[score_col] if score_col in merged.columns else pd.Series(np.nan, index=merged.index)
+    is_new = (merged['_merge'] == 'left_only').to_numpy()
+    is_both = (merged['_merge'] == 'both').to_numpy()
+    parts = []
+
+    def emit(mask, kind, old, new):
+        if mask.any():
+            parts.append(pd.DataFrame({
+                'Ticker': merged['Ticker'].to_numpy()[mask],
+                'Type': kind,
+                'Old': np.asarray(old, dtype=object)[mask],
+                'New': np.asarray(new, dtype=object)[mask],
+                'Score': score.to_numpy()[mask],
+            }))
+
+    emit(is_new, NEW, np.full(len(merged), None), merged.get('Decision', score))
+
+    if include_dropped:
+        is_dropped = (merged['_merge'] == 'right_only').to_numpy()
+        emit(is_dropped, DROPPED, merged.get('Decision_prev', merged.get(f'{score_col}_prev', score)),
+             np.full(len(merged), None))
+
+    if 'Decision' in merged.columns and 'Decision_prev' in merged.columns:
+        old, new = merged['Decision_prev'].astype(str), merged['Decision'].astype(str)
+        emit(is_both & (old != new).to_numpy(), DECISION, old, new)
+
+    if score_col in merged.columns and f'{score_col}_prev' in merged.columns:
+        old = pd.to_numeric(merged[f'{score_col}_prev'], errors='coerce')
+        new = pd.to_numeric(merged[score_col], errors='coerce')
+        emit(is_both & ((new - old).abs() >= score_jump).to_numpy(), SCORE_JUMP_ALERT, old, new)
+
+    # Reason tags: only rows whose reason text changed are tokenized
+    for col in REASON_COLUMNS:
+        if col not in merged.columns or f'{col}_prev' not in merged.columns:
+            continue
+        changed = is_both & (merged[col].astype(str) != merged[f'{col}_prev'].astype(str)).to_numpy()
+        added = np.full(len(merged), None, dtype=object)
+        for i in np.flatnonzero(changed):
+            tags = _reason_tags(merged[col].iat[i]) - _reason_tags(merged[f'{col}_prev'].iat[i])
+            if tags:
+                added[i] = ", ".join(sorted(tags))
+        emit(changed & (added != None), REASON, np.full(len(merged), None), added)  # noqa: E711
+
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    out = pd.concat(parts, ignore_index=True)
+    order = {t: i for i, t in enumerate(curr['Ticker'])}
+    out['_order'] = out['Ticker'].map(order).fillna(len(order))
+    return out.sort_values(['_order', 'Type'], kind='stable').drop(columns='_order').reset_index(drop=True)
+
+def to_alerts(screener_key, changes):
+    """Change rows -> list of alert dicts ready for sinks"""
+    stamp = datetime.now().isoformat(timespec='seconds')
+    alerts = []
+    for ticker, kind, old, new, score in changes[['Ticker', 'Type', 'Old', 'New', 'Score']].itertuples(index=False):
+        alerts.append({
+            "screener": screener_key,
+            "ticker": ticker,
+            "type": kind,
+            "old": None if pd.isna(old) else old,
+            "new": None if pd.isna(new) else new,
+            "score": None if pd.isna(score) else float(score),
+            "time": stamp,
+        })
+    return alerts
+
+# ========================================
+# SINKS (callables taking a list of alert dicts)
+# ========================================
+
+def format_alert(alert):
+    if alert['type'] == NEW:
+        return f"[{alert['screener']}] NEW {alert['ticker']} ({alert['new']}, score {alert['score']})"
+    if alert['type'] == REASON:
+        return f"[{alert['screener']}] {alert['ticker']} + {alert['new']}"
+    return f"[{alert['screener']}] {alert['type']} {alert['ticker']}: {alert['old']} -> {alert['new']}"
+
+def stdout_sink(alerts):
+    for alert in alerts:
+        print(f"[ALERT] {format_alert(alert)}")
+
+def file_sink(path):
+    """Append alerts as JSON lines to path"""
+    def sink(alerts):
+        with open(path, 'a', encoding='utf-8') as f:
+            for alert in alerts:
+                f.write(json.dumps(alert, default=str) + "\n")
+    return sink
+
+def webhook_sink(url, timeout=5):
+    """POST {"alerts": [...]} as JSON to url"""
+    def sink(alerts):
+        import urllib.request
+        body = json.dumps({"alerts": alerts}, default=str).encode('utf-8')
+        req = urllib.request.Request(url, data=body, method='POST',
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+    return sink
+
+def mock_webhook_sink():
+    """Local stand-in for webhook_sink; payloads are kept in sink.sent"""
+    def sink(alerts):
+        sink.sent.append(json.loads(json.dumps({"alerts": alerts}, default=str)))
+    sink.sent = []
+    return sink
+
+def dispatch(alerts, sinks):
+    """Send alerts to every sink; a failing sink does not block the others"""
+    if not alerts:
+        return
+    for sink in sinks:
+        try:
+            sink(alerts)
+        except Exception as e:
+            print(f"[WARN] Alert sink {getattr(sink, '__name__', sink)} failed: {e}")
+
+# ========================================
+# SNAPSHOT HOOK
+# ========================================
+
+_sinks = []
+_history = []
+ALERT_HISTORY = 500
+
+def _on_snapshot(screener_key, prev, curr):
+    from scan_store import snapshot_frame
+    if prev is None:
+        return  # first snapshot in this process: nothing to compare against
+    changes = diff_scans(snapshot_frame(prev), snapshot_frame(curr))
+    alerts = to_alerts(screener_key, changes)
+    if alerts:
+        _history.extend(alerts)
+        del _history[:-ALERT_HISTORY]
+        dispatch(alerts, _sinks)
+
+def enable_alerts(*sinks):
+    """
+    Diff every new scan_store snapshot against the previous one and send
+    the changes to sinks (stdout_sink if none given)
+    """
+    import scan_store
+    _sinks[:] = list(sinks) or [stdout_sink]
+    scan_store.add_listener(_on_snapshot)
+
+def recent_alerts(screener_key=None, limit=50):
+    """Most recent alerts (newest last), optionally for one screener"""
+    items = [a for a in _history if screener_key is None or a['screener'] == screener_key]
+    return items[-limit:]
+
+if __name__ == "__main__":
+    import sys
+    from scan_store import get_snapshot
+    from screener_wrappers import run_screener
+
+    key = sys.argv[1] if len(sys.argv) > 1 else 'intraday_momentum'
+    interval = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    get_snapshot(key)  # seed from the latest CSV so the first scan only reports changes
+    enable_alerts(stdout_sink, file_sink(f"alerts_{key}.jsonl"))
+    print(f"Watching {key} every {interval}s (Ctrl+C to stop)")
+    while True:
+        run_screener(key)
+        time.sleep(interval)
@@ -0,0 +1,315 @@
+"""
+Scan History Analytical Store (SQLite)
+Daily scan snapshots (score, decision, features) for every screener,
+closing prices and materialized forward returns, with indexed queries
+such as "hit rate of READY names over the next 5 days last quarter"
+"""
+
+import io
+import os
+import sqlite3
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "screener_history.db")
+HORIZONS = (1, 3, 5, 10)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    screener   TEXT NOT NULL,
+    scan_date  TEXT NOT NULL,
+    ticker     TEXT NOT NULL,
+    score      REAL,
+    decision   TEXT,
+    features   TEXT,
+    PRIMARY KEY (screener, scan_date, ticker)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_scans_decision ON scans (screener, decision, scan_date);
+CREATE INDEX IF NOT EXISTS idx_scans_ticker ON scans (ticker, scan_date);
+
+CREATE TABLE IF NOT EXISTS prices (
+    ticker  TEXT NOT NULL,
+    date    TEXT NOT NULL,
+    close   REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS forward_returns (
+    ticker  TEXT NOT NULL,
+    date    TEXT NOT NULL,
+    fwd_1   REAL,
+    fwd_3   REAL,
+    fwd_5   REAL,
+    fwd_10  REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+"""
+
+# ========================================
+# CONNECTION
+# ========================================
+
+def connect(path=None):
+    """Open the store (creating tables / indexes on first use)"""
+    conn = sqlite3.connect(path or DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+def _ticker_key(ticker):
+    """Store tickers without the .JK suffix (screeners report both forms)"""
+    ticker = str(ticker).strip().upper()
+    return ticker[:-3] if ticker.endswith(".JK") else ticker
+
+# ========================================
+# BULK INSERT
+# ========================================
+
+def record_scan(screener_key, df, scan_date=None, path=None):
+    """
+    Insert (or replace) one screener's results for a session date
+
+    Score and Decision get their own columns; every other column is kept
+    as a JSON feature snapshot.
+    """
+    if df is None or df.empty or 'Ticker' not in df.columns:
+        return 0
+    if scan_date is None:
+        from idx_calendar import session_date
+        scan_date = session_date()
+    scan_date = str(pd.Timestamp(scan_date).date())
+
+    score = pd.to_numeric(df['Score'], errors='coerce') if 'Score' in df.columns else pd.Series(np.nan, index=df.index)
+    decision = df['Decision'].astype(str) if 'Decision' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    features = df.drop(columns=[c for c in ['Ticker', 'Score', 'Decision'] if c in df.columns])
+    feature_json = features.to_json(orient='records', lines=True).splitlines() if not features.empty \
+        else ["{}"] * len(df)
+
+    rows = list(zip(
+        [screener_key] * len(df),
+        [scan_date] * len(df),
+        df['Ticker'].map(_ticker_key),
+        score.astype(object).where(score.notna(), None),
+        decision.where(decision.notna(), None),
+        feature_json,
+    ))
+    with connect(path) as conn:
+        conn.executemany("INSERT OR REPLACE INTO scans VALUES (?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+def record_prices(close, path=None):
+    """
+    Insert closing prices from a wide frame (index = dates, columns = tickers)
+    and rebuild forward returns for those tickers
+    """
+    if close is None or close.empty:
+        return 0
+    index = pd.DatetimeIndex(close.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    dates = index.strftime('%Y-%m-%d').to_numpy()
+    tickers = np.array([_ticker_key(c) for c in close.columns], dtype=object)
+    values = close.to_numpy(dtype=float)
+    r, c = np.nonzero(~np.isnan(values))
+
+    with connect(path) as conn:
+        conn.executemany("INSERT OR REPLACE INTO prices (ticker, date, close) VALUES (?, ?, ?)",
+                         zip(tickers[c], dates[r], values[r, c].tolist()))
+        _rebuild_forward_returns(conn, list(tickers))
+    return len(r)
+
+def _rebuild_forward_returns(conn, tickers):
+    """Materialize fwd_N = close[t+N] / close[t] - 1 (trading days) for tickers"""
+    placeholders = ",".join("?" * len(tickers))
+    prices = pd.read_sql_query(
+        f"SELECT ticker, date, close FROM prices WHERE ticker IN ({placeholders})", conn, params=tickers)
+    if prices.empty:
+        return
+    wide = prices.pivot(index='date', columns='ticker', values='close').sort_index()
+    values = wide.to_numpy(dtype=float)
+    r, c = np.nonzero(~np.isnan(values))
+    columns = [wide.index.to_numpy()[r], wide.columns.to_numpy()[c]]
+    for h in HORIZONS:
+        fwd = np.full_like(values, np.nan)
+        if len(values) > h:
+            fwd[:-h] = values[h:] / values[:-h] - 1
+        col = fwd[r, c].astype(object)
+        col[np.isnan(fwd[r, c])] = None
+        columns.append(col)
+    conn.executemany(
+        "INSERT OR REPLACE INTO forward_returns (date, ticker, fwd_1, fwd_3, fwd_5, fwd_10) VALUES (?, ?, ?, ?, ?, ?)",
+        zip(*columns))
+
+def refresh_prices(tickers=None, period="1y", path=None):
+    """Download closes for the universe (one request) and update forward returns"""
+    from market_utils import download_panel
+    if tickers is None:
+        from stock_universe import EXPANDED_UNIVERSE
+        tickers = EXPANDED_UNIVERSE
+    panel = download_panel(tickers, period=period)
+    return record_prices(panel.get('Close'), path=path) if panel else 0
+
+# ========================================
+# PREBUILT QUERIES
+# ========================================
+
+def _check_horizon(horizon):
+    if horizon not in HORIZONS:
+        raise ValueError(f"Horizon must be one of {HORIZONS}")
+
+def _date_filter(start, end):
+    clause, params = "", []
+    if start is not None:
+        clause += " AND s.scan_date >= ?"
+        params.append(str(pd.Timestamp(start).date()))
+    if end is not None:
+        clause += " AND s.scan_date <= ?"
+        params.append(str(pd.Timestamp(end).date()))
+    return clause, params
+
+def query(sql, params=(), path=None):
+    """Run any SQL against the store and return a DataFrame"""
+    with connect(path) as conn:
+        return pd.read_sql_query(sql, conn, params=list(params))
+
+def decision_hit_rate(screener_key, decision="READY", horizon=5, start=None, end=None, path=None):
+    """
+    How often names with a given decision rose over the next N days
+
+    Returns one row: Signals, Hit_Rate_% (forward return > 0), Avg_Ret_%,
+    Worst_% and Best_%, aggregated in SQL over the indexed scans table.
+    """
+    _check_horizon(horizon)
+    clause, params = _date_filter(start, end)
+    sql = f"""
+        SELECT COUNT(f.fwd_{horizon})                                   AS Signals,
+               ROUND(100.0 * AVG(f.fwd_{horizon} > 0), 1)              AS "Hit_Rate_%",
+               ROUND(100.0 * AVG(f.fwd_{horizon}), 2)                  AS "Avg_Ret_%",
+               ROUND(100.0 * MIN(f.fwd_{horizon}), 2)                  AS "Worst_%",
+               ROUND(100.0 * MAX(f.fwd_{horizon}), 2)                  AS "Best_%"
+        FROM scans s
+        JOIN forward_returns f ON f.ticker = s.ticker AND f.date = s.scan_date
+        WHERE s.screener = ? AND s.decision LIKE ? {clause}
+    """
+    return query(sql, [screener_key, f"%{decision}%"] + params, path)
+
+def decision_breakdown(screener_key, horizon=5, start=None, end=None, path=None):
+    """Signals, hit rate and average forward return per decision label"""
+    _check_horizon(horizon)
+    clause, params = _date_filter(start, end)
+    sql = f"""
+        SELECT s.decision                                             AS Decision,
+               COUNT(f.fwd_{horizon})                                 AS Signals,
+               ROUND(100.0 * AVG(f.fwd_{horizon} > 0), 1)            AS "Hit_Rate_%",
+               ROUND(100.0 * AVG(f.fwd_{horizon}), 2)                AS "Avg_Ret_%"
+        FROM scans s
+        JOIN forward_returns f ON f.ticker = s.ticker AND f.date = s.scan_date
+        WHERE s.screener = ? {clause}
+        GROUP BY s.decision
+        ORDER BY "Avg_Ret_%" DESC
+    """
+    return query(sql, [screener_key] + params, path)
+
+def score_history(screener_key, start=None, end=None, path=None):
+    """Score panel (index = scan dates, columns = tickers) for signal analytics"""
+    clause, params = _date_filter(start, end)
+    df = query(f"SELECT scan_date, ticker, score FROM scans s WHERE s.screener = ? {clause}",
+               [screener_key] + params, path)
+    if df.empty:
+        return pd.DataFrame()
+    panel = df.pivot(index='scan_date', columns='ticker', values='score')
+    panel.index = pd.to_datetime(panel.index)
+    return panel.sort_index()
+
+def scan_records(screener_key, start=None, end=None, path=None):
+    """
+    Compact date x ticker history of a screener's scans (see result_records):
+    score, decision and the stored features with text as codes and reasons
+    as a bitmask. None if nothing is stored.
+    """
+    from result_records import history_from_long
+
+    clause, params = _date_filter(start, end)
+    df = query(f"SELECT scan_date, ticker, score, decision, features FROM scans s WHERE s.screener = ? {clause}",
+               [screener_key] + params, path)
+    if df.empty:
+        return None
+    features = pd.read_json(io.StringIO("\n".join(df['features'].fillna("{}"))), lines=True, convert_dates=False)
+    features = features.drop(columns=[c for c in ('Date', 'Ticker', 'Score', 'Decision') if c in features.columns])
+    long = pd.concat([pd.DataFrame({'Date': pd.to_datetime(df['scan_date']), 'Ticker': df['ticker'],
+                                    'Score': df['score'], 'Decision': df['decision']}), features], axis=1)
+    return history_from_long(long)
+
+def price_history(tickers=None, start=None, end=None, path=None):
+    """Close panel (index = dates, columns = tickers) from the store"""
+    sql, params = "SELECT date, ticker, close FROM prices WHERE 1=1", []
+    if tickers is not None:
+        keys = [_ticker_key(t) for t in tickers]
+        sql += f" AND ticker IN ({','.join('?' * len(keys))})"
+        params += keys
+    if start is not None:
+        sql += " AND date >= ?"
+        params.append(str(pd.Timestamp(start).date()))
+    if end is not None:
+        sql += " AND date <= ?"
+        params.append(str(pd.Timestamp(end).date()))
+    df = query(sql, params, path)
+    if df.empty:
+        return pd.DataFrame()
+    panel = df.pivot(index='date', columns='ticker', values='close')
+    panel.index = pd.to_datetime(panel.index)
+    return panel.sort_index()
+
+def ticker_history(ticker, screener_key=None, path=None):
+    """Every stored scan row for one ticker, with forward returns"""
+    sql = """
+        SELECT s.screener, s.scan_date, s.score, s.decision, f.fwd_1, f.fwd_3, f.fwd_5, f.fwd_10
+        FROM scans s
+        LEFT JOIN forward_returns f ON f.ticker = s.ticker AND f.date = s.scan_date
+        WHERE s.ticker = ?
+    """
+    params = [_ticker_key(ticker)]
+    if screener_key is not None:
+        sql += " AND s.screener = ?"
+        params.append(screener_key)
+    return query(sql + " ORDER BY s.scan_date", params, path)
+
+def import_csv_history(screener_key, pattern, path=None):
+    """
+    Backfill scans from the dated CSVs a screener has written
+
+    The session date is taken from the YYYYMMDD part of the file name.
+    """
+    import glob
+    import re
+
+    total = 0
+    for fname in sorted(glob.glob(pattern)):
+        m = re.search(r"(\d{8})", os.path.basename(fname))
+        if not m:
+            continue
+        try:
+            df = pd.read_csv(fname)
+        except Exception as e:
+            print(f"[WARN] {fname}: {e}")
+            continue
+        total += record_scan(screener_key, df, date(int(m.group(1)[:4]), int(m.group(1)[4:6]), int(m.group(1)[6:])), path)
+    return total
+
+if __name__ == "__main__":
+    import sys
+    from screener_wrappers import SCREENER_ITERATORS
+
+    if len(sys.argv) > 1 and sys.argv[1] == "backfill":
+        for key, (_, _, pattern) in SCREENER_ITERATORS.items():
+            print(f"{key}: {import_csv_history(key, pattern)} rows")
+        print(f"prices: {refresh_prices()} rows")
+    else:
+        key = sys.argv[1] if len(sys.argv) > 1 else "idx_swing"
+        t0 = time.perf_counter()
+        print(decision_breakdown(key).to_string())
+        print(f"\nQuery time: {(time.perf_counter() - t0) * 1000:.1f} ms")
@@ -0,0 +1,264 @@
+"""
+Headless Results API
+Serves screener snapshots from scan_store as JSON / CSV / Arrow over HTTP
+(stdlib only) for execution bots and alerting
+
+Endpoints:
+    GET  /screeners                 snapshot summary per screener
+    GET  /results/<key>             latest results; query params: where,
+                                    index, sector, sort, asc, top, format
+                                    (json | csv | arrow)
+    POST /scan/<key>                run a scan (concurrent requests, also
+                                    from the dashboard, share one run);
+                                    query params are per-run config
+                                    overrides, answered with the results
+                                    instead of a new snapshot
+    GET  /scan/<key>                progress of the running scan
+    GET  /config[/<key>]            effective params, overrides and hash
+    POST /config/<key>              JSON {param: value} runtime overrides
+                                    (?persist=1 also writes the config file)
+    DELETE /config/<key>            drop the runtime overrides
+
+Responses carry an ETag derived from the snapshot version; clients that
+send If-None-Match get 304 when nothing changed.
+
+Usage: python api_server.py [--host 127.0.0.1] [--port 8502]
+"""
+
+import argparse
+import json
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import config_store
+import scan_store
+from screener_specs import SPECS
+from screener_wrappers import SCREENER_FUNCTIONS, get_scan_progress, run_screener
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+
+# Module screeners plus keys that exist only as specs (run by the spec engine)
+SCREENER_KEYS = list(SCREENER_FUNCTIONS) + [k for k in SPECS if k not in SCREENER_FUNCTIONS]
+
+# ========================================
+# SERIALIZATION
+# ========================================
+
+def _arrow_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def serialize(df, fmt):
+    """DataFrame -> (bytes, content type)"""
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8"), "text/csv; charset=utf-8"
+    if fmt == "arrow":
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), "application/vnd.apache.arrow.stream"
+    return df.to_json(orient="records").encode("utf-8"), "application/json"
+
+def _snapshot_info(snapshot):
+    return {
+        "rows": snapshot['rows'],
+        "version": snapshot['version'],
+        "saved_at": snapshot['saved_at'],
+        "config": snapshot.get('config'),
+        "fresh": scan_store.is_snapshot_fresh(snapshot),
+        "columns": snapshot['order'],
+    }
+
+def _config_info(screener_key):
+    return {
+        "params": config_store.params(screener_key),
+        "overrides": config_store.get_overrides(screener_key),
+        "hash": config_store.config_hash(screener_key),
+        "schema": config_store.schema(screener_key),
+    }
+
+def _parse_value(text):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return {"true": True, "false": False}.get(text.lower(), text)
+
+# ========================================
+# HANDLER
+# ========================================
+
+class ResultsHandler(BaseHTTPRequestHandler):
+    server_version = "StockSenseAPI/1.0"
+
+    def _send(self, status, body=b"", content_type="application/json", etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != 304:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304 and body:
+            self.wfile.write(body)
+
+    def _send_json(self, status, payload, etag=None):
+        self._send(status, json.dumps(payload).encode("utf-8"), etag=etag)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _not_modified(self, etag):
+        match = self.headers.get("If-None-Match")
+        return match is not None and (match.strip() == "*" or etag in [m.strip() for m in match.split(",")])
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if parts == ["screeners"]:
+            payload = {}
+            for key in SCREENER_KEYS:
+                snapshot = scan_store.get_snapshot(key)
+                payload[key] = _snapshot_info(snapshot) if snapshot else None
+            return self._send_json(200, payload)
+
+        if len(parts) == 2 and parts[0] == "results":
+            return self._get_results(parts[1], params)
+
+        if len(parts) == 2 and parts[0] == "scan":
+            if parts[1] not in SCREENER_KEYS:
+                return self._send_json(404, {"error": f"Unknown screener: {parts[1]}"})
+            progress = get_scan_progress(parts[1])
+            return self._send_json(200, {"running": progress is not None, **(progress or {})})
+
+        if parts and parts[0] == "config" and len(parts) <= 2:
+            keys = parts[1:] or list(SPECS)
+            if any(k not in SPECS for k in keys):
+                return self._send_json(404, {"error": f"No config for {parts[1]}"})
+            return self._send_json(200, {k: _config_info(k) for k in keys})
+
+        self._send_json(404, {"error": f"Unknown path: {url.path}"})
+
+    def _get_results(self, screener_key, params):
+        if screener_key not in SCREENER_KEYS:
+            return self._send_json(404, {"error": f"Unknown screener: {screener_key}"})
+        snapshot = scan_store.get_snapshot(screener_key)
+        if snapshot is None:
+            return self._send_json(404, {"error": f"No snapshot for {screener_key}; POST /scan/{screener_key}"})
+
+        fmt = params.get("format", "json")
+        if fmt not in ("json", "csv", "arrow"):
+            return self._send_json(400, {"error": f"Unknown format: {fmt}"})
+        if fmt == "arrow" and not _arrow_available():
+            return self._send_json(406, {"error": "Arrow output requires pyarrow"})
+
+        # Same snapshot + same query -> same body
+        query_key = "&".join(f"{k}={params[k]}" for k in sorted(params))
+        etag = f'"{snapshot["version"]}-{zlib.crc32(query_key.encode()):08x}"'
+        if self._not_modified(etag):
+            return self._send(304, etag=etag)
+
+        try:
+            df = scan_store.query_snapshot(
+                snapshot,
+                where=params.get("where"),
+                index=params["index"].split(",") if params.get("index") else None,
+                sector=params["sector"].split(",") if params.get("sector") else None,
+                sort=params.get("sort"),
+                ascending=params.get("asc", "0") in ("1", "true"),
+                top=int(params["top"]) if params.get("top") else None,
+            )
+        except (KeyError, ValueError) as e:
+            return self._send_json(400, {"error": str(e).strip("'\"")})
+
+        body, content_type = serialize(df, fmt)
+        self._send(200, body, content_type, etag=etag)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if len(parts) == 2 and parts[0] == "config":
+            return self._set_config(parts[1], params)
+        if len(parts) != 2 or parts[0] != "scan":
+            return self._send_json(404, {"error": f"Unknown path: {self.path}"})
+        screener_key = parts[1]
+        if screener_key not in SCREENER_KEYS:
+            return self._send_json(404, {"error": f"Unknown screener: {screener_key}"})
+
+        if params:
+            return self._scan_with_overrides(screener_key, params)
+
+        # Single-flight: joins the running scan if there is one
+        try:
+            df = run_screener(screener_key)
+        except Exception as e:
+            return self._send_json(500, {"error": str(e)})
+        snapshot = scan_store.get_snapshot(screener_key, load_fallback=False)
+        if df.empty or snapshot is None:
+            return self._send_json(502, {"error": f"{screener_key} returned no results"})
+        self._send_json(200, _snapshot_info(snapshot), etag=f'"{snapshot["version"]}"')
+
+    def _scan_with_overrides(self, screener_key, params):
+        fmt = params.pop("format", "json")
+        overrides = {k: _parse_value(v) for k, v in params.items()}
+        try:
+            config_store.validate(screener_key, overrides)
+        except ValueError as e:
+            return self._send_json(400, {"error": str(e)})
+        try:
+            df = run_screener(screener_key, overrides=overrides)
+        except Exception as e:
+            return self._send_json(500, {"error": str(e)})
+        body, content_type = serialize(df, fmt if fmt in ("json", "csv") else "json")
+        self._send(200, body, content_type)
+
+    def _set_config(self, screener_key, params):
+        if screener_key not in SPECS:
+            return self._send_json(404, {"error": f"No config for {screener_key}"})
+        try:
+            config_store.set_overrides(screener_key, self._read_json(),
+                                       persist=params.get("persist", "0") in ("1", "true"))
+        except ValueError as e:
+            return self._send_json(400, {"error": str(e)})
+        self._send_json(200, {screener_key: _config_info(screener_key)})
+
+    def do_DELETE(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if len(parts) != 2 or parts[0] != "config" or parts[1] not in SPECS:
+            return self._send_json(404, {"error": f"Unknown path: {self.path}"})
+        config_store.clear_overrides(parts[1])
+        self._send_json(200, {parts[1]: _config_info(parts[1])})
+
+    def log_message(self, fmt, *args):
+        print(f"[API] {self.address_string()} - {fmt % args}")
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), ResultsHandler)
+    server.daemon_threads = True
+    print(f"[API] Serving screener results on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve screener results over HTTP")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    serve(args.host, args.port)
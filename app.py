@@ -6,8 +6,6 @@
 """
 
 import streamlit as st
-import pandas as pd
-import numpy as np
 from datetime import datetime
 import time
 
@@ -19,7 +17,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Import UI components
+# Import UI components (table helpers, pandas and screener modules load
+# lazily on first scan - see bench_startup.py)
 from ui import (
     inject_global_css,
     hero,
@@ -34,9 +33,7 @@ from ui import (
     empty_state,
     info_box,
     divider,
-    render_table_basic,
-    render_top_picks,
-    download_button
+    breadth_card
 )
 
 # Inject global CSS FIRST
@@ -141,10 +138,11 @@ SCREENER_CONFIG = {
                 **Kenapa Dipilih:**
                 - Kombinasi 3 elemen: Trend + Momentum + Flow
                 - **RS Rating**: Performa vs IHSG (>100 = outperform)
+                - **RS Rank**: Peringkat persentil vs seluruh universe (1-99)
                 - **ATR Stop Loss**: Rekomendasi exit otomatis
                 - Cocok untuk hold mingguan dengan conviction tinggi
                 """,
-                "metrics": ["Score", "Validation", "RS_Rating", "Close", "StopLoss", "Target", "Reasons"],
+                "metrics": ["Score", "Validation", "RS_Rating", "RS_Rank", "Close", "StopLoss", "Target", "Reasons"],
                 "score_col": "Score",
                 "module": "ultimate_screener",
                 "function": "run_ultimate"
@@ -185,44 +183,126 @@ def format_dataframe(df, score_col="Score"):
     
     return df
 
-def run_screener_safely(module_name, function_name):
-    """Run screener with error handling using wrapper module"""
+def select_display_columns(df_display, metrics):
+    """Keep Rank, Ticker and the screener's metric columns (in that order)"""
+    if 'Rank' not in df_display.columns:
+        return df_display
+    display_cols = ['Rank', 'Ticker'] + [c for c in metrics if c in df_display.columns]
+    return df_display[[c for c in display_cols if c in df_display.columns]]
+
+def render_snapshot_query(screener_key, screener):
+    """
+    Filter / sort the latest scan snapshot without re-running the screener
+    (served from scan_store's in-memory cache)
+    """
+    from scan_store import get_snapshot, is_snapshot_fresh, query_snapshot
+    from stock_universe import INDEX_FLAGS
+    from ui import render_table_basic
+    
+    snapshot = get_snapshot(screener_key)
+    if snapshot is None or snapshot['rows'] == 0:
+        return
+    
+    divider()
+    saved = datetime.fromtimestamp(snapshot['saved_at']).strftime("%d/%m %H:%M")
+    section(f"Filter Hasil Terakhir ({snapshot['rows']} saham • {saved})", "🔎")
+    if not is_snapshot_fresh(snapshot):
+        from scan_store import is_config_current
+        if not is_config_current(snapshot):
+            st.caption("⚙️ Parameter screener berubah sejak snapshot ini - jalankan SCAN MARKET untuk menilai ulang.")
+        else:
+            st.caption("⏳ Snapshot ini dari bar sebelumnya - jalankan SCAN MARKET untuk data terbaru.")
+    
+    c1, c2, c3, c4 = st.columns([3, 1, 1, 1])
+    with c1:
+        expr = st.text_input(
+            "Filter",
+            placeholder="contoh: Decision ~ READY & RS_Rating > 120",
+            key=f"q_expr_{screener_key}"
+        )
+    with c2:
+        index_name = st.selectbox("Index", ["Semua"] + list(INDEX_FLAGS), key=f"q_index_{screener_key}")
+    with c3:
+        sort_options = snapshot['order']
+        default_sort = sort_options.index(screener['score_col']) if screener['score_col'] in sort_options else 0
+        sort_col = st.selectbox("Urutkan", sort_options, index=default_sort, key=f"q_sort_{screener_key}")
+    with c4:
+        top_n = st.number_input("Top N", min_value=0, value=0, step=5, key=f"q_top_{screener_key}",
+                                help="0 = semua baris")
+    
+    start = time.perf_counter()
     try:
-        from screener_wrappers import run_screener
-        
-        key_mapping = {
-            'intraday_momentum_screener': 'intraday_momentum',
-            'bsjp_screener': 'bsjp',
-            'idx_swing_screener': 'idx_swing',
-            'vwap_screener_pro': 'vwap_pro',
-            'ultimate_screener': 'ultimate',
-            'smart_money_screener': 'smart_money'
-        }
-        
-        screener_key = key_mapping.get(module_name)
-        
-        if screener_key:
-            result = run_screener(screener_key)
-            if result is not None and not result.empty:
-                return result, None
-            return pd.DataFrame(), "No results found"
-        
-        module = __import__(module_name)
-        func = getattr(module, function_name)
-        result = func()
+        df_q = query_snapshot(
+            snapshot,
+            where=expr,
+            index=None if index_name == "Semua" else index_name,
+            sort=sort_col,
+            top=top_n or None
+        )
+    except (KeyError, ValueError) as e:
+        st.warning(f"Filter tidak valid: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    st.caption(f"{len(df_q)} hasil • {elapsed_ms:.1f} ms")
+    if df_q.empty:
+        empty_state("Tidak ada saham yang cocok dengan filter.", "🔎")
+        return
+    df_q = df_q.copy()
+    df_q.insert(0, 'Rank', range(1, len(df_q) + 1))
+    render_table_basic(select_display_columns(df_q, screener['metrics']), height=400,
+                       key=f"q_page_{screener_key}")
+
+def render_config_editor(screener_key):
+    """
+    Edit the screener's thresholds at runtime (config_store overrides,
+    shared by every session). Market data and indicators stay cached; the
+    next scan only re-scores.
+    """
+    try:
+        import config_store
+        schema = config_store.schema(screener_key)
+    except KeyError:
+        return
+    if not schema:
+        return
+    
+    current = config_store.params(screener_key)
+    changed = config_store.get_overrides(screener_key)
+    label = f"⚙️ Parameter Screener ({len(changed)} diubah)" if changed else "⚙️ Parameter Screener"
+    with st.expander(label):
+        with st.form(f"config_{screener_key}"):
+            values = {}
+            cols = st.columns(2)
+            for i, (name, spec) in enumerate(schema.items()):
+                with cols[i % 2]:
+                    help_text = f"Default: {spec['default']}"
+                    if spec['type'] == 'bool':
+                        values[name] = st.checkbox(name, value=current[name], help=help_text)
+                    elif spec['type'] == 'str':
+                        values[name] = st.text_input(name, value=current[name], help=help_text)
+                    else:
+                        cast = int if spec['type'] == 'int' else float
+                        bounds = {k: cast(spec[b]) for k, b in (('min_value', 'min'), ('max_value', 'max'))
+                                  if spec[b] is not None}
+                        values[name] = st.number_input(name, value=cast(current[name]), help=help_text, **bounds)
+            c1, c2 = st.columns(2)
+            with c1:
+                apply = st.form_submit_button("Terapkan", use_container_width=True)
+            with c2:
+                reset = st.form_submit_button("Reset ke default", use_container_width=True)
         
-        if result is not None and isinstance(result, pd.DataFrame):
-            return result, None
-        else:
-            import glob
-            pattern = f"{module_name.replace('_screener', '')}*.csv"
-            files = glob.glob(pattern)
-            if files:
-                latest = max(files, key=lambda x: x)
-                return pd.read_csv(latest), None
-            return pd.DataFrame(), "No results found"
-    except Exception as e:
-        return pd.DataFrame(), str(e)
+        try:
+            if apply:
+                config_store.set_overrides(
+                    screener_key, {k: v for k, v in values.items() if v != schema[k]['default']})
+                st.success(f"Parameter diterapkan (config {config_store.config_hash(screener_key)}). "
+                           "Jalankan SCAN MARKET untuk menilai ulang.")
+            elif reset:
+                config_store.clear_overrides(screener_key)
+                st.success("Perubahan runtime dihapus; nilai dari screener_config.json tetap berlaku.")
+        except ValueError as e:
+            st.warning(f"Parameter tidak valid: {e}")
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # PAGE COMPONENTS (REFACTORED WITH NEW UI)
@@ -276,6 +356,21 @@ def render_home_page():
     
     divider()
     
+    # Market Internals (breadth across the universe)
+    section("Market Internals", "🌡️")
+    
+    if st.button("📊 Hitung Market Breadth", key="load_breadth"):
+        with st.spinner("Menghitung breadth seluruh universe..."):
+            from market_breadth import get_breadth_regime
+            st.session_state['breadth_info'] = get_breadth_regime()
+    
+    if 'breadth_info' in st.session_state:
+        breadth_card(st.session_state['breadth_info'])
+    else:
+        info_box("Klik tombol di atas untuk melihat % saham di atas EMA20/50/200, A/D line, new highs/lows dan up/down volume.", "🌡️")
+    
+    divider()
+    
     # Usage Tips
     section("Tips Penggunaan", "💡")
     
@@ -345,6 +440,15 @@ def render_screener_page(category_key, screener_key):
     
     st.markdown("</div>", unsafe_allow_html=True)
     
+    render_config_editor(screener_key)
+    diversify_picks = st.checkbox(
+        "🧩 Diversifikasi Top Picks",
+        value=True,
+        key=f"diversify_{screener_key}",
+        help="Lewati kandidat yang berkorelasi tinggi (return harian 60 hari) dengan pick sebelumnya, "
+             "agar Top Picks tidak diisi saham yang bergerak bersama (mis. lima bank)."
+    )
+    
     # Scan Button
     st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
     
@@ -356,116 +460,165 @@ def render_screener_page(category_key, screener_key):
             use_container_width=True
         )
     
-    # Results Section
+    # Results Section (kept in session_state so reruns, e.g. paging the table, still show them)
+    result_key = f"scan_result_{screener_key}"
     if scan_button:
-        with st.spinner(f"Scanning {screener['name']}... Mohon tunggu."):
-            start_time = time.time()
-            
-            df, error = run_screener_safely(screener['module'], screener['function'])
-            
-            elapsed = time.time() - start_time
+        from ui import render_table_basic, render_top_picks
+        from screener_wrappers import iter_screener_shared
+        
+        start_time = time.time()
+        
+        # Stream partial results into placeholders while the scan runs
+        progress_ph = st.empty()
+        picks_ph = st.empty()
+        table_ph = st.empty()
+        
+        # Sessions that click while the same scan is running join it
+        df, error, stale = None, None, False
+        for progress in iter_screener_shared(screener_key):
+            df = progress['results']
+            error = progress.get('error')
+            stale = progress.get('stale', False)
+            if progress.get('final'):
+                break
             
+            total = max(progress['total'], 1)
+            joined = " (scan bersama)" if progress.get('shared') else ""
+            progress_ph.progress(
+                min(progress['done'] / total, 1.0),
+                text=f"Scanning {screener['name']}{joined}... {progress['done']}/{progress['total']} saham • {len(df)} kandidat"
+            )
+            if not df.empty:
+                with picks_ph.container():
+                    render_top_picks(df, top_n=5)
+                with table_ph.container():
+                    df_partial = format_dataframe(df, screener['score_col'])
+                    render_table_basic(select_display_columns(df_partial, screener['metrics']), height=450)
+        
+        progress_ph.empty()
+        picks_ph.empty()
+        table_ph.empty()
+        
+        st.session_state[result_key] = {
+            'df': df, 'error': error, 'stale': stale, 'elapsed': time.time() - start_time
+        }
+    
+    result = st.session_state.get(result_key)
+    if result is not None:
+        from ui import render_table_basic, render_top_picks, download_button
+        df, error, stale, elapsed = result['df'], result['error'], result['stale'], result['elapsed']
+        
+        if df is None or df.empty:
             if error:
                 st.error(f"❌ Error: {error}")
                 info_box("Pastikan koneksi internet stabil dan coba lagi.", "💡")
-            elif df.empty:
-                empty_state("Tidak ada hasil yang memenuhi kriteria screener.", "📭")
             else:
-                # Success message
-                st.markdown(f"""
-                <div class="tx-badge tx-badge-ready" style="margin: 1rem 0;">
-                    ✓ Scan selesai dalam {elapsed:.1f}s • {len(df)} kandidat ditemukan
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Format dataframe
-                df_display = format_dataframe(df, screener['score_col'])
-                
-                # Metrics Summary
-                st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
-                
-                m1, m2, m3, m4 = st.columns(4)
-                with m1:
-                    st.metric("Total Kandidat", len(df))
-                with m2:
-                    if screener['score_col'] in df.columns:
-                        avg_score = df[screener['score_col']].mean()
-                        st.metric("Avg Score", f"{avg_score:.1f}")
-                with m3:
-                    if 'Ticker' in df.columns:
-                        st.metric("Top Pick", df.iloc[0]['Ticker'])
-                with m4:
-                    if 'Decision' in df.columns:
-                        ready_count = len(df[df['Decision'].astype(str).str.contains('READY', na=False)])
-                        st.metric("READY", ready_count)
-                
-                divider()
-                
-                # Top Picks
-                render_top_picks(df, top_n=5)
-                
-                # Results Table
-                results_header(len(df), "READY")
-                
-                # Filter columns
-                display_cols = ['Rank', 'Ticker'] + [c for c in screener['metrics'] if c in df_display.columns]
-                if 'Rank' in df_display.columns:
-                    df_final = df_display[[c for c in display_cols if c in df_display.columns]]
-                else:
-                    df_final = df_display
-                
-                render_table_basic(df_final, height=450)
-                
-                # Download Button
-                st.markdown("<div style='height: 0.5rem;'></div>", unsafe_allow_html=True)
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                download_button(df_display, f"{screener_key}_results_{timestamp}.csv")
-                
-                divider()
-                
-                # Interpretation Guide
-                section("Cara Baca Hasil", "🎯")
-                
-                if screener_key == "intraday_momentum":
-                    info_box("""
-                    <strong>Fokus pada:</strong><br>
-                    • <strong>READY</strong> = Siap entry, semua kondisi terpenuhi<br>
-                    • <strong>RVOL > 1.5</strong> = Volume sangat kuat<br>
-                    • <strong>RSI < 80</strong> = Belum overbought<br>
-                    • <strong>Top 5 Score</strong> = Prioritas utama untuk dieksekusi
-                    """, "📌")
-                elif screener_key == "bsjp":
-                    info_box("""
-                    <strong>Fokus pada:</strong><br>
-                    • <strong>Change% > 3%</strong> = Momentum sangat kuat<br>
-                    • <strong>Rel_Vol > 2.0</strong> = Volume explosion<br>
-                    • <strong>Hammer</strong> = Sinyal reversal bullish<br>
-                    • <strong>EMA_Flow</strong> = Trending positif
-                    """, "📌")
-                elif screener_key in ["idx_swing", "vwap_pro"]:
-                    info_box("""
-                    <strong>Fokus pada:</strong><br>
-                    • <strong>Decision = READY</strong> = Semua kriteria terpenuhi<br>
-                    • <strong>CloseLocation > 0.7</strong> = Tutup kuat di upper range<br>
-                    • <strong>Rel_Vol > 1.2</strong> = Ada partisipasi volume<br>
-                    • <strong>TrendOK = True</strong> = Struktur uptrend valid
-                    """, "📌")
-                elif screener_key == "ultimate":
-                    info_box("""
-                    <strong>Fokus pada:</strong><br>
-                    • <strong>RS_Rating > 100</strong> = Outperform IHSG<br>
-                    • <strong>StopLoss & Target</strong> = Risk management otomatis<br>
-                    • <strong>Uptrend + MoneyIn</strong> di Reasons = Setup ideal<br>
-                    • <strong>Validation > 70</strong> = High conviction
-                    """, "📌")
-                elif screener_key == "smart_money":
-                    info_box("""
-                    <strong>Fokus pada:</strong><br>
-                    • <strong>OBV_Signal = BULLISH</strong> = Divergence terdeteksi<br>
-                    • <strong>CMF > 0.10</strong> = Strong accumulation<br>
-                    • <strong>VolSpike</strong> di Reasons = Institutional buying<br>
-                    • <strong>StopLoss</strong> = Gunakan untuk risk management
-                    """, "📌")
+                empty_state("Tidak ada hasil yang memenuhi kriteria screener.", "📭")
+        else:
+            if stale:
+                info_box(f"Scan yang sedang berjalan belum selesai ({error}). Menampilkan snapshot terakhir.", "⏳")
+            
+            # Success message
+            st.markdown(f"""
+            <div class="tx-badge tx-badge-ready" style="margin: 1rem 0;">
+                ✓ Scan selesai dalam {elapsed:.1f}s • {len(df)} kandidat ditemukan
+            </div>
+            """, unsafe_allow_html=True)
+            
+            # Format dataframe
+            df_display = format_dataframe(df, screener['score_col'])
+            
+            # Metrics Summary
+            st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
+            
+            m1, m2, m3, m4 = st.columns(4)
+            with m1:
+                st.metric("Total Kandidat", len(df))
+            with m2:
+                if screener['score_col'] in df.columns:
+                    avg_score = df[screener['score_col']].mean()
+                    st.metric("Avg Score", f"{avg_score:.1f}")
+            with m3:
+                if 'Ticker' in df.columns:
+                    st.metric("Top Pick", df.iloc[0]['Ticker'])
+            with m4:
+                if 'Decision' in df.columns:
+                    ready_count = len(df[df['Decision'].astype(str).str.contains('READY', na=False)])
+                    st.metric("READY", ready_count)
+            
+            divider()
+            
+            # Top Picks
+            picks = df
+            if diversify_picks:
+                try:
+                    from correlation_engine import diversify
+                    picks = diversify(df, n=5)
+                except Exception as e:
+                    print(f"[WARN] Diversified picks failed: {e}")
+            render_top_picks(picks, top_n=5)
+            
+            # Results Table
+            results_header(len(df), "READY")
+            
+            # Filter columns
+            df_final = select_display_columns(df_display, screener['metrics'])
+            
+            render_table_basic(df_final, height=450, key=f"page_{screener_key}")
+            
+            # Download Button
+            st.markdown("<div style='height: 0.5rem;'></div>", unsafe_allow_html=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            download_button(df_display, f"{screener_key}_results_{timestamp}.csv")
+            
+            divider()
+            
+            # Interpretation Guide
+            section("Cara Baca Hasil", "🎯")
+            
+            if screener_key == "intraday_momentum":
+                info_box("""
+                <strong>Fokus pada:</strong><br>
+                • <strong>READY</strong> = Siap entry, semua kondisi terpenuhi<br>
+                • <strong>RVOL > 1.5</strong> = Volume sangat kuat<br>
+                • <strong>RSI < 80</strong> = Belum overbought<br>
+                • <strong>Top 5 Score</strong> = Prioritas utama untuk dieksekusi
+                """, "📌")
+            elif screener_key == "bsjp":
+                info_box("""
+                <strong>Fokus pada:</strong><br>
+                • <strong>Change% > 3%</strong> = Momentum sangat kuat<br>
+                • <strong>Rel_Vol > 2.0</strong> = Volume explosion<br>
+                • <strong>Hammer</strong> = Sinyal reversal bullish<br>
+                • <strong>EMA_Flow</strong> = Trending positif
+                """, "📌")
+            elif screener_key in ["idx_swing", "vwap_pro"]:
+                info_box("""
+                <strong>Fokus pada:</strong><br>
+                • <strong>Decision = READY</strong> = Semua kriteria terpenuhi<br>
+                • <strong>CloseLocation > 0.7</strong> = Tutup kuat di upper range<br>
+                • <strong>Rel_Vol > 1.2</strong> = Ada partisipasi volume<br>
+                • <strong>TrendOK = True</strong> = Struktur uptrend valid
+                """, "📌")
+            elif screener_key == "ultimate":
+                info_box("""
+                <strong>Fokus pada:</strong><br>
+                • <strong>RS_Rating > 100</strong> = Outperform IHSG<br>
+                • <strong>StopLoss & Target</strong> = Risk management otomatis<br>
+                • <strong>Uptrend + MoneyIn</strong> di Reasons = Setup ideal<br>
+                • <strong>Validation > 70</strong> = High conviction
+                """, "📌")
+            elif screener_key == "smart_money":
+                info_box("""
+                <strong>Fokus pada:</strong><br>
+                • <strong>OBV_Signal = BULLISH</strong> = Divergence terdeteksi<br>
+                • <strong>CMF > 0.10</strong> = Strong accumulation<br>
+                • <strong>VolSpike</strong> di Reasons = Institutional buying<br>
+                • <strong>StopLoss</strong> = Gunakan untuk risk management
+                """, "📌")
+    
+    # Slice the latest snapshot (no new scan)
+    render_snapshot_query(screener_key, screener)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # MAIN APP
@@ -0,0 +1,211 @@
+"""
+Multi-Timeframe Bar Aggregation
+One 1m download for the whole universe, resampled to 5m / 15m / 60m and
+to a today-so-far daily bar that is spliced onto the daily history, so
+intraday screens and "real-time" prices need no per-ticker downloads
+"""
+
+import threading
+import time
+
+import pandas as pd
+
+from idx_calendar import WIB, is_fresh
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+TIMEFRAMES = {"1m": None, "5m": "5min", "15m": "15min", "60m": "60min"}
+
+# {'panel': dict of wide 1m frames, 'tickers': set, 'fetched_at': epoch}
+_minute = None
+_lock = threading.Lock()
+
+# ========================================
+# 1M SOURCE
+# ========================================
+
+def load_minute_panel(tickers, refresh=False):
+    """
+    Today's 1m bars for tickers (one request), cached while fresh
+
+    Refetched when a ticker is missing from the cache or the data is older
+    than the intraday TTL during a session (frozen after close, see
+    idx_calendar).
+    """
+    global _minute
+    from market_utils import download_panel
+
+    tickers = list(tickers)
+    with _lock:
+        entry = _minute
+        if not refresh and entry is not None and set(tickers) <= entry['tickers'] \
+                and is_fresh(entry['fetched_at'], "intraday"):
+            return entry['panel']
+        panel = download_panel(tickers, period="1d", interval="1m", validate=False)
+        for field, frame in panel.items():
+            index = frame.index
+            frame.index = index.tz_localize(WIB) if index.tz is None else index.tz_convert(WIB)
+        _minute = {'panel': panel, 'tickers': set(tickers), 'fetched_at': time.time()}
+        return panel
+
+def prefetch_today(tickers):
+    """Load the universe's 1m bars before a scan; screeners fall back to daily bars on failure"""
+    try:
+        load_minute_panel(tickers)
+    except Exception as e:
+        print(f"[WARN] 1m bars unavailable, using daily bars: {e}")
+
+def put_minute_panel(panel, fetched_at=None):
+    """Seed the cache with 1m bars (e.g. loaded from disk or replayed)"""
+    global _minute
+    tickers = set(panel['Close'].columns) if 'Close' in panel else set()
+    with _lock:
+        _minute = {'panel': panel, 'tickers': tickers,
+                   'fetched_at': time.time() if fetched_at is None else fetched_at}
+
+def get_minute_panel():
+    """Cached 1m panel ({} if nothing loaded)"""
+    entry = _minute
+    return {} if entry is None else entry['panel']
+
+# ========================================
+# RESAMPLING (whole panel at once)
+# ========================================
+
+def resample_panel(panel, timeframe="5m"):
+    """
+    Aggregate a 1m panel to 5m / 15m / 60m bars
+
+    Bins are left-labelled on the clock (09:00, 09:05, ...); empty bins
+    such as the lunch break are dropped.
+    """
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Timeframe must be one of {list(TIMEFRAMES)}")
+    if not panel or TIMEFRAMES[timeframe] is None:
+        return panel
+    rule = TIMEFRAMES[timeframe]
+    out = {f: panel[f].resample(rule, label='left', closed='left').agg(AGG[f])
+           for f in FIELDS if f in panel}
+    if 'Volume' in out:
+        # sum() of an all-NaN bin is 0; keep it NaN like the price fields
+        out['Volume'] = out['Volume'].where(out['Close'].notna())
+    keep = out['Close'].notna().any(axis=1)
+    return {f: frame[keep] for f, frame in out.items()}
+
+def daily_from_minutes(panel):
+    """Daily OHLCV per session date from a 1m panel (index = dates)"""
+    if not panel:
+        return {}
+    days = panel['Close'].index.tz_convert(WIB).normalize().tz_localize(None)
+    out = {f: panel[f].groupby(days).agg(AGG[f]) for f in FIELDS if f in panel}
+    if 'Volume' in out:
+        out['Volume'] = out['Volume'].where(out['Close'].notna())
+    return out
+
+def today_bars(panel=None):
+    """
+    Today-so-far bar per ticker: DataFrame indexed by ticker with
+    Open/High/Low/Close/Volume and the session Date
+    """
+    panel = get_minute_panel() if panel is None else panel
+    daily = daily_from_minutes(panel)
+    if not daily or daily['Close'].empty:
+        return pd.DataFrame(columns=FIELDS + ['Date'])
+    last = daily['Close'].index[-1]
+    bars = pd.DataFrame({f: daily[f].loc[last] for f in FIELDS if f in daily})
+    bars['Date'] = last
+    return bars[bars['Close'].notna()]
+
+# ========================================
+# PER-TICKER ACCESS (for the per-ticker screeners)
+# ========================================
+
+_today_cache = {'fetched_at': None, 'bars': None}
+
+def today_bar(ticker):
+    """Today-so-far bar for ticker from the cached 1m panel (None if unavailable)"""
+    entry = _minute
+    if entry is None:
+        return None
+    if _today_cache['fetched_at'] != entry['fetched_at']:
+        _today_cache['bars'] = today_bars(entry['panel'])
+        _today_cache['fetched_at'] = entry['fetched_at']
+    bars = _today_cache['bars']
+    if ticker not in bars.index:
+        return None
+    return bars.loc[ticker]
+
+def intraday_bars(ticker, timeframe="5m"):
+    """One ticker's bars at timeframe from the cached 1m panel (empty if unavailable)"""
+    panel = get_minute_panel()
+    if not panel or ticker not in panel['Close'].columns:
+        return pd.DataFrame(columns=FIELDS)
+    single = {f: panel[f][[ticker]] for f in FIELDS if f in panel}
+    bars = resample_panel(single, timeframe)
+    df = pd.DataFrame({f: bars[f][ticker] for f in bars})
+    return df[df['Close'].notna()]
+
+def splice_today(df, bar):
+    """
+    Daily frame with today's synthetic bar replacing (or appended after)
+    the last row, so indicators see one consistent series
+
+    Returns df unchanged if bar is None or older than the last daily row.
+    """
+    if bar is None or df is None or df.empty:
+        return df
+    day = pd.Timestamp(bar['Date']).normalize()
+    index = df.index
+    last = index[-1].tz_localize(None).normalize() if index.tz is not None else index[-1].normalize()
+    if day < last:
+        return df
+    row = {f: float(bar[f]) for f in FIELDS if f in df.columns and not pd.isna(bar[f])}
+    if day == last:
+        out = df.copy()
+        for f, value in row.items():
+            out.iloc[-1, out.columns.get_loc(f)] = value
+        return out
+    stamp = day.tz_localize(index.tz) if index.tz is not None else day
+    return pd.concat([df, pd.DataFrame([row], index=pd.DatetimeIndex([stamp], name=index.name))])
+
+def splice_today_panel(panel, bars):
+    """
+    Panel version of splice_today: bars (see today_bars) replace or extend
+    the last daily row per ticker; tickers without a bar keep their history
+    """
+    if not panel or bars is None or bars.empty:
+        return panel
+    day = pd.Timestamp(bars['Date'].iloc[0]).normalize()
+    index = panel['Close'].index
+    last = index[-1].tz_localize(None).normalize() if index.tz is not None else index[-1].normalize()
+    if day < last:
+        return panel
+    if day == last:
+        stamp, new_index = index[-1], index
+    else:
+        stamp = day.tz_localize(index.tz) if index.tz is not None else day
+        new_index = index.append(pd.DatetimeIndex([stamp]))
+    out = {}
+    for f, frame in panel.items():
+        frame = frame.reindex(new_index)
+        if f in bars.columns:
+            today = pd.to_numeric(bars[f], errors='coerce').reindex(frame.columns)
+            frame.loc[stamp] = today.where(today.notna(), frame.loc[stamp])
+        out[f] = frame
+    return out
+
+if __name__ == "__main__":
+    import sys
+    from stock_universe import LQ45_TICKERS
+
+    tickers = sys.argv[1:] or LQ45_TICKERS
+    t0 = time.perf_counter()
+    panel = load_minute_panel(tickers)
+    print(f"1m panel: {panel['Close'].shape if panel else 'empty'} in {time.perf_counter() - t0:.1f}s")
+    if panel:
+        for tf in ("5m", "15m", "60m"):
+            t0 = time.perf_counter()
+            bars = resample_panel(panel, tf)
+            print(f"{tf:>4}: {len(bars['Close'])} bars x {bars['Close'].shape[1]} tickers "
+                  f"({(time.perf_counter() - t0) * 1000:.1f} ms)")
+        print(today_bars(panel).head(10).to_string())
@@ -0,0 +1,102 @@
+"""
+Startup Benchmark - measures cold import cost of app.py
+Runs `python -X importtime -c "import app"` in a fresh interpreter and
+reports total time, the slowest top-level imports and any heavy module
+that should only load on first scan.
+
+Usage: python bench_startup.py [--runs 5] [--top 15]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Modules that must NOT be imported before the first scan
+LAZY_MODULES = [
+    "pandas", "numpy", "yfinance", "plotly",
+    "intraday_momentum_screener", "bsjp_screener", "idx_swing_screener",
+    "vwap_screener_pro", "ultimate_screener", "smart_money_screener",
+    "ui.table",
+]
+
+# Imports made by these packages are outside our control (e.g. streamlit
+# probing for plotly to register its theme)
+FRAMEWORK_PACKAGES = ("streamlit",)
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def run_importtime(target="app"):
+    """Import target in a fresh interpreter; returns [(module, self_us, cumulative_us, depth)]"""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # Any value, even "0", disables .pyc writing
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            self_us, cum_us, indent, module = m.groups()
+            rows.append((module, int(self_us), int(cum_us), (len(indent) - 1) // 2))
+    if not rows:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+    return rows
+
+def importers(rows):
+    """Map each module to the top-level import (depth 1) that pulled it in"""
+    owner = {}
+    stack = {}
+    # importtime prints children before their parent, so walk backwards
+    for module, _, _, depth in reversed(rows):
+        stack[depth] = module
+        owner.setdefault(module, stack.get(1, module) if depth >= 1 else module)
+    return owner
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app.py cold import time")
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh interpreters")
+    parser.add_argument("--top", type=int, default=15, help="top-level imports to list")
+    parser.add_argument("--target", default="app", help="module to import")
+    args = parser.parse_args()
+
+    totals = []
+    rows = []
+    for _ in range(args.runs):
+        rows = run_importtime(args.target)
+        target_rows = [r for r in rows if r[0] == args.target]
+        totals.append(target_rows[-1][2] / 1000 if target_rows else 0)
+
+    print(f"{'='*60}")
+    print(f"STARTUP BENCHMARK: import {args.target} ({args.runs} runs)")
+    print(f"{'='*60}")
+    print(f"Median: {statistics.median(totals):>8.1f} ms")
+    print(f"Min:    {min(totals):>8.1f} ms")
+    print(f"Max:    {max(totals):>8.1f} ms")
+
+    # Direct children of the target, by cumulative time (last run)
+    top_level = sorted((r for r in rows if r[3] <= 1 and r[0] != args.target),
+                       key=lambda r: r[2], reverse=True)
+    print(f"\n>> TOP {args.top} IMPORTS (cumulative)")
+    for module, _, cum_us, _ in top_level[:args.top]:
+        print(f"  {module:<40} {cum_us/1000:>8.1f} ms")
+
+    owner = importers(rows)
+    loaded = [m for m in LAZY_MODULES if m in owner]
+    framework = [m for m in loaded if owner[m].split('.')[0] in FRAMEWORK_PACKAGES]
+    eager = [m for m in loaded if m not in framework]
+    print("\n>> LAZY MODULE CHECK")
+    if framework:
+        print(f"[INFO] Pulled in by framework: {', '.join(f'{m} (via {owner[m]})' for m in framework)}")
+    if eager:
+        print(f"[WARN] Imported at startup: {', '.join(f'{m} (via {owner[m]})' for m in eager)}")
+    else:
+        print(f"[OK] None of {len(LAZY_MODULES)} heavy modules imported by our code at startup")
+    return 1 if eager else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,46 +1,37 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import time
-from datetime import datetime
 
 from stock_universe import EXPANDED_UNIVERSE as STOCK_UNIVERSE
+from market_utils import iter_scan, SCAN_CHUNK_SIZE
+from idx_calendar import session_date
+from data_quality import clean_bars, MIN_HEALTH
+from corporate_actions import get_bars
+from bar_resampler import prefetch_today, splice_today, today_bar
+from indicators import compute as compute_indicators
 
 # Settings (RELAXED)
 MIN_PRICE = 50
 MIN_VALUE_IDR = 1_000_000_000  # 1B (lowered from 5B)
 
-def calculate_ema(series, length):
-    return series.ewm(span=length, adjust=False).mean()
-
 def analyze_bsjp(ticker):
     try:
-        df = yf.download(ticker, period="3mo", interval="1d", progress=False)
+        df = get_bars(ticker, period="3mo")
         if len(df) < 20: return None
         
         if isinstance(df.columns, pd.MultiIndex):
             df.columns = [c[0] for c in df.columns]
+        
+        # Validate bars before any indicator math
+        df, health = clean_bars(df, ticker)
+        if health < MIN_HEALTH or len(df) < 20: return None
 
-        # Real-time price from intraday
-        try:
-            df_today = yf.download(ticker, period="1d", interval="1m", progress=False)
-            if not df_today.empty:
-                if isinstance(df_today.columns, pd.MultiIndex):
-                    df_today.columns = [c[0] for c in df_today.columns]
-                current_price = df_today.iloc[-1]['Close']
-                current_volume = df_today['Volume'].sum()
-                current_high = df_today['High'].max()
-                current_low = df_today['Low'].min()
-            else:
-                current_price = df.iloc[-1]['Close']
-                current_volume = df.iloc[-1]['Volume']
-                current_high = df.iloc[-1]['High']
-                current_low = df.iloc[-1]['Low']
-        except:
-            current_price = df.iloc[-1]['Close']
-            current_volume = df.iloc[-1]['Volume']
-            current_high = df.iloc[-1]['High']
-            current_low = df.iloc[-1]['Low']
+        # Real-time: today-so-far bar from the shared 1m panel
+        df = splice_today(df, today_bar(ticker))
+        current_price = df.iloc[-1]['Close']
+        current_volume = df.iloc[-1]['Volume']
+        current_high = df.iloc[-1]['High']
+        current_low = df.iloc[-1]['Low']
 
         prev_row = df.iloc[-2]
         
@@ -53,7 +44,8 @@ def analyze_bsjp(ticker):
         change_pct = (current_price - prev_row['Close']) / prev_row['Close'] * 100
         
         # Volume ratio
-        avg_vol_5 = df['Volume'].rolling(5).mean().iloc[-1]
+        ind = compute_indicators(df, ['Vol_SMA5', 'EMA5', 'EMA20'])
+        avg_vol_5 = ind['Vol_SMA5'].iloc[-1]
         rel_vol = current_volume / avg_vol_5 if avg_vol_5 > 0 else 0
         
         
@@ -71,8 +63,8 @@ def analyze_bsjp(ticker):
             lower_wick_ratio = lower_wick / range_len
         
         # Trend
-        ema5 = calculate_ema(df['Close'], 5).iloc[-1]
-        ema20 = calculate_ema(df['Close'], 20).iloc[-1]
+        ema5 = ind['EMA5'].iloc[-1]
+        ema20 = ind['EMA20'].iloc[-1]
         trend_aligned = (current_price > ema5) and (ema5 > ema20)
         
         # Scoring (ENHANCED)
@@ -117,30 +109,37 @@ def analyze_bsjp(ticker):
         return None
     return None
 
-def run_screener():
+def iter_screener(chunk_size=SCAN_CHUNK_SIZE):
+    """Scan the universe, yielding partial results every chunk_size tickers"""
     print(f"Running BSJP Screener...")
     print(f"Universe: {len(STOCK_UNIVERSE)} stocks")
-    results = []
+    df = pd.DataFrame()
+    
+    # Today's 1m bars for the whole universe in one request (see bar_resampler)
+    prefetch_today(STOCK_UNIVERSE)
     
     start_t = time.time()
-    for i, ticker in enumerate(STOCK_UNIVERSE):
-        print(f"[{i+1}/{len(STOCK_UNIVERSE)}] Scanning {ticker}...", end='\r')
-        res = analyze_bsjp(ticker)
-        if res:
-            results.append(res)
+    for progress in iter_scan(STOCK_UNIVERSE, analyze_bsjp, chunk_size):
+        print(f"[{progress['done']}/{progress['total']}] Scanning {progress['ticker']}...", end='\r')
+        df = progress['results']
+        yield progress
     
     elapsed = time.time() - start_t
     print(f"\nScan completed in {elapsed:.1f}s")
             
-    if results:
-        df = pd.DataFrame(results)
-        df = df.sort_values('Score', ascending=False)
-        fname = f"bsjp_results_{datetime.now().strftime('%Y%m%d')}.csv"
+    if not df.empty:
+        fname = f"bsjp_results_{session_date().strftime('%Y%m%d')}.csv"
         df.to_csv(fname, index=False)
         print(f"Found {len(df)} candidates. Saved to {fname}")
-        return df
-    print("No candidates found.")
-    return pd.DataFrame()
+    else:
+        print("No candidates found.")
+    yield {"done": len(STOCK_UNIVERSE), "total": len(STOCK_UNIVERSE), "results": df, "final": True}
+
+def run_screener():
+    df = pd.DataFrame()
+    for progress in iter_screener():
+        df = progress['results']
+    return df
 
 if __name__ == "__main__":
     run_screener()
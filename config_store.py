@@ -0,0 +1,219 @@
+"""
+Screener Configuration
+Validated, hot-reloadable thresholds for the spec screeners. Each
+screener's @params (defaults in screener_specs, from config_swing and the
+legacy module constants) are layered:
+
+    spec defaults < screener_config.json < runtime overrides < per-run overrides
+
+The JSON file ({"idx_swing": {"REL_VOL": 1.5}, ...}) is re-read when it
+changes, runtime overrides come from the dashboard / API (set_overrides)
+and per-run overrides are passed to a single scan (CLI --set, sweeps).
+Nothing needs a restart, so panels and indicators stay cached.
+
+config_hash fingerprints a screener's effective params: result caches
+(scan_store snapshots, single-flight scans) key on it, data caches do not.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "screener_config.json")
+
+# Allowed range per param name (inclusive; None = open)
+BOUNDS = {
+    'MIN_PRICE': (0, None),
+    'MIN_LIQ': (0, None),
+    'MIN_VALUE': (0, None),
+    'REL_VOL': (0, None),
+    'TRAP_RVOL': (0, None),
+    'CLOSE_LOC': (0, 1),
+    'BODY': (0, 1),
+    'TRAP_WICK': (0, 1),
+    'TRAP_BODY': (0, 1),
+    'DIST_MAX': (0, None),
+    'DIST_LIMIT': (0, None),
+}
+PREFIX_BOUNDS = {'SCORE_': (0, 100)}
+
+_lock = threading.RLock()
+_file = {'path': CONFIG_PATH, 'mtime': None, 'values': {}}
+_runtime = {}  # screener key -> {param: value}
+
+# ========================================
+# SCHEMA & VALIDATION
+# ========================================
+
+def _defaults(screener_key):
+    from screener_specs import SPECS
+    if screener_key not in SPECS:
+        raise KeyError(f"Unknown screener: {screener_key}")
+    return dict(SPECS[screener_key].get('params', {}))
+
+def _bounds(name):
+    if name in BOUNDS:
+        return BOUNDS[name]
+    for prefix, bounds in PREFIX_BOUNDS.items():
+        if name.startswith(prefix):
+            return bounds
+    return (None, None)
+
+def schema(screener_key):
+    """{param: {'type', 'default', 'min', 'max'}}; the type follows the default"""
+    out = {}
+    for name, default in _defaults(screener_key).items():
+        low, high = _bounds(name)
+        kind = bool if isinstance(default, bool) else int if isinstance(default, int) else \
+            float if isinstance(default, float) else str
+        out[name] = {'type': kind.__name__, 'default': default, 'min': low, 'max': high}
+    return out
+
+def _coerce(name, value, spec):
+    kind = spec['type']
+    if kind == 'bool':
+        if not isinstance(value, bool):
+            raise ValueError(f"{name}: expected true/false, got {value!r}")
+        return value
+    if kind == 'str':
+        return str(value)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name}: expected a number, got {value!r}")
+    if kind == 'int':
+        if not float(value).is_integer():
+            raise ValueError(f"{name}: expected an integer, got {value!r}")
+        value = int(value)
+    if spec['min'] is not None and value < spec['min']:
+        raise ValueError(f"{name}: {value} is below the minimum {spec['min']}")
+    if spec['max'] is not None and value > spec['max']:
+        raise ValueError(f"{name}: {value} is above the maximum {spec['max']}")
+    return value
+
+def validate(screener_key, values):
+    """Checked copy of values for screener_key; ValueError lists every problem"""
+    spec, clean, errors = schema(screener_key), {}, []
+    for name, value in (values or {}).items():
+        if name not in spec:
+            errors.append(f"{name}: unknown param (available: {', '.join(sorted(spec))})")
+            continue
+        try:
+            clean[name] = _coerce(name, value, spec[name])
+        except ValueError as e:
+            errors.append(str(e))
+    if errors:
+        raise ValueError(f"{screener_key}: " + "; ".join(errors))
+    return clean
+
+# ========================================
+# LAYERS
+# ========================================
+
+def _file_values():
+    """Overrides from the config file, re-read when its mtime changes"""
+    path = _file['path']
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    with _lock:
+        if mtime == _file['mtime']:
+            return _file['values']
+        values = {}
+        if mtime is not None:
+            try:
+                with open(path, 'r') as f:
+                    raw = json.load(f)
+                values = {key: validate(key, section) for key, section in raw.items()}
+            except Exception as e:
+                # Keep the last good config rather than scanning with half of a bad one
+                print(f"[WARN] Ignoring invalid {path}: {e}")
+                _file['mtime'] = mtime
+                return _file['values']
+        _file.update(mtime=mtime, values=values)
+    return values
+
+def use_file(path):
+    """Read overrides from another JSON file (e.g. per environment)"""
+    with _lock:
+        _file.update(path=path, mtime=None, values={})
+    _file_values()
+
+def reload():
+    """Force a re-read of the config file"""
+    with _lock:
+        _file['mtime'] = None
+    return _file_values()
+
+def params(screener_key, overrides=None):
+    """Effective params for a screener with optional per-run overrides"""
+    out = _defaults(screener_key)
+    out.update(_file_values().get(screener_key, {}))
+    with _lock:
+        out.update(_runtime.get(screener_key, {}))
+    out.update(validate(screener_key, overrides))
+    return out
+
+def set_overrides(screener_key, values, persist=False):
+    """
+    Replace the runtime overrides of a screener (validated); with persist,
+    also replace its section of the config file (empty values remove it)
+    """
+    clean = validate(screener_key, values)
+    with _lock:
+        if clean:
+            _runtime[screener_key] = clean
+        else:
+            _runtime.pop(screener_key, None)
+        if persist:
+            current = dict(_file_values())
+            if clean:
+                current[screener_key] = clean
+            else:
+                current.pop(screener_key, None)
+            with open(_file['path'], 'w') as f:
+                json.dump(current, f, indent=2, sort_keys=True)
+    return params(screener_key)
+
+def clear_overrides(screener_key=None):
+    """Drop runtime overrides (one screener or all)"""
+    with _lock:
+        if screener_key is None:
+            _runtime.clear()
+        else:
+            _runtime.pop(screener_key, None)
+
+def get_overrides(screener_key):
+    """Everything that differs from the spec defaults (file + runtime)"""
+    defaults = _defaults(screener_key)
+    return {k: v for k, v in params(screener_key).items() if defaults.get(k) != v}
+
+def is_customized(screener_key, overrides=None):
+    try:
+        return params(screener_key, overrides) != _defaults(screener_key)
+    except KeyError:
+        return False
+
+# ========================================
+# CACHE KEYS
+# ========================================
+
+def hash_params(values):
+    """Short stable hash of a params dict"""
+    text = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+def config_hash(screener_key, overrides=None):
+    """Hash of the effective params (what a scoring result depends on)"""
+    return hash_params(params(screener_key, overrides))
+
+if __name__ == "__main__":
+    import sys
+    from screener_specs import SPECS
+
+    for key in sys.argv[1:] or list(SPECS):
+        print(f"{key} [{config_hash(key)}]")
+        current = params(key)
+        for name, spec in schema(key).items():
+            mark = "*" if current[name] != spec['default'] else " "
+            print(f"  {mark} {name:<16} {current[name]!r:<16} default={spec['default']!r}")
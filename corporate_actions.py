@@ -0,0 +1,227 @@
+"""
+Corporate Action Adjustment Layer
+One store of as-traded daily bars per ticker plus a compact table of
+split / dividend actions; adjusted views are derived on demand, so every
+screener shares the same download and a new action only touches the
+factor table
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close']
+
+SPLIT = "SPLIT"  # Value = ratio (2.0 for a 2:1 split, 0.1 for a 1:10 reverse split)
+DIVIDEND = "DIV"  # Value = cash per share, as traded on the ex-date
+
+# Views: "none" = as traded, "split" = split-adjusted (yfinance
+# auto_adjust=False), "total" = split + dividend adjusted (auto_adjust=True)
+ADJUSTMENTS = ("none", "split", "total")
+DEFAULT_ADJUST = "total"
+
+# Today's bar is still forming during a session: refetch at most this often
+BAR_REFRESH_SECONDS = 300
+REFRESH_PERIOD = "5d"  # Tail refetched and merged into stored bars
+
+_PERIOD_DAYS = {"5d": 7, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827}
+
+# ticker -> {'bars': DataFrame (as traded), 'period': str, 'fetched_at': epoch}
+_bars = {}
+# Ticker, Date, Type, Value
+_actions = pd.DataFrame({'Ticker': pd.Series(dtype=object), 'Date': pd.Series(dtype='datetime64[ns]'),
+                         'Type': pd.Series(dtype=object), 'Value': pd.Series(dtype=float)})
+_lock = threading.Lock()
+
+# ========================================
+# FACTOR TABLE
+# ========================================
+
+def get_actions(ticker=None):
+    """Corporate action table (all tickers or one)"""
+    if ticker is None:
+        return _actions.copy()
+    return _actions[_actions['Ticker'] == ticker].reset_index(drop=True)
+
+def add_action(ticker, date, kind, value):
+    """
+    Record a split or dividend; stored bars are not touched
+
+    Replaces an existing action of the same type on the same date.
+    """
+    global _actions
+    if kind not in (SPLIT, DIVIDEND):
+        raise ValueError(f"Unknown action type: {kind}")
+    row = pd.DataFrame({'Ticker': [ticker], 'Date': [_naive_day(date)], 'Type': [kind], 'Value': [float(value)]})
+    with _lock:
+        keep = ~((_actions['Ticker'] == ticker) & (_actions['Date'] == row['Date'][0]) & (_actions['Type'] == kind))
+        _actions = pd.concat([_actions[keep], row], ignore_index=True).sort_values(['Ticker', 'Date'], ignore_index=True)
+
+def _naive_day(ts):
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.normalize()
+
+def _split_after(index, actions):
+    """Product of split ratios strictly after each bar date"""
+    days = index.tz_localize(None).normalize() if index.tz is not None else index.normalize()
+    factor = np.ones(len(index))
+    for date, ratio in actions.loc[actions['Type'] == SPLIT, ['Date', 'Value']].itertuples(index=False):
+        factor[days < date] *= ratio
+    return factor
+
+def _dividend_factor(index, close_split_adj, actions, split_after):
+    """Multiplicative dividend adjustment per bar (Yahoo 'Adj Close' convention)"""
+    days = index.tz_localize(None).normalize() if index.tz is not None else index.normalize()
+    factor = np.ones(len(index))
+    close = close_split_adj.to_numpy(dtype=float)
+    for date, cash in actions.loc[actions['Type'] == DIVIDEND, ['Date', 'Value']].itertuples(index=False):
+        pos = days.searchsorted(date)  # first bar on / after the ex-date
+        if pos == 0 or pos >= len(days):
+            continue
+        # Cash is as traded; bring it into split-adjusted terms at the ex-date
+        ratio = split_after[pos]
+        prev_close = close[pos - 1]
+        if prev_close > 0:
+            factor[:pos] *= 1 - (cash / ratio) / prev_close
+    return factor
+
+# ========================================
+# VIEWS
+# ========================================
+
+def adjusted_view(raw, actions, adjust=DEFAULT_ADJUST):
+    """
+    Adjusted copy of as-traded bars
+
+    Args:
+        raw: DataFrame with Open/High/Low/Close/Volume as traded
+        actions: that ticker's rows of the action table
+        adjust: "none", "split" or "total"
+    """
+    if adjust not in ADJUSTMENTS:
+        raise ValueError(f"Unknown adjustment: {adjust}")
+    if adjust == "none" or raw.empty:
+        return raw.copy()
+
+    split_after = _split_after(raw.index, actions)
+    out = raw.copy()
+    out[PRICE_FIELDS] = raw[PRICE_FIELDS].to_numpy(dtype=float) / split_after[:, None]
+    out['Volume'] = raw['Volume'].to_numpy(dtype=float) * split_after
+    if adjust == "total":
+        div = _dividend_factor(raw.index, out['Close'], actions, split_after)
+        out[PRICE_FIELDS] = out[PRICE_FIELDS].to_numpy() * div[:, None]
+    return out
+
+# ========================================
+# STORE
+# ========================================
+
+def _fetch(ticker, period):
+    """Download split-adjusted bars + actions and convert to as-traded"""
+    import yfinance as yf
+
+    hist = yf.Ticker(ticker).history(period=period, interval="1d", auto_adjust=False, actions=True)
+    if hist.empty:
+        return pd.DataFrame(columns=FIELDS), []
+
+    actions = []
+    if 'Stock Splits' in hist.columns:
+        for date, ratio in hist.loc[hist['Stock Splits'] != 0, 'Stock Splits'].items():
+            actions.append((_naive_day(date), SPLIT, float(ratio)))
+    split_rows = pd.DataFrame(actions, columns=['Date', 'Type', 'Value']).assign(Ticker=ticker)
+    split_after = _split_after(hist.index, split_rows)
+
+    # Yahoo prices (and dividends) are split-adjusted; undo that once here
+    raw = hist[FIELDS].astype(float).copy()
+    raw[PRICE_FIELDS] = raw[PRICE_FIELDS].to_numpy() * split_after[:, None]
+    raw['Volume'] = raw['Volume'].to_numpy() / split_after
+
+    if 'Dividends' in hist.columns:
+        divs = hist['Dividends']
+        for pos in np.flatnonzero(divs.to_numpy() != 0):
+            actions.append((_naive_day(hist.index[pos]), DIVIDEND, float(divs.iloc[pos] * split_after[pos])))
+    return raw, actions
+
+def _covers(stored_period, period):
+    return _PERIOD_DAYS[stored_period] >= _PERIOD_DAYS[period]
+
+def _merge_tail(raw, tail):
+    """Stored bars with a refetched tail; None when the tail does not reach them"""
+    if tail.empty:
+        return raw
+    if raw.empty or tail.index[0] > raw.index[-1]:
+        return None
+    return pd.concat([raw[raw.index < tail.index[0]], tail])
+
+def get_bars(ticker, period="1y", adjust=DEFAULT_ADJUST, refresh=False):
+    """
+    Daily bars for ticker in the requested adjustment
+
+    As-traded bars are downloaded once per ticker and refetched in full
+    only when a longer period is requested (or refresh); while the market
+    is open the last REFRESH_PERIOD is refetched every BAR_REFRESH_SECONDS
+    and merged in (frozen after close, see idx_calendar). Every adjustment
+    is a view over the same bars.
+
+    Returns an empty DataFrame if the download fails; raises ValueError
+    for periods outside _PERIOD_DAYS.
+    """
+    from idx_calendar import is_fresh
+
+    if period not in _PERIOD_DAYS:
+        raise ValueError(f"Unknown period: {period} (use one of {', '.join(_PERIOD_DAYS)})")
+
+    entry = _bars.get(ticker)
+    full = refresh or entry is None or not _covers(entry['period'], period)
+    if full or not is_fresh(entry['fetched_at'], "intraday", ttl=BAR_REFRESH_SECONDS):
+        fetch_period = period if entry is None or _covers(period, entry['period']) else entry['period']
+        try:
+            raw = None
+            if not full:
+                tail, actions = _fetch(ticker, REFRESH_PERIOD)
+                raw = _merge_tail(entry['bars'], tail)
+            if raw is None:
+                # Nothing stored yet, or a gap longer than the tail
+                raw, actions = _fetch(ticker, fetch_period)
+        except Exception as e:
+            print(f"[WARN] {ticker} fetch failed: {e}")
+            return pd.DataFrame(columns=FIELDS)
+        entry = {'bars': raw, 'period': fetch_period, 'fetched_at': time.time()}
+        with _lock:
+            _bars[ticker] = entry
+        for date, kind, value in actions:
+            add_action(ticker, date, kind, value)
+
+    raw = entry['bars']
+    if raw.empty:
+        return raw.copy()
+    days = _PERIOD_DAYS.get(period)
+    if days is not None:
+        raw = raw[raw.index >= raw.index[-1] - pd.Timedelta(days=days)]
+    return adjusted_view(raw, get_actions(ticker), adjust)
+
+def put_bars(ticker, raw, period="1y", fetched_at=None):
+    """Seed the store with as-traded bars (e.g. loaded from disk)"""
+    if period not in _PERIOD_DAYS:
+        raise ValueError(f"Unknown period: {period}")
+    with _lock:
+        _bars[ticker] = {'bars': raw[FIELDS].astype(float), 'period': period,
+                         'fetched_at': time.time() if fetched_at is None else fetched_at}
+
+def get_raw_bars(ticker):
+    """Stored as-traded bars (None if the ticker has not been fetched)"""
+    entry = _bars.get(ticker)
+    return None if entry is None else entry['bars']
+
+if __name__ == "__main__":
+    import sys
+    ticker = sys.argv[1] if len(sys.argv) > 1 else "BBCA.JK"
+    for adj in ADJUSTMENTS:
+        df = get_bars(ticker, "1y", adjust=adj)
+        print(f"{adj:>5}: {len(df)} bars, first close {df['Close'].iloc[0]:.2f}, last close {df['Close'].iloc[-1]:.2f}")
+    print(get_actions(ticker).to_string())
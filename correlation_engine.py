@@ -0,0 +1,300 @@
+"""
+Correlation Engine
+Rolling daily-return correlations for the universe and a diversified
+top-N selector, so a strong day for banks does not fill every slot with
+BBCA, BBRI, BMRI, BBNI and BBTN.
+
+The engine keeps the last `window` return rows plus four pairwise running
+sums (Σxy, Σx, Σx², overlap count; NaN-aware like DataFrame.corr). A new
+day is one small (2 x N) update of those sums - the new row in, the row
+leaving the window out - instead of recomputing the N x N matrix from the
+whole window. Correlations are derived from the sums on demand, for the
+full universe or only the candidates being compared.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+CORR_WINDOW = 60  # Trading days of returns
+MIN_PERIODS = 40  # Overlapping returns needed for a pair's correlation
+MAX_CORR = 0.7  # Diversified picks: max correlation with any earlier pick
+CORR_PERIOD = "6mo"  # Daily history loaded for the UI selector
+REBUILD_EVERY = 250  # Incremental updates between exact rebuilds (float drift)
+MAX_ENGINES = 4  # Shared engines kept (one per ticker set / window)
+
+# ========================================
+# ENGINE
+# ========================================
+
+def new_engine(tickers, window=CORR_WINDOW):
+    """Empty engine for a fixed ticker list"""
+    tickers = list(tickers)
+    n = len(tickers)
+    return {
+        'tickers': tickers,
+        'pos': {t: i for i, t in enumerate(tickers)},
+        'window': window,
+        'buf': np.full((window, n), np.nan),  # Ring buffer of return rows
+        'dates': [None] * window,
+        'head': 0,  # Next slot to write
+        'rows': 0,
+        'last_date': None,
+        'updates': 0,
+        'sxy': np.zeros((n, n)),
+        'sx': np.zeros((n, n)),   # [i, j]: Σ x_i over rows where j is present too
+        'sxx': np.zeros((n, n)),  # [i, j]: Σ x_i² over rows where j is present too
+        'cnt': np.zeros((n, n)),
+    }
+
+def _accumulate(engine, rows, signs):
+    """Add (sign +1) / remove (sign -1) return rows from the pairwise sums"""
+    present = ~np.isnan(rows)
+    x = np.where(present, rows, 0.0)
+    m = present.astype(float)
+    xs = x * signs[:, None]
+    engine['sxy'] += xs.T @ x
+    engine['sx'] += xs.T @ m
+    engine['sxx'] += (xs * x).T @ m
+    engine['cnt'] += (m * signs[:, None]).T @ m
+
+def _rebuild(engine):
+    """Exact sums from the buffered rows"""
+    for name in ('sxy', 'sx', 'sxx', 'cnt'):
+        engine[name][:] = 0.0
+    rows = engine['buf'][~np.isnan(engine['buf']).all(axis=1)]
+    if len(rows):
+        _accumulate(engine, rows, np.ones(len(rows)))
+    engine['updates'] = 0
+
+def push(engine, date, row):
+    """
+    Append one day of returns (array aligned to engine['tickers']); the
+    oldest day leaves the window once it is full. Re-pushing the last date
+    (today's bar revised intraday) replaces that row.
+    """
+    row = np.asarray(row, dtype=float)
+    window = engine['window']
+    if engine['last_date'] is not None and date == engine['last_date']:
+        slot = (engine['head'] - 1) % window
+        if np.array_equal(row, engine['buf'][slot], equal_nan=True):
+            return
+        _accumulate(engine, np.vstack([row, engine['buf'][slot]]), np.array([1.0, -1.0]))
+    else:
+        slot = engine['head']
+        if engine['rows'] == window:
+            _accumulate(engine, np.vstack([row, engine['buf'][slot]]), np.array([1.0, -1.0]))
+        else:
+            _accumulate(engine, row[None, :], np.ones(1))
+            engine['rows'] += 1
+        engine['head'] = (slot + 1) % window
+    engine['buf'][slot] = row
+    engine['dates'][slot] = date
+    engine['last_date'] = date
+    engine['updates'] += 1
+    if engine['updates'] >= REBUILD_EVERY:
+        _rebuild(engine)
+
+def update(engine, returns):
+    """
+    Advance the engine with a returns DataFrame (index = dates); rows up to
+    the last date already held are skipped, except the last date itself.
+    More new rows than the window is a rebuild from the last window rows.
+    """
+    returns = returns.reindex(columns=engine['tickers'])
+    returns = returns[returns.notna().any(axis=1)]
+    if engine['last_date'] is not None:
+        returns = returns[returns.index >= engine['last_date']]
+    if len(returns) >= engine['window']:
+        tail = returns.iloc[-engine['window']:]
+        engine['buf'][:] = tail.to_numpy(dtype=float)
+        engine['dates'] = list(tail.index)
+        engine['head'], engine['rows'] = 0, engine['window']
+        engine['last_date'] = tail.index[-1]
+        _rebuild(engine)
+        return engine
+    values = returns.to_numpy(dtype=float)
+    for date, row in zip(returns.index, values):
+        push(engine, date, row)
+    return engine
+
+def correlation(engine, tickers=None, min_periods=MIN_PERIODS):
+    """
+    Correlation matrix (DataFrame) for tickers (default all) from the sums;
+    NaN where a pair overlaps on fewer than min_periods days
+    """
+    names = engine['tickers'] if tickers is None else [t for t in tickers if t in engine['pos']]
+    idx = np.array([engine['pos'][t] for t in names], dtype=int)
+    grid = np.ix_(idx, idx)
+    n, sxy = engine['cnt'][grid], engine['sxy'][grid]
+    sx, sxx = engine['sx'][grid], engine['sxx'][grid]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = n * sxy - sx * sx.T
+        var = (n * sxx - sx * sx) * (n * sxx.T - sx.T * sx.T)
+        corr = cov / np.sqrt(var)
+    corr[(n < min_periods) | ~(var > 0)] = np.nan
+    corr = np.clip(corr, -1.0, 1.0)
+    np.fill_diagonal(corr, np.where(np.diag(n) >= min_periods, 1.0, np.nan))
+    return pd.DataFrame(corr, index=names, columns=names)
+
+# ========================================
+# SHARED ENGINES
+# ========================================
+
+# (tickers, window) -> engine in least-recently-used order; reused while
+# the panel only gains days
+_engines = {}
+_lock = threading.Lock()
+
+def returns_of(close):
+    return close.sort_index().pct_change(fill_method=None)
+
+def engine_for(close, window=CORR_WINDOW):
+    """
+    Shared engine for close's tickers, advanced to close's last row
+    (incrementally when the panel only added or revised recent days)
+    """
+    key = (tuple(close.columns), window)
+    returns = returns_of(close)
+    with _lock:
+        engine = _engines.pop(key, None)
+        if engine is None or (engine['last_date'] is not None and engine['last_date'] not in returns.index):
+            engine = new_engine(close.columns, window)
+        _engines[key] = engine
+        while len(_engines) > MAX_ENGINES:
+            _engines.pop(next(iter(_engines)))
+        return update(engine, returns)
+
+# ========================================
+# DIVERSIFIED SELECTION
+# ========================================
+
+def diversified_top(candidates, corr, n=5, max_corr=MAX_CORR, score_col="Score",
+                    ticker_col="Ticker", fill=True):
+    """
+    Greedy diversified top-N
+
+    Walks candidates by score and takes one unless its correlation with an
+    earlier pick exceeds max_corr. With fill, open slots are then filled
+    with the remaining candidates least correlated with the picks.
+    Tickers missing from corr count as uncorrelated.
+
+    Args:
+        candidates: screener results (Ticker with or without .JK)
+        corr: correlation DataFrame labelled with .JK tickers
+        n: picks wanted
+
+    Returns:
+        the picked rows in pick order, with Max_Corr (highest correlation
+        with an earlier pick)
+    """
+    from stock_universe import normalize_ticker
+
+    if candidates is None or candidates.empty:
+        return candidates
+    if score_col in candidates.columns:
+        candidates = candidates.sort_values(score_col, ascending=False, kind='stable')
+    candidates = candidates.reset_index(drop=True)
+    keys = candidates[ticker_col].map(normalize_ticker)
+    known = [k for k in dict.fromkeys(keys) if k in corr.index]
+    matrix = corr.reindex(index=known, columns=known).to_numpy(dtype=float)
+    col = keys.map({k: i for i, k in enumerate(known)}).fillna(-1).astype(int).to_numpy()
+
+    max_seen = np.full(len(candidates), -np.inf)  # vs picks so far
+    picked = []
+    taken = np.zeros(len(candidates), dtype=bool)
+
+    def take(i):
+        picked.append((i, max_seen[i]))
+        taken[i] = True
+        if col[i] >= 0:
+            row = np.where(col >= 0, matrix[col, col[i]], np.nan)
+            np.fmax(max_seen, row, out=max_seen)
+        taken[keys == keys[i]] = True  # Same ticker listed twice
+
+    for i in range(len(candidates)):
+        if len(picked) >= n:
+            break
+        if not taken[i] and max_seen[i] <= max_corr:
+            take(i)
+    while fill and len(picked) < n and not taken.all():
+        rest = np.flatnonzero(~taken)
+        take(rest[np.argmin(max_seen[rest])])  # First (best score) on ties
+
+    out = candidates.iloc[[i for i, _ in picked]].copy()
+    out['Max_Corr'] = [round(float(c), 2) if np.isfinite(c) else np.nan for _, c in picked]
+    return out.reset_index(drop=True)
+
+def diversify(candidates, n=5, max_corr=MAX_CORR, period=CORR_PERIOD, ticker_col="Ticker"):
+    """
+    Diversified top-N for a finished scan (UI)
+
+    One engine over the whole universe (plus any candidates outside it) on
+    spec_engine's shared daily panel: the panel is downloaded once per
+    refresh and shared with the spec scans, and the engine only advances by
+    the new days; each scan reads its candidates' block of the sums.
+    """
+    from spec_engine import load_panel
+    from stock_universe import EXPANDED_UNIVERSE, normalize_ticker
+
+    if candidates is None or candidates.empty:
+        return candidates
+    names = sorted(set(candidates[ticker_col].map(normalize_ticker)))
+    panel, _ = load_panel(sorted(set(EXPANDED_UNIVERSE) | set(names)), period, "total")
+    if not panel:
+        return candidates.head(n)
+    corr = correlation(engine_for(panel['Close']), names)
+    return diversified_top(candidates, corr, n, max_corr, ticker_col=ticker_col)
+
+def diversify_signals(signals, close, n, max_corr=MAX_CORR, window=CORR_WINDOW, score_col="Score"):
+    """
+    Per-day diversified top-N for backtest signals (Date, Ticker, Score)
+
+    One engine walks the close panel forward with the signal dates, so each
+    day uses only the returns known on that day.
+    """
+    from stock_universe import normalize_ticker
+
+    if signals.empty:
+        return signals
+    index = close.index.tz_localize(None) if close.index.tz is not None else close.index
+    returns = returns_of(close.set_axis(index.normalize()))
+    engine = new_engine(close.columns, window)
+    picks, done = [], 0
+    for day, group in signals.groupby(pd.to_datetime(signals['Date']).dt.normalize(), sort=True):
+        end = returns.index.searchsorted(day, side='right')
+        update(engine, returns.iloc[done:end])
+        done = end
+        names = sorted(set(group['Ticker'].map(normalize_ticker)))
+        picks.append(diversified_top(group, correlation(engine, names), n, max_corr, score_col))
+    return pd.concat(picks, ignore_index=True)
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    days, n = 300, 900
+    sectors = rng.integers(0, 30, n)
+    factor = rng.normal(0, 0.02, (days, 30))
+    rets = factor[:, sectors] + rng.normal(0, 0.01, (days, n))
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=days)
+    tickers = [f"T{i:03d}.JK" for i in range(n)]
+    close = pd.DataFrame(1000 * np.exp(np.cumsum(rets, axis=0)), dates, tickers)
+
+    t0 = time.perf_counter()
+    engine = engine_for(close.iloc[:-1])
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    engine_for(close)
+    step = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    full = returns_of(close).iloc[-CORR_WINDOW:].corr(min_periods=MIN_PERIODS)
+    pandas_s = time.perf_counter() - t0
+    diff = np.nanmax(np.abs(correlation(engine).to_numpy() - full.to_numpy()))
+    print(f"build {build * 1000:.0f} ms | daily update {step * 1000:.1f} ms | "
+          f"pandas full corr {pandas_s * 1000:.0f} ms | max diff {diff:.2e}")
+
+    scores = pd.DataFrame({'Ticker': tickers, 'Score': rng.random(n) + (sectors == 0)})
+    picks = diversify_signals(scores.assign(Date=dates[-1]), close, 5)
+    print(picks.assign(Sector=sectors[[tickers.index(t) for t in picks['Ticker']]]).to_string(index=False))
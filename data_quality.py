@@ -0,0 +1,209 @@
+"""
+Data Quality Validation
+Vectorized checks on OHLCV bars between fetch and indicators: repairs
+what can be repaired, quarantines what cannot and scores every ticker's
+data health (0-100)
+"""
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+JUMP_LOG_THRESHOLD = 0.40  # |log return| beyond any IDX auto-rejection band
+SPLIT_RATIOS = (2, 3, 4, 5, 8, 10, 20, 25, 50, 100)
+SPLIT_TOLERANCE = 0.03
+MIN_HEALTH = 50  # Tickers below this are skipped by the screeners
+JUMP_PENALTY = 20  # Health points per unexplained price jump
+
+# Health weight per flagged bar (fraction of history)
+CHECK_WEIGHTS = {
+    'Missing': 0.5,
+    'HighLow': 1.0,
+    'OHLC': 0.5,
+    'ZeroVol': 0.5,
+    'Stale': 1.0,
+}
+
+# ========================================
+# PANEL VALIDATION
+# ========================================
+
+def _split_factor(ratio):
+    """Nearest split ratio (forward k or reverse 1/k) within tolerance, else NaN"""
+    out = np.full(ratio.shape, np.nan)
+    for k in SPLIT_RATIOS:
+        for r in (k, 1.0 / k):
+            out = np.where(np.isnan(out) & (np.abs(ratio / r - 1) <= SPLIT_TOLERANCE), r, out)
+    return out
+
+def validate_panel(panel, repair=True):
+    """
+    Validate a universe panel
+
+    Args:
+        panel: dict of wide DataFrames 'Open', 'High', 'Low', 'Close',
+               'Volume' (index = dates, columns = tickers)
+        repair: fix High/Low inversions, clip Open/Close into the bar range
+                and back-adjust split-like jumps
+
+    Checks (all vectorized across the panel):
+        Missing  - NaN price or volume
+        HighLow  - High < Low
+        OHLC     - Open / Close outside [Low, High]
+        ZeroVol  - zero volume (suspension / no trades)
+        Stale    - bar identical to the previous one (duplicate row)
+        Jump     - |log return| > JUMP_LOG_THRESHOLD; split-like jumps
+                   (ratio near 2, 3, 1/2, ...) are repaired, others counted
+
+    Missing, ZeroVol and Stale bars are quarantined (set to NaN).
+
+    Returns:
+        (clean panel, report DataFrame indexed by ticker with the count per
+        check, Repaired, Quarantined and Health)
+    """
+    close = panel['Close']
+    o = panel['Open'].reindex_like(close)
+    h = panel['High'].reindex_like(close)
+    l = panel['Low'].reindex_like(close)
+    c = close.copy()
+    v = panel['Volume'].reindex_like(close) if 'Volume' in panel else pd.DataFrame(np.nan, index=close.index, columns=close.columns)
+
+    O, H, L, C, V = (x.to_numpy(dtype=float, copy=True) for x in (o, h, l, c, v))
+    present = ~np.isnan(C)
+
+    # Rows without a close (not listed yet / no bar) are simply absent
+    missing = present & (np.isnan(O) | np.isnan(H) | np.isnan(L) | np.isnan(V))
+    high_low = H < L
+    ohlc = (np.fmax(O, C) > np.fmax(H, L) + 1e-9) | (np.fmin(O, C) < np.fmin(H, L) - 1e-9)
+    zero_vol = (V == 0) & present
+
+    stale = np.zeros_like(present)
+    if len(C) > 1:
+        same = np.ones(C[1:].shape, dtype=bool)
+        for x in (O, H, L, C, V):
+            same &= x[1:] == x[:-1]
+        stale[1:] = same
+
+    repaired = np.zeros(C.shape[1], dtype=int)
+    if repair:
+        swap = high_low
+        H, L = np.where(swap, L, H), np.where(swap, H, L)
+        H = np.fmax(H, np.fmax(O, C))
+        L = np.fmin(L, np.fmin(O, C))
+        repaired += swap.sum(axis=0) + (ohlc & ~swap).sum(axis=0)
+
+    # Quarantine bars that carry no trustworthy information
+    quarantine = missing | zero_vol | stale
+    for x in (O, H, L, C, V):
+        x[quarantine] = np.nan
+
+    # Price jumps on the cleaned close (prev = last valid close)
+    prev = pd.DataFrame(C).ffill().shift().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_ret = np.log(C / prev)
+    jump = np.abs(log_ret) > JUMP_LOG_THRESHOLD
+    split_jumps = np.zeros(C.shape[1], dtype=int)
+    if repair and jump.any():
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor = _split_factor(prev / C)
+        is_split = jump & ~np.isnan(factor)
+        if is_split.any():
+            # Every bar before a split is divided by its ratio (product of later splits)
+            step = np.where(is_split, factor, 1.0)
+            cum = np.flipud(np.cumprod(np.flipud(step), axis=0))
+            back = np.vstack([cum[1:], np.ones((1, C.shape[1]))])
+            for x in (O, H, L, C):
+                x /= back
+            V *= back
+            split_jumps = is_split.sum(axis=0)
+            jump &= ~is_split
+
+    idx, cols = close.index, close.columns
+    clean = {
+        'Open': pd.DataFrame(O, index=idx, columns=cols),
+        'High': pd.DataFrame(H, index=idx, columns=cols),
+        'Low': pd.DataFrame(L, index=idx, columns=cols),
+        'Close': pd.DataFrame(C, index=idx, columns=cols),
+        'Volume': pd.DataFrame(V, index=idx, columns=cols),
+    }
+
+    bars = np.maximum(present.sum(axis=0), 1)
+    report = pd.DataFrame({
+        'Bars': present.sum(axis=0),
+        'Missing': missing.sum(axis=0),
+        'HighLow': high_low.sum(axis=0),
+        'OHLC': ohlc.sum(axis=0),
+        'ZeroVol': zero_vol.sum(axis=0),
+        'Stale': stale.sum(axis=0),
+        'Jumps': jump.sum(axis=0),
+        'Splits': split_jumps,
+        'Repaired': repaired + split_jumps,
+        'Quarantined': quarantine.sum(axis=0),
+    }, index=cols)
+    penalty = sum(report[k] * w for k, w in CHECK_WEIGHTS.items()) / bars * 100
+    health = 100 - penalty - report['Jumps'] * JUMP_PENALTY
+    report['Health'] = health.clip(0, 100).round(1)
+    report.loc[report['Bars'] == 0, 'Health'] = 0.0
+    return clean, report
+
+# ========================================
+# SINGLE TICKER
+# ========================================
+
+# ticker -> latest health report row (dict)
+_health = {}
+
+def clean_bars(df, ticker=None, repair=True):
+    """
+    Validate one ticker's OHLCV frame (as returned by yf.download / history)
+
+    Quarantined bars are dropped. Returns (clean DataFrame, health 0-100);
+    the report is kept for get_health_report when ticker is given.
+    """
+    if df is None or df.empty:
+        return df, 0.0
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = [col[0] for col in df.columns]
+    if any(f not in df.columns for f in FIELDS):
+        return df, 0.0
+
+    name = ticker or 'ticker'
+    panel = {f: df[[f]].astype(float).set_axis([name], axis=1) for f in FIELDS}
+    clean, report = validate_panel(panel, repair=repair)
+
+    out = df.copy()
+    for f in FIELDS:
+        out[f] = clean[f][name].to_numpy()
+    out = out[out['Close'].notna()]
+
+    if ticker is not None:
+        record_health(report)
+    return out, float(report.at[name, 'Health'])
+
+def record_health(report):
+    """Keep a validate_panel report for get_health_report"""
+    for ticker, row in report.iterrows():
+        _health[ticker] = {k: (float(x) if k == 'Health' else int(x)) for k, x in row.items()}
+
+def get_health_report():
+    """Per-ticker data-health table of everything validated in this process (worst first)"""
+    if not _health:
+        return pd.DataFrame()
+    report = pd.DataFrame.from_dict(_health, orient='index')
+    report.index.name = 'Ticker'
+    return report.sort_values('Health')
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from market_utils import download_panel
+    from stock_universe import LQ45_TICKERS
+
+    tickers = sys.argv[1:] or LQ45_TICKERS
+    panel = download_panel(tickers, period="1y", validate=False)
+    t0 = time.perf_counter()
+    _, report = validate_panel(panel)
+    print(report.sort_values('Health').head(20).to_string())
+    print(f"\nValidated {len(report)} tickers in {(time.perf_counter() - t0) * 1000:.1f} ms")
@@ -0,0 +1,182 @@
+"""
+IDX Trading Calendar
+Sessions, lunch breaks, weekends and exchange holidays (Asia/Jakarta),
+used by the caches and snapshot store to decide when data goes stale
+"""
+
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+    WIB = ZoneInfo("Asia/Jakarta")
+except Exception:  # no tz database available
+    WIB = timezone(timedelta(hours=7), "WIB")
+
+# ========================================
+# SESSIONS
+# ========================================
+
+# weekday (Mon=0) -> [(open, close), ...] as "HH:MM"; close includes pre-closing
+SESSIONS = {
+    0: [("09:00", "12:00"), ("13:30", "16:00")],
+    1: [("09:00", "12:00"), ("13:30", "16:00")],
+    2: [("09:00", "12:00"), ("13:30", "16:00")],
+    3: [("09:00", "12:00"), ("13:30", "16:00")],
+    4: [("09:00", "11:30"), ("14:00", "16:00")],  # Friday prayer break
+}
+
+INTRADAY_TTL = 60  # Seconds intraday data stays fresh during a session
+
+# ========================================
+# HOLIDAYS
+# ========================================
+
+HOLIDAY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "idx_holidays.txt")
+
+def load_holidays(path=HOLIDAY_FILE):
+    """Read exchange holidays (one YYYY-MM-DD per line, '#' comments)"""
+    holidays = set()
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    holidays.add(date.fromisoformat(line))
+    except FileNotFoundError:
+        pass
+    return holidays
+
+IDX_HOLIDAYS = load_holidays()
+
+def set_holidays(holidays):
+    """Replace the holiday list (dates or 'YYYY-MM-DD' strings)"""
+    global IDX_HOLIDAYS
+    IDX_HOLIDAYS = {d if isinstance(d, date) else date.fromisoformat(d) for d in holidays}
+
+# ========================================
+# CALENDAR QUERIES
+# ========================================
+
+def now_wib():
+    return datetime.now(WIB)
+
+def to_wib(ts=None):
+    """datetime / epoch seconds / None (now) -> aware datetime in WIB"""
+    if ts is None:
+        return now_wib()
+    if isinstance(ts, (int, float)):
+        return datetime.fromtimestamp(ts, WIB)
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=WIB)
+    return ts.astimezone(WIB)
+
+def is_trading_day(d):
+    if isinstance(d, datetime):
+        d = to_wib(d).date()
+    return d.weekday() in SESSIONS and d not in IDX_HOLIDAYS
+
+def sessions(d):
+    """[(open, close), ...] aware datetimes for trading day d ([] if closed)"""
+    if not is_trading_day(d):
+        return []
+    out = []
+    for start, end in SESSIONS[d.weekday()]:
+        sh, sm = map(int, start.split(':'))
+        eh, em = map(int, end.split(':'))
+        out.append((datetime(d.year, d.month, d.day, sh, sm, tzinfo=WIB),
+                    datetime(d.year, d.month, d.day, eh, em, tzinfo=WIB)))
+    return out
+
+def market_status(ts=None):
+    """'OPEN', 'BREAK', 'PRE_OPEN', 'CLOSED' (after close) or 'HOLIDAY' (weekend / holiday)"""
+    ts = to_wib(ts)
+    day = sessions(ts.date())
+    if not day:
+        return "HOLIDAY"
+    if ts < day[0][0]:
+        return "PRE_OPEN"
+    if ts >= day[-1][1]:
+        return "CLOSED"
+    if any(start <= ts < end for start, end in day):
+        return "OPEN"
+    return "BREAK"
+
+def is_market_open(ts=None):
+    return market_status(ts) == "OPEN"
+
+def next_session_open(ts=None, max_days=30):
+    """Start of the next session segment strictly after ts (lunch breaks included)"""
+    ts = to_wib(ts)
+    d = ts.date()
+    for _ in range(max_days):
+        for start, _ in sessions(d):
+            if start > ts:
+                return start
+        d += timedelta(days=1)
+    raise ValueError(f"No IDX session within {max_days} days of {ts}")
+
+def next_trading_day_open(ts=None, max_days=30):
+    """Opening bell of the next trading day after ts's date (or today if before the open)"""
+    ts = to_wib(ts)
+    d = ts.date()
+    for _ in range(max_days):
+        day = sessions(d)
+        if day and day[0][0] > ts:
+            return day[0][0]
+        d += timedelta(days=1)
+    raise ValueError(f"No IDX session within {max_days} days of {ts}")
+
+def session_date(ts=None):
+    """Trading date of the latest daily bar at ts (Saturday -> Friday, 08:00 -> previous day)"""
+    ts = to_wib(ts)
+    d = ts.date()
+    day = sessions(d)
+    if day and ts >= day[0][0]:
+        return d
+    for _ in range(30):
+        d -= timedelta(days=1)
+        if is_trading_day(d):
+            return d
+    return ts.date()
+
+# ========================================
+# CACHE FRESHNESS
+# ========================================
+
+def valid_until(fetched_at, mode="daily", ttl=INTRADAY_TTL):
+    """
+    Expiry of data fetched at fetched_at
+
+    mode "daily": valid until the next daily bar - today's close if fetched
+    during trading hours, else the next trading day's open.
+    mode "intraday": ttl seconds during a session (capped at the session
+    end), frozen through breaks, after close and on holidays until the
+    next session opens.
+    """
+    ts = to_wib(fetched_at)
+    status = market_status(ts)
+    if mode == "intraday":
+        if status == "OPEN":
+            end = next(end for start, end in sessions(ts.date()) if start <= ts < end)
+            return min(ts + timedelta(seconds=ttl), end)
+        return next_session_open(ts)
+    if status in ("OPEN", "BREAK"):
+        return sessions(ts.date())[-1][1]
+    return next_trading_day_open(ts)
+
+def is_fresh(fetched_at, mode="daily", now=None, ttl=INTRADAY_TTL):
+    """True if data fetched at fetched_at (epoch seconds or datetime) is still valid"""
+    if fetched_at is None:
+        return False
+    return to_wib(now) < valid_until(fetched_at, mode, ttl)
+
+if __name__ == "__main__":
+    now = now_wib()
+    print(f"Now (WIB):        {now:%Y-%m-%d %H:%M}")
+    print(f"Status:           {market_status(now)}")
+    print(f"Session date:     {session_date(now)}")
+    print(f"Next open:        {next_session_open(now):%Y-%m-%d %H:%M}")
+    print(f"Daily valid to:   {valid_until(time.time()):%Y-%m-%d %H:%M}")
+    print(f"Holidays loaded:  {len(IDX_HOLIDAYS)}")
@@ -12,6 +12,11 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import warnings
 import sys
 import config_swing as cfg
+from market_utils import SCAN_CHUNK_SIZE
+from idx_calendar import session_date
+from data_quality import clean_bars, MIN_HEALTH
+from corporate_actions import get_bars
+from indicators import compute as compute_indicators
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -43,10 +48,13 @@ def load_universe():
 def fetch_stock_data(ticker):
     """Fetch daily data for a single stock"""
     try:
-        stock = yf.Ticker(ticker)
-        df = stock.history(period=cfg.FETCH_PERIOD, interval=cfg.FETCH_INTERVAL)
+        if cfg.FETCH_INTERVAL == "1d":
+            df = get_bars(ticker, period=cfg.FETCH_PERIOD)  # same adjustment as Ticker.history
+        else:
+            df = yf.Ticker(ticker).history(period=cfg.FETCH_PERIOD, interval=cfg.FETCH_INTERVAL)
+        df, health = clean_bars(df, ticker)
         
-        if df.empty or len(df) < cfg.MIN_HISTORY_DAYS:
+        if df.empty or health < MIN_HEALTH or len(df) < cfg.MIN_HISTORY_DAYS:
             return ticker, None
         
         # Add ticker column
@@ -84,35 +92,39 @@ def fetch_all_data(tickers):
 # TECHNICAL INDICATORS
 # ========================================
 
-def calculate_vwma(df, period=20):
-    """Volume-Weighted Moving Average"""
-    return (df['Close'] * df['Volume']).rolling(period).sum() / df['Volume'].rolling(period).sum()
-
-def calculate_ema(series, period):
-    """Exponential Moving Average"""
-    return series.ewm(span=period, adjust=False).mean()
-
 def calculate_indicators(df):
-    """Calculate all technical indicators for a stock"""
+    """Calculate all technical indicators for a stock (see the indicators registry)"""
     df = df.copy()
+    names = {
+        'VWMA20': f"VWMA{cfg.VWMA_PERIOD}",
+        'EMA20': f"EMA{cfg.EMA_FAST_PERIOD}",
+        'EMA50': f"EMA{cfg.EMA_SLOW_PERIOD}",
+        'Vol_SMA20': f"Vol_SMA{cfg.VOL_SMA_PERIOD}",
+        'Rel_Vol': f"RelVol{cfg.VOL_SMA_PERIOD}",
+        'DailyValue': "Value",
+        'AvgValue20D_IDR': f"AvgValue{cfg.VALUE_SMA_PERIOD}",
+        'DailyRange_%': "RangePct",
+        'ADR20_%': f"ADR{cfg.ADR_PERIOD}",
+    }
+    ind = compute_indicators(df, names.values())
     
     # Base indicators
-    df['VWMA20'] = calculate_vwma(df, cfg.VWMA_PERIOD)
-    df['EMA20'] = calculate_ema(df['Close'], cfg.EMA_FAST_PERIOD)
-    df['EMA50'] = calculate_ema(df['Close'], cfg.EMA_SLOW_PERIOD)
+    df['VWMA20'] = ind[names['VWMA20']]
+    df['EMA20'] = ind[names['EMA20']]
+    df['EMA50'] = ind[names['EMA50']]
     
     # Derived metrics
     df['VWMA_Dist_%'] = ((df['Close'] - df['VWMA20']) / df['VWMA20']) * 100
-    df['Vol_SMA20'] = df['Volume'].rolling(cfg.VOL_SMA_PERIOD).mean()
-    df['Rel_Vol'] = df['Volume'] / df['Vol_SMA20']
+    df['Vol_SMA20'] = ind[names['Vol_SMA20']]
+    df['Rel_Vol'] = ind[names['Rel_Vol']]
     
     # Liquidity (Average Daily Value in IDR, assuming Close is already in IDR)
-    df['DailyValue'] = df['Close'] * df['Volume']
-    df['AvgValue20D_IDR'] = df['DailyValue'].rolling(cfg.VALUE_SMA_PERIOD).mean()
+    df['DailyValue'] = ind[names['DailyValue']]
+    df['AvgValue20D_IDR'] = ind[names['AvgValue20D_IDR']]
     
     # Volatility (Average Daily Range %)
-    df['DailyRange_%'] = ((df['High'] - df['Low']) / df['Close']) * 100
-    df['ADR20_%'] = df['DailyRange_%'].rolling(cfg.ADR_PERIOD).mean()
+    df['DailyRange_%'] = ind[names['DailyRange_%']]
+    df['ADR20_%'] = ind[names['ADR20_%']]
     
     # Candle metrics
     candle_range = df['High'] - df['Low']
@@ -219,46 +231,42 @@ def apply_decision_logic(row):
 # MAIN SCREENING LOGIC
 # ========================================
 
-def screen_stocks(data_dict):
-    """Screen all stocks and generate results DataFrame"""
-    print(f"\n[INFO] Analyzing {len(data_dict)} stocks...")
-    
-    results = []
-    
-    for ticker, df in data_dict.items():
-        # Calculate indicators
-        df = calculate_indicators(df)
-        
-        # Get latest row
-        latest = df.iloc[-1]
-        
-        # Apply decision logic
-        decision, score, reasons = apply_decision_logic(latest)
-        
-        # Build result row
-        result = {
-            'Date': latest.name.strftime('%Y-%m-%d'),
-            'Ticker': ticker.replace('.JK', ''),
-            'Close': round(latest['Close'], 2),
-            'VWMA20': round(latest['VWMA20'], 2),
-            'VWMA_Dist_%': round(latest['VWMA_Dist_%'], 2),
-            'Rel_Vol': round(latest['Rel_Vol'], 2),
-            'AvgValue20D_IDR': f"{latest['AvgValue20D_IDR']/1e9:.2f}B",
-            'ADR20_%': round(latest['ADR20_%'], 2),
-            'CloseLocation': round(latest['CloseLocation'], 3),
-            'BodyRatio': round(latest['BodyRatio'], 3),
-            'WickRatio': round(latest['WickRatio'], 3),
-            'EMA20': round(latest['EMA20'], 2),
-            'EMA50': round(latest['EMA50'], 2),
-            'TrendOK': latest['TrendOK'],
-            'Decision': decision,
-            'Score': score,
-            'ReasonCodes': reasons,
-        }
-        
-        results.append(result)
-    
-    df_results = pd.DataFrame(results)
+def screen_one(ticker, df):
+    """Indicators + decision for one stock; returns the result row dict"""
+    # Calculate indicators
+    df = calculate_indicators(df)
+    
+    # Get latest row
+    latest = df.iloc[-1]
+    
+    # Apply decision logic
+    decision, score, reasons = apply_decision_logic(latest)
+    
+    # Build result row
+    return {
+        'Date': latest.name.strftime('%Y-%m-%d'),
+        'Ticker': ticker.replace('.JK', ''),
+        'Close': round(latest['Close'], 2),
+        'VWMA20': round(latest['VWMA20'], 2),
+        'VWMA_Dist_%': round(latest['VWMA_Dist_%'], 2),
+        'Rel_Vol': round(latest['Rel_Vol'], 2),
+        'AvgValue20D_IDR': f"{latest['AvgValue20D_IDR']/1e9:.2f}B",
+        'ADR20_%': round(latest['ADR20_%'], 2),
+        'CloseLocation': round(latest['CloseLocation'], 3),
+        'BodyRatio': round(latest['BodyRatio'], 3),
+        'WickRatio': round(latest['WickRatio'], 3),
+        'EMA20': round(latest['EMA20'], 2),
+        'EMA50': round(latest['EMA50'], 2),
+        'TrendOK': latest['TrendOK'],
+        'Decision': decision,
+        'Score': score,
+        'ReasonCodes': reasons,
+    }
+
+def rank_results(df_results):
+    """Add Rank_READY and sort READY > WAIT > AVOID"""
+    if df_results.empty:
+        return df_results
     
     # Add ranking for READY candidates
     df_results['Rank_READY'] = 0
@@ -281,17 +289,54 @@ def screen_stocks(data_dict):
     
     df_results['_sort'] = df_results.apply(sort_key, axis=1)
     df_results = df_results.sort_values('_sort').drop('_sort', axis=1).reset_index(drop=True)
+    return df_results
+
+def screen_stocks(data_dict):
+    """Screen all stocks and generate results DataFrame"""
+    print(f"\n[INFO] Analyzing {len(data_dict)} stocks...")
+    
+    results = [screen_one(ticker, df) for ticker, df in data_dict.items()]
+    df_results = rank_results(pd.DataFrame(results))
     
     print(f"[OK] Screening complete!")
     return df_results
 
+def iter_screen(tickers, chunk_size=SCAN_CHUNK_SIZE):
+    """
+    Fetch and screen concurrently, yielding partial results as data arrives
+    
+    Each stock is screened as soon as its download completes, so the first
+    rows are available long before the whole universe has been fetched.
+    """
+    print(f"\n[INFO] Fetching and analyzing {len(tickers)} stocks...")
+    results = []
+    failed = []
+    
+    with ThreadPoolExecutor(max_workers=cfg.MAX_WORKERS) as executor:
+        futures = {executor.submit(fetch_stock_data, ticker): ticker for ticker in tickers}
+        
+        for i, future in enumerate(as_completed(futures), 1):
+            ticker, df = future.result()
+            if df is not None:
+                results.append(screen_one(ticker, df))
+            else:
+                failed.append(ticker)
+            
+            if i % chunk_size == 0 or i == len(tickers):
+                yield {"done": i, "total": len(tickers), "ticker": ticker,
+                       "results": rank_results(pd.DataFrame(results))}
+    
+    print(f"[OK] Screened {len(results)} stocks")
+    if failed:
+        print(f"[WARN] Failed to fetch {len(failed)} stocks: {', '.join(failed[:10])}{'...' if len(failed) > 10 else ''}")
+
 # ========================================
 # OUTPUT & REPORTING
 # ========================================
 
 def save_results(df_results):
     """Save results to CSV"""
-    date_str = datetime.now().strftime('%Y%m%d')
+    date_str = session_date().strftime('%Y%m%d')
     filename = f"{cfg.OUTPUT_PREFIX_SCREENER}_{date_str}.csv"
     filepath = f"{cfg.OUTPUT_DIR}/{filename}"
     
@@ -344,8 +389,8 @@ def print_summary(df_results):
 # MAIN EXECUTION
 # ========================================
 
-def main():
-    """Main execution function"""
+def iter_main(chunk_size=SCAN_CHUNK_SIZE):
+    """Streaming version of main(): yields partial results, then saves"""
     print(f"\n{'='*80}")
     print(f"IDX SWING/CONTINUATION SCREENER v1.0")
     print(f"Optimized for 1-5 day hold period | Liquidity >= 10B IDR")
@@ -353,24 +398,30 @@ def main():
     
     # Load universe
     tickers = load_universe()
-    if not tickers:
-        return
+    df_results = pd.DataFrame()
     
-    # Fetch data
-    data_dict = fetch_all_data(tickers)
-    if not data_dict:
-        print("[ERROR] No data fetched. Exiting.")
-        return
+    # Fetch + screen stocks
+    for progress in iter_screen(tickers, chunk_size):
+        df_results = progress['results']
+        yield progress
     
-    # Screen stocks
-    df_results = screen_stocks(data_dict)
-    
-    # Output results
-    filename = save_results(df_results)
-    print_summary(df_results)
-    
-    print(f"[DONE] Screening complete! Review top candidates in chart before entry.")
-    print(f"[FILE] Full results: {filename}\n")
+    if df_results.empty:
+        print("[ERROR] No data fetched. Exiting.")
+    else:
+        # Output results
+        filename = save_results(df_results)
+        print_summary(df_results)
+        
+        print(f"[DONE] Screening complete! Review top candidates in chart before entry.")
+        print(f"[FILE] Full results: {filename}\n")
+    yield {"done": len(tickers), "total": len(tickers), "results": df_results, "final": True}
+
+def main():
+    """Main execution function"""
+    df_results = pd.DataFrame()
+    for progress in iter_main():
+        df_results = progress['results']
+    return df_results
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,214 @@
+"""
+Indicator Registry
+Every indicator the screeners use, defined once with the inputs it
+depends on (ATR on TrueRange, RelVol on Vol_SMA, ...). Requesting a set
+of names resolves the dependency graph and computes each node once per
+panel; results are memoized so screeners sharing a panel share the
+series. Works on a wide panel (dict of frames, columns = tickers) or on
+one ticker's OHLCV DataFrame.
+"""
+
+import re
+import threading
+import weakref
+
+import numpy as np
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+# ========================================
+# PRIMITIVES (Series or wide DataFrame)
+# ========================================
+
+def ema(series, length):
+    return series.ewm(span=length, adjust=False).mean()
+
+def sma(series, length):
+    return series.rolling(length).mean()
+
+def rolling_sum(series, length):
+    return series.rolling(length).sum()
+
+def rsi(change, length=14):
+    """RSI from close-to-close changes (simple-average variant used by the screeners)"""
+    gain = change.where(change > 0, 0).rolling(window=length).mean()
+    loss = (-change.where(change < 0, 0)).rolling(window=length).mean()
+    return 100 - (100 / (1 + gain / (loss + 0.0001)))
+
+def true_range(high, low, close):
+    prev_close = close.shift()
+    return np.fmax(np.fmax(high - low, (high - prev_close).abs()), (low - prev_close).abs())
+
+def mf_volume(high, low, close, volume):
+    """Chaikin money-flow volume (flat candles use a 0.0001 range)"""
+    denom = (high - low).replace(0, 0.0001)
+    return ((close - low) - (high - close)) / denom * volume
+
+def cmf(mfv, volume, length=20):
+    return mfv.rolling(window=length).sum() / volume.rolling(window=length).sum()
+
+def mfi(typical, flow, length=14):
+    pos = flow.where(typical > typical.shift(1), 0).rolling(window=length).sum()
+    neg = flow.where(typical < typical.shift(1), 0).rolling(window=length).sum()
+    return 100 - (100 / (1 + pos / (neg + 0.0001)))
+
+def obv(close, volume):
+    """On-Balance Volume; gaps (NaN closes) carry the running total"""
+    step = np.sign(close.diff()).fillna(0) * volume
+    return step.where(close.notna()).fillna(0).cumsum().where(close.notna())
+
+# ========================================
+# REGISTRY
+# ========================================
+
+# name -> (inputs, fn(*inputs))
+INDICATORS = {
+    'Range': (('High', 'Low'), lambda high, low: high - low),
+    'RangePct': (('Range', 'Close'), lambda rng, close: (rng / close) * 100),
+    'Value': (('Close', 'Volume'), lambda close, volume: close * volume),
+    'Change': (('Close',), lambda close: close.diff()),
+    'TrueRange': (('High', 'Low', 'Close'), true_range),
+    'TypicalPrice': (('High', 'Low', 'Close'), lambda high, low, close: (high + low + close) / 3),
+    'MoneyFlow': (('TypicalPrice', 'Volume'), lambda typical, volume: typical * volume),
+    'MFVolume': (('High', 'Low', 'Close', 'Volume'), mf_volume),
+    'OBV': (('Close', 'Volume'), obv),
+}
+
+# Parametric families, e.g. EMA20 or Vol_SMA5: prefix -> (inputs, fn(*inputs, n));
+# {n} in an input name is the requested period
+FAMILIES = {
+    'EMA': (('Close',), ema),
+    'SMA': (('Close',), sma),
+    'Vol_SMA': (('Volume',), sma),
+    'VolSum': (('Volume',), rolling_sum),
+    'RelVol': (('Volume', 'Vol_SMA{n}'), lambda volume, avg, n: volume / avg),
+    'VWMA': (('Value', 'VolSum{n}'), lambda value, vol_sum, n: value.rolling(n).sum() / vol_sum),
+    'AvgValue': (('Value',), sma),
+    'ADR': (('RangePct',), sma),
+    'ATR': (('TrueRange',), sma),
+    'RSI': (('Change',), rsi),
+    'CMF': (('MFVolume', 'Volume'), cmf),
+    'MFI': (('TypicalPrice', 'MoneyFlow'), mfi),
+}
+
+_FAMILY_NAME = re.compile(r'^(.*?)(\d+)$')
+
+def resolve(name):
+    """(inputs, fn(*inputs)) for a registered name; KeyError if unknown"""
+    if name in INDICATORS:
+        return INDICATORS[name]
+    match = _FAMILY_NAME.match(name)
+    if match and match.group(1) in FAMILIES:
+        n = int(match.group(2))
+        inputs, fn = FAMILIES[match.group(1)]
+        return tuple(i.format(n=n) for i in inputs), lambda *args: fn(*args, n)
+    raise KeyError(f"Unknown indicator: {name}")
+
+def is_indicator(name):
+    try:
+        resolve(name)
+        return True
+    except KeyError:
+        return False
+
+def dependency_order(names):
+    """Registered names needed for names, dependencies first (ValueError on a cycle)"""
+    order, state = [], {}
+
+    def visit(name, path):
+        if name in FIELDS or state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Indicator cycle: {' -> '.join(path + [name])}")
+        state[name] = 'visiting'
+        for dep in resolve(name)[0]:
+            visit(dep, path + [name])
+        state[name] = 'done'
+        order.append(name)
+
+    for name in names:
+        visit(name, [])
+    return order
+
+# ========================================
+# MEMOIZED COMPUTATION
+# ========================================
+
+# id(source frame) -> {'values': {name: result}, 'lock': RLock}; dropped with the frame
+_memos = {}
+_memos_lock = threading.Lock()
+_stats = {'computed': 0, 'reused': 0}
+
+def _memo_for(data):
+    # A panel dict is keyed by its Close frame (dicts cannot be weakly referenced)
+    anchor = data['Close'] if isinstance(data, dict) else data
+    key = id(anchor)
+    with _memos_lock:
+        memo = _memos.get(key)
+        if memo is None:
+            memo = {'values': {}, 'lock': threading.RLock()}
+            _memos[key] = memo
+            weakref.finalize(anchor, _memos.pop, key, None)
+        return memo
+
+def compute(data, names, memo=None):
+    """
+    Indicators for a panel or a single-ticker frame
+
+    Args:
+        data: dict of wide frames or an OHLCV DataFrame (treated as immutable)
+        names: registered names, e.g. ['EMA20', 'ATR14', 'RelVol20']
+        memo: result dict to use instead of the shared per-data memo
+
+    Returns:
+        {name: Series / DataFrame}
+    """
+    names = list(names)
+    if memo is None:
+        shared = _memo_for(data)
+        lock, values = shared['lock'], shared['values']
+    else:
+        lock, values = threading.RLock(), memo
+
+    def value(name):
+        return data[name] if name in FIELDS else values[name]
+
+    with lock:
+        for name in dependency_order(names):
+            if name in values:
+                _stats['reused'] += 1
+                continue
+            inputs, fn = resolve(name)
+            values[name] = fn(*[value(i) for i in inputs])
+            _stats['computed'] += 1
+        return {name: value(name) for name in names}
+
+def get(data, name):
+    """Single indicator (or raw field) for data, memoized like compute"""
+    if name in FIELDS:
+        return data[name]
+    return compute(data, [name])[name]
+
+def stats():
+    """Nodes computed vs served from the memo since import"""
+    return dict(_stats)
+
+if __name__ == "__main__":
+    import time
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end=pd.Timestamp.today(), periods=250)
+    tickers = [f"T{i:03d}" for i in range(900)]
+    close = pd.DataFrame(1000 * np.exp(np.cumsum(rng.normal(0, 0.02, (250, 900)), axis=0)), dates, tickers)
+    panel = {'Open': close.shift().fillna(close), 'High': close * 1.01, 'Low': close * 0.99,
+             'Close': close, 'Volume': pd.DataFrame(rng.lognormal(14, 1, (250, 900)), dates, tickers)}
+
+    screens = [['EMA20', 'EMA50', 'RSI14', 'CMF20', 'ATR14', 'Vol_SMA20'],
+               ['CMF20', 'MFI14', 'OBV', 'ATR14', 'Vol_SMA20'],
+               ['VWMA20', 'EMA20', 'EMA50', 'RelVol20', 'AvgValue20', 'ADR20']]
+    for names in screens:
+        t0 = time.perf_counter()
+        compute(panel, names)
+        print(f"{', '.join(names)}: {(time.perf_counter() - t0) * 1000:.0f} ms")
+    print(stats())
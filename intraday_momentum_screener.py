@@ -1,37 +1,32 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import time
 from datetime import datetime, timedelta
 from stock_universe import EXPANDED_UNIVERSE as STOCK_UNIVERSE
+from market_utils import iter_scan, SCAN_CHUNK_SIZE
+from bar_resampler import intraday_bars, prefetch_today
+from data_quality import clean_bars, MIN_HEALTH
+from corporate_actions import get_bars
+from volume_profile import load_profiles, project_volume
+from indicators import compute as compute_indicators
 
 # --- Settings ---
 MIN_PRICE = 50          # Lowered from 60
 
-# --- Helper Functions ---
-def calculate_rsi(series, length=14):
-    """Calculate RSI indicator"""
-    delta = series.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=length).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=length).mean()
-    rs = gain / (loss + 0.0001)
-    return 100 - (100 / (1 + rs))
-
 # --- Analysis Logic ---
 def analyze_intraday(ticker):
     try:
-        # Fetch Intraday Data (1m) - Real Time
-        df = yf.download(ticker, period="1d", interval="1m", progress=False)
+        # Intraday Data (1m) - from the shared universe panel (one request per scan, see bar_resampler)
+        df = intraday_bars(ticker, "1m")
         if df.empty or len(df) < 5: return None
-        
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = [c[0] for c in df.columns]
 
         # Fetch Daily Data (for Prev Close & Avg Vol)
-        df_daily = yf.download(ticker, period="1mo", interval="1d", progress=False)
+        df_daily = get_bars(ticker, period="1mo")
         if len(df_daily) < 5: return None
         if isinstance(df_daily.columns, pd.MultiIndex):
             df_daily.columns = [c[0] for c in df_daily.columns]
+        df_daily, health = clean_bars(df_daily, ticker)
+        if health < MIN_HEALTH or len(df_daily) < 5: return None
 
         # --- Metrics ---
         current_price = df.iloc[-1]['Close']
@@ -54,12 +49,11 @@ def analyze_intraday(ticker):
         
         # 4. Volume Check (FIXED: Handle NaN safely)
         current_vol = df['Volume'].sum()
-        avg_vol_20 = df_daily['Volume'].iloc[:-1].rolling(20).mean().iloc[-1]
+        daily_ind = compute_indicators(df_daily, ['Vol_SMA20', 'RSI14'])
+        avg_vol_20 = daily_ind['Vol_SMA20'].iloc[-2]  # 20-day average up to yesterday
         
-        # Estimate daily volume projection
-        minutes_elapsed = len(df)
-        if minutes_elapsed == 0: return None
-        projected_vol = (current_vol / minutes_elapsed) * 240
+        # Estimate daily volume projection (intraday volume profile, see volume_profile)
+        projected_vol = project_volume(ticker, current_vol, df.index[-1])
         
         # Safe RVOL calculation
         if pd.isna(avg_vol_20) or avg_vol_20 == 0:
@@ -75,7 +69,7 @@ def analyze_intraday(ticker):
         vwap_dist_pct = (current_price - vwap) / vwap * 100 if vwap > 0 else 0
         
         # 6. RSI (NEW: Overbought filter)
-        df_daily['RSI'] = calculate_rsi(df_daily['Close'], 14)
+        df_daily['RSI'] = daily_ind['RSI14']
         rsi = df_daily['RSI'].iloc[-1]
         rsi_overbought = rsi > 80
         
@@ -147,35 +141,46 @@ def analyze_intraday(ticker):
         return None
     return None
 
-def run_intraday_screener():
+def iter_intraday_screener(chunk_size=SCAN_CHUNK_SIZE):
+    """Scan the universe, yielding partial results every chunk_size tickers"""
     print(f"Running Intraday Momentum Screener...")
     print(f"Universe: {len(STOCK_UNIVERSE)} stocks")
     
-    results = []
+    df = pd.DataFrame()
     start_t = time.time()
     
-    for i, ticker in enumerate(STOCK_UNIVERSE):
-        print(f"[{i+1}/{len(STOCK_UNIVERSE)}] Scanning {ticker}...", end='\r')
-        res = analyze_intraday(ticker)
-        if res:
-            results.append(res)
+    # Today's 1m bars for the whole universe in one request (see bar_resampler)
+    prefetch_today(STOCK_UNIVERSE)
+    
+    # Volume curves are built once per session date; the scan only looks them up
+    try:
+        load_profiles(STOCK_UNIVERSE)
+    except Exception as e:
+        print(f"[WARN] Volume profiles unavailable, using linear projection: {e}")
+    
+    for progress in iter_scan(STOCK_UNIVERSE, analyze_intraday, chunk_size):
+        print(f"[{progress['done']}/{progress['total']}] Scanning {progress['ticker']}...", end='\r')
+        df = progress['results']
+        yield progress
             
     elapsed = time.time() - start_t
     print(f"\nScan completed in {elapsed:.1f}s")
     
     # Save & Show
-    if results:
-        df = pd.DataFrame(results)
-        df = df.sort_values('Score', ascending=False)
-        
+    if not df.empty:
         fname = f"intraday_momentum_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
         df.to_csv(fname, index=False)
         print(f"Found {len(df)} candidates. Saved to {fname}")
         print(df.head(10).to_string(index=False))
-        return df
     else:
         print("No candidates found.")
-        return pd.DataFrame()
+    yield {"done": len(STOCK_UNIVERSE), "total": len(STOCK_UNIVERSE), "results": df, "final": True}
+
+def run_intraday_screener():
+    df = pd.DataFrame()
+    for progress in iter_intraday_screener():
+        df = progress['results']
+    return df
 
 if __name__ == "__main__":
     run_intraday_screener()
@@ -0,0 +1,276 @@
+"""
+Market Breadth & Internals Module
+% above EMA20/50/200, advance/decline line, new highs/lows and
+up/down volume computed across the whole universe panel
+"""
+
+import time
+import pandas as pd
+import numpy as np
+
+EMA_PERIODS = (20, 50, 200)
+HIGH_LOW_WINDOW = 252  # 52-week new highs / lows
+HISTORY_PERIOD = "2y"  # Initial download (EMA200 warm-up)
+REFRESH_PERIOD = "5d"  # Incremental session refresh
+STATE_BARS = HIGH_LOW_WINDOW + 20  # Stored window, with slack for overlapping refreshes
+
+# ========================================
+# FULL COMPUTATION
+# ========================================
+
+def compute_breadth(panel):
+    """
+    Breadth internals for every date of a universe panel
+
+    Args:
+        panel: dict of wide DataFrames 'High', 'Low', 'Close', 'Volume'
+               (index = dates, columns = tickers), e.g. market_utils.download_panel
+
+    Returns:
+        dict with 'breadth' (DataFrame indexed by date) and 'state' (the
+        rolling state needed by update_breadth)
+    """
+    close = panel['Close'].sort_index()
+    emas = {p: close.ewm(span=p, adjust=False).mean() for p in EMA_PERIODS}
+    state = {
+        'close': close.iloc[-STATE_BARS:],
+        'high': panel['High'].reindex_like(close).iloc[-STATE_BARS:],
+        'low': panel['Low'].reindex_like(close).iloc[-STATE_BARS:],
+        'ema': {p: emas[p].iloc[-1] for p in EMA_PERIODS},
+    }
+    breadth = _breadth_rows(close, panel['High'].reindex_like(close),
+                            panel['Low'].reindex_like(close),
+                            panel['Volume'].reindex_like(close), emas)
+    state['ad_line'] = breadth['AD_Line'].iloc[-1] if not breadth.empty else 0.0
+    return {'breadth': breadth, 'state': state}
+
+def _breadth_rows(close, high, low, volume, emas, prev_close=None,
+                  hist_high=None, hist_low=None, ad_start=0.0):
+    """Vectorized breadth rows; optional history arguments support incremental updates"""
+    if prev_close is None:
+        prev_close = close.shift()
+    valid = close.notna()
+    n_valid = valid.sum(axis=1).replace(0, np.nan)
+
+    out = pd.DataFrame(index=close.index)
+    out['Issues'] = valid.sum(axis=1)
+    for p in EMA_PERIODS:
+        out[f'Pct_Above_EMA{p}'] = ((close > emas[p]).sum(axis=1) / n_valid * 100).round(1)
+
+    change = close - prev_close
+    out['Advancers'] = (change > 0).sum(axis=1)
+    out['Decliners'] = (change < 0).sum(axis=1)
+    out['AD_Line'] = ad_start + (out['Advancers'] - out['Decliners']).cumsum()
+
+    # Rolling 52-week extremes, optionally seeded with earlier history
+    full_high = pd.concat([hist_high, high]) if hist_high is not None else high
+    full_low = pd.concat([hist_low, low]) if hist_low is not None else low
+    roll_high = full_high.rolling(HIGH_LOW_WINDOW, min_periods=HIGH_LOW_WINDOW // 2).max().reindex(close.index)
+    roll_low = full_low.rolling(HIGH_LOW_WINDOW, min_periods=HIGH_LOW_WINDOW // 2).min().reindex(close.index)
+    out['New_Highs'] = (high >= roll_high).sum(axis=1)
+    out['New_Lows'] = (low <= roll_low).sum(axis=1)
+
+    up_vol = volume.where(change > 0, 0).sum(axis=1)
+    down_vol = volume.where(change < 0, 0).sum(axis=1)
+    out['Up_Volume'] = up_vol
+    out['Down_Volume'] = down_vol
+    out['UpDown_Vol_Ratio'] = (up_vol / down_vol.replace(0, np.nan)).round(2)
+    return out
+
+# ========================================
+# INCREMENTAL UPDATE
+# ========================================
+
+def update_breadth(result, new_panel):
+    """
+    Append new session bars without recomputing the full history
+
+    EMAs continue from their last values, the A/D line from its last level
+    and new highs/lows use the stored 52-week window. Bars already present
+    (e.g. today's partial bar) are replaced. Raises ValueError when the
+    refresh starts after a missing session (recompute with compute_breadth).
+    """
+    state = result['state']
+    breadth = result['breadth']
+    new_close = new_panel['Close'].sort_index()
+    if new_close.empty:
+        return result
+
+    # Overlapping bars: roll the state back to before the first new date
+    first_new = new_close.index[0]
+    if (breadth.index >= first_new).any():
+        return _rebuild_from_state(result, new_panel, first_new)
+
+    # Appending after a gap would silently drop the skipped sessions
+    if not breadth.empty and first_new > _next_session(breadth.index[-1]):
+        raise ValueError(f"Refresh starts {first_new.date()}, sessions after "
+                         f"{breadth.index[-1].date()} are missing; recompute with compute_breadth")
+
+    return _append(breadth, state, new_panel)
+
+def _next_session(date, max_days=30):
+    """First IDX trading day after date (as a Timestamp like the panel index)"""
+    from idx_calendar import is_trading_day
+    day = pd.Timestamp(date).normalize()
+    for _ in range(max_days):
+        day += pd.Timedelta(days=1)
+        if is_trading_day(day.date()):
+            break
+    return day
+
+def _append(breadth, state, new_panel):
+    close = new_panel['Close'].sort_index().reindex(columns=state['close'].columns)
+    high = new_panel['High'].reindex_like(close)
+    low = new_panel['Low'].reindex_like(close)
+    volume = new_panel['Volume'].reindex_like(close)
+
+    emas = {}
+    for p in EMA_PERIODS:
+        alpha = 2 / (p + 1)
+        seeded = pd.concat([state['ema'][p].to_frame().T, close])
+        emas[p] = seeded.ewm(alpha=alpha, adjust=False).mean().iloc[1:]
+        emas[p].index = close.index
+
+    prev_close = pd.concat([state['close'].iloc[[-1]], close]).shift().iloc[1:]
+    rows = _breadth_rows(close, high, low, volume, emas, prev_close=prev_close,
+                         hist_high=state['high'], hist_low=state['low'],
+                         ad_start=state['ad_line'])
+
+    new_state = {
+        'close': pd.concat([state['close'], close]).iloc[-STATE_BARS:],
+        'high': pd.concat([state['high'], high]).iloc[-STATE_BARS:],
+        'low': pd.concat([state['low'], low]).iloc[-STATE_BARS:],
+        'ema': {p: emas[p].iloc[-1] for p in EMA_PERIODS},
+        'ad_line': rows['AD_Line'].iloc[-1],
+    }
+    return {'breadth': pd.concat([breadth, rows]), 'state': new_state}
+
+def _rebuild_from_state(result, new_panel, first_new):
+    """Roll the state back to before first_new, then append"""
+    breadth = result['breadth']
+    state = result['state']
+    keep = breadth.index < first_new
+    n_drop = int((~keep).sum())
+    if n_drop >= len(state['close']):
+        raise ValueError("Refresh window exceeds stored state; recompute with compute_breadth")
+
+    # Undo the EMA recursion for the dropped bars: ema_prev = (ema - a*close) / (1 - a)
+    dropped_close = state['close'].iloc[-n_drop:]
+    emas = {}
+    for p in EMA_PERIODS:
+        alpha = 2 / (p + 1)
+        ema = state['ema'][p]
+        for i in range(n_drop - 1, -1, -1):
+            c = dropped_close.iloc[i]
+            ema = ((ema - alpha * c) / (1 - alpha)).where(c.notna(), ema)
+        emas[p] = ema
+
+    rolled = {
+        'close': state['close'].iloc[:-n_drop],
+        'high': state['high'].iloc[:-n_drop],
+        'low': state['low'].iloc[:-n_drop],
+        'ema': emas,
+        'ad_line': breadth['AD_Line'][keep].iloc[-1] if keep.any() else 0.0,
+    }
+    return _append(breadth[keep], rolled, new_panel)
+
+# ========================================
+# REGIME FROM BREADTH
+# ========================================
+
+def breadth_regime(breadth):
+    """
+    Regime dict derived from breadth, compatible with apply_regime_adjustment
+
+    Uses % above EMA50 as the primary gauge and the 10-day A/D slope as
+    confirmation.
+    """
+    if breadth is None or breadth.empty:
+        return {"regime": "UNKNOWN", "pct_above_ema50": 0, "pct_above_ema200": 0, "ad_slope": 0}
+
+    last = breadth.iloc[-1]
+    pct50 = last['Pct_Above_EMA50']
+    ad_slope = breadth['AD_Line'].iloc[-1] - breadth['AD_Line'].iloc[-min(10, len(breadth))]
+
+    if pct50 >= 60 and ad_slope > 0:
+        regime = "BULL"
+    elif pct50 >= 50:
+        regime = "BULL_WEAK"
+    elif pct50 >= 35:
+        regime = "BEAR_WEAK"
+    else:
+        regime = "BEAR"
+
+    return {
+        "regime": regime,
+        "pct_above_ema20": float(last['Pct_Above_EMA20']),
+        "pct_above_ema50": float(pct50),
+        "pct_above_ema200": float(last['Pct_Above_EMA200']),
+        "ad_line": float(last['AD_Line']),
+        "ad_slope": float(ad_slope),
+        "new_highs": int(last['New_Highs']),
+        "new_lows": int(last['New_Lows']),
+        "updown_vol_ratio": float(last['UpDown_Vol_Ratio']) if pd.notna(last['UpDown_Vol_Ratio']) else 0.0,
+    }
+
+# ========================================
+# CACHED SESSION STATE
+# ========================================
+
+_breadth_cache = None
+_breadth_timestamp = None
+_BREADTH_REFRESH_SECONDS = 900  # During sessions; frozen after close (idx_calendar)
+
+def get_cached_breadth(tickers=None):
+    """
+    Universe breadth with incremental refresh
+
+    The first call downloads HISTORY_PERIOD for the universe; later calls
+    only fetch REFRESH_PERIOD and append, at most every 15 minutes while
+    the market is open and not again until the next session after close.
+    A refresh that does not connect to the stored history (missed
+    sessions) falls back to a full HISTORY_PERIOD recompute.
+    """
+    global _breadth_cache, _breadth_timestamp
+    from idx_calendar import is_fresh
+    from market_utils import download_panel
+
+    if tickers is None:
+        from stock_universe import EXPANDED_UNIVERSE
+        tickers = EXPANDED_UNIVERSE
+
+    now = time.time()
+    if _breadth_cache is not None \
+            and is_fresh(_breadth_timestamp, "intraday", now, ttl=_BREADTH_REFRESH_SECONDS):
+        return _breadth_cache['breadth']
+
+    try:
+        if _breadth_cache is None:
+            panel = download_panel(tickers, period=HISTORY_PERIOD)
+            if panel:
+                _breadth_cache = compute_breadth(panel)
+        else:
+            panel = download_panel(tickers, period=REFRESH_PERIOD)
+            if panel:
+                try:
+                    _breadth_cache = update_breadth(_breadth_cache, panel)
+                except ValueError as e:
+                    print(f"[WARN] {e}")
+                    panel = download_panel(tickers, period=HISTORY_PERIOD)
+                    if panel:
+                        _breadth_cache = compute_breadth(panel)
+        _breadth_timestamp = now
+    except Exception as e:
+        print(f"[WARN] Breadth refresh failed: {e}")
+
+    return _breadth_cache['breadth'] if _breadth_cache is not None else pd.DataFrame()
+
+def get_breadth_regime(tickers=None):
+    """Breadth-based regime dict (alternative to market_utils.get_market_regime)"""
+    return breadth_regime(get_cached_breadth(tickers))
+
+if __name__ == "__main__":
+    breadth = get_cached_breadth()
+    print(breadth.tail(5).to_string())
+    info = breadth_regime(breadth)
+    print(f"Breadth Regime: {info['regime']} | >EMA50: {info['pct_above_ema50']}% | A/D slope: {info['ad_slope']}")
@@ -3,17 +3,19 @@ Market Regime & Risk Management Module
 Shared utilities for all screeners
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 
+from indicators import compute as compute_indicators, true_range
+
 def get_market_regime():
     """
     Determine current market regime based on IHSG (^JKSE) position vs 200 EMA
     Returns: dict with regime info
     """
     try:
-        ihsg = yf.download("^JKSE", period="1y", interval="1d", progress=False)
+        from corporate_actions import get_bars
+        ihsg = get_bars("^JKSE", period="1y")
         if ihsg.empty or len(ihsg) < 200:
             return {"regime": "UNKNOWN", "ema200": 0, "current": 0, "dist_pct": 0}
         
@@ -57,12 +59,7 @@ def calculate_atr_stop_loss(df, atr_multiplier=2.0):
     """
     try:
         # Calculate ATR (14 periods)
-        high_low = df['High'] - df['Low']
-        high_close = abs(df['High'] - df['Close'].shift())
-        low_close = abs(df['Low'] - df['Close'].shift())
-        
-        tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        atr = tr.rolling(14).mean().iloc[-1]
+        atr = compute_indicators(df, ['ATR14'])['ATR14'].iloc[-1]
         
         current_price = df['Close'].iloc[-1]
         stop_loss_price = current_price - (atr * atr_multiplier)
@@ -90,12 +87,103 @@ def calculate_atr_stop_loss(df, atr_multiplier=2.0):
             "risk_reward": "N/A"
         }
 
+def calculate_atr_panel(high, low, close, period=14):
+    """
+    Vectorized ATR for a whole universe panel
+    
+    Same True Range / rolling-mean definition as calculate_atr_stop_loss,
+    applied column-wise to wide frames (index = dates, columns = tickers).
+    """
+    return true_range(high, low, close).rolling(period).mean()
+
+def calculate_atr_levels_panel(high, low, close, atr_multiplier=2.0, period=14):
+    """
+    Panel version of calculate_atr_stop_loss
+    
+    Returns:
+        dict of wide DataFrames: atr, stop_loss, target (Risk:Reward = 1:2)
+    """
+    atr = calculate_atr_panel(high, low, close, period)
+    return {
+        "atr": atr,
+        "stop_loss": (close - atr * atr_multiplier).round(0),
+        "target": (close + atr * atr_multiplier * 2).round(0),
+    }
+
+def download_panel(tickers, period="1y", interval="1d", auto_adjust=True, validate=True):
+    """
+    Download OHLCV for many tickers in one request
+    
+    With validate, daily bars go through data_quality.validate_panel
+    (repaired / quarantined, health recorded per ticker).
+    
+    Returns:
+        dict of wide DataFrames keyed by field ('Open', 'High', 'Low',
+        'Close', 'Volume'), index = dates, columns = tickers
+    """
+    import yfinance as yf
+    
+    tickers = list(tickers)
+    raw = yf.download(tickers, period=period, interval=interval, progress=False,
+                      group_by='column', auto_adjust=auto_adjust, threads=True)
+    if raw.empty:
+        return {}
+    
+    panel = {}
+    for field in ['Open', 'High', 'Low', 'Close', 'Volume']:
+        if isinstance(raw.columns, pd.MultiIndex):
+            if field not in raw.columns.get_level_values(0):
+                continue
+            frame = raw[field]
+        else:
+            frame = raw[[field]].rename(columns={field: tickers[0]})
+        panel[field] = frame.reindex(columns=tickers).astype(float)
+    
+    if validate and interval == "1d" and len(panel) == 5:
+        from data_quality import record_health, validate_panel
+        panel, report = validate_panel(panel)
+        record_health(report)
+    return panel
+
+# Default number of tickers per progress update for streaming scans
+SCAN_CHUNK_SIZE = 10
+
+def iter_scan(tickers, analyze_fn, chunk_size=SCAN_CHUNK_SIZE, sort_col='Score'):
+    """
+    Run a per-ticker analyze function and yield partial results per chunk
+    
+    Args:
+        tickers: list of tickers to scan
+        analyze_fn: callable(ticker) -> result dict or None
+        chunk_size: tickers per progress update
+        sort_col: column used to order the partial table
+    
+    Yields:
+        dict with done, total, ticker (last scanned) and results
+        (DataFrame of all hits so far, best first)
+    """
+    results = []
+    total = len(tickers)
+    for i, ticker in enumerate(tickers, 1):
+        res = analyze_fn(ticker)
+        if res:
+            results.append(res)
+        if i % chunk_size == 0 or i == total:
+            df = pd.DataFrame(results)
+            if sort_col in df.columns:
+                df = df.sort_values(sort_col, ascending=False).reset_index(drop=True)
+            yield {"done": i, "total": total, "ticker": ticker, "results": df}
+
 def apply_regime_adjustment(score, regime_info):
     """
     Adjust score based on market regime
     
     Bull market: Boost momentum/trend strategies
     Bear market: Boost defensive/value strategies
+
+    regime_info can come from get_market_regime (IHSG vs EMA200) or
+    market_breadth.get_breadth_regime (universe internals) - both use
+    the same BULL / BULL_WEAK / BEAR_WEAK / BEAR labels.
     """
     regime = regime_info["regime"]
     
@@ -114,16 +202,26 @@ def apply_regime_adjustment(score, regime_info):
 _market_regime_cache = None
 _cache_timestamp = None
 
-def get_cached_market_regime():
-    """Get market regime with caching (valid for 1 day)"""
+def get_cached_market_regime(source="ihsg"):
+    """
+    Get market regime with caching (valid until the next daily bar -
+    see idx_calendar.valid_until)
+
+    source: "ihsg" (index vs EMA200) or "breadth" (universe internals,
+    refreshed incrementally by market_breadth)
+    """
     global _market_regime_cache, _cache_timestamp
     import time
-    from datetime import datetime
-    
+    from idx_calendar import is_fresh
+
+    if source == "breadth":
+        from market_breadth import get_breadth_regime
+        return get_breadth_regime()
+
     now = time.time()
     
-    # Refresh cache if stale (> 1 day old) or doesn't exist
-    if _market_regime_cache is None or _cache_timestamp is None or (now - _cache_timestamp) > 86400:
+    # Refresh cache if a new daily bar has started since it was fetched
+    if _market_regime_cache is None or not is_fresh(_cache_timestamp, "daily", now):
         _market_regime_cache = get_market_regime()
         _cache_timestamp = now
     
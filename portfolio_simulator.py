@@ -0,0 +1,282 @@
+"""
+Portfolio Simulator - Event-driven backtest of screener signals
+Enter at next open, exit on ATR stop / target / max hold using daily High/Low
+"""
+
+import sys
+import pandas as pd
+import numpy as np
+
+import config_swing as cfg
+from market_utils import calculate_atr_levels_panel
+
+# ========================================
+# DEFAULT PARAMETERS
+# ========================================
+INITIAL_CAPITAL = 100_000_000  # 100M IDR
+MAX_POSITIONS = cfg.BACKTEST_TOP_N
+POSITION_PCT = 1.0 / cfg.BACKTEST_TOP_N  # Fraction of equity per new position
+LOT_SIZE = 100  # IDX board lot
+ATR_MULTIPLIER = 2.0
+
+EXIT_STOP = "STOP"
+EXIT_TARGET = "TARGET"
+EXIT_TIME = "MAX_HOLD"
+EXIT_END = "END_OF_DATA"
+
+# ========================================
+# SIGNAL NORMALIZATION
+# ========================================
+
+def _match_ticker(ticker, columns):
+    """Map screener ticker ('BBCA' or 'BBCA.JK') onto a panel column"""
+    if ticker in columns:
+        return ticker
+    alt = ticker + ".JK" if not ticker.endswith(".JK") else ticker[:-3]
+    return alt if alt in columns else None
+
+def normalize_signals(signals, score_col="Score"):
+    """
+    Normalize screener output into one long signal table
+
+    Args:
+        signals: DataFrame with Date/Ticker/Score (+ optional StopLoss/Target),
+                 or dict {date: daily screener DataFrame}
+
+    Returns:
+        DataFrame with columns Date, Ticker, Score, StopLoss, Target
+    """
+    if isinstance(signals, dict):
+        frames = []
+        for date, df in signals.items():
+            if df is None or df.empty:
+                continue
+            df = df.copy()
+            df['Date'] = date
+            frames.append(df)
+        signals = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    if signals is None or signals.empty:
+        return pd.DataFrame(columns=['Date', 'Ticker', 'Score', 'StopLoss', 'Target'])
+
+    out = pd.DataFrame({
+        'Date': pd.to_datetime(signals['Date']).dt.normalize(),
+        'Ticker': signals['Ticker'].astype(str),
+        'Score': signals[score_col].astype(float) if score_col in signals.columns else 0.0,
+    })
+    for col in ['StopLoss', 'Target']:
+        out[col] = pd.to_numeric(signals[col], errors='coerce') if col in signals.columns else np.nan
+    return out.reset_index(drop=True)
+
+# ========================================
+# SIMULATION
+# ========================================
+
+def simulate_portfolio(signals, prices,
+                       initial_capital=INITIAL_CAPITAL,
+                       max_positions=MAX_POSITIONS,
+                       position_pct=POSITION_PCT,
+                       max_hold_days=cfg.BACKTEST_HOLD_DAYS,
+                       cost_bps=cfg.BACKTEST_COST_BPS,
+                       lot_size=LOT_SIZE,
+                       atr_multiplier=ATR_MULTIPLIER,
+                       score_col="Score"):
+    """
+    Simulate a long-only portfolio from daily screener signals
+
+    A signal dated D is entered at the open of the next bar. Each day the
+    open positions are checked against that bar's Low/High: stop first
+    (conservative when both are touched), then target, then max hold exit
+    at the close. Signals without StopLoss/Target use the ATR levels from
+    market_utils computed on the signal day.
+
+    Args:
+        signals: screener output (see normalize_signals)
+        prices: dict of wide DataFrames 'Open', 'High', 'Low', 'Close'
+                (index = dates, columns = tickers), e.g. market_utils.download_panel
+        initial_capital: starting cash in IDR
+        max_positions: maximum concurrent positions
+        position_pct: fraction of current equity allocated per entry
+        max_hold_days: bars held before forced exit (entry bar counts as 1)
+        cost_bps: round-trip transaction cost, split evenly between entry and exit
+        lot_size: share rounding (IDX lot = 100)
+
+    Returns:
+        dict with 'trades' (DataFrame), 'equity' (DataFrame) and 'summary' (dict)
+    """
+    close_df = prices['Close'].sort_index()
+    dates = close_df.index
+    tickers = list(close_df.columns)
+    opens = prices['Open'].reindex(index=dates, columns=tickers).to_numpy(dtype=float)
+    highs = prices['High'].reindex(index=dates, columns=tickers).to_numpy(dtype=float)
+    lows = prices['Low'].reindex(index=dates, columns=tickers).to_numpy(dtype=float)
+    closes = close_df.to_numpy(dtype=float)
+    n_days = len(dates)
+
+    # --- Signals -> (day index, ticker index) arrays ---
+    sig = normalize_signals(signals, score_col)
+    col_map = {t: i for i, t in enumerate(tickers)}
+    sig['tix'] = [col_map.get(_match_ticker(t, col_map), -1) for t in sig['Ticker']]
+    sig['dix'] = dates.searchsorted(sig['Date'].to_numpy(), side='right') - 1
+    sig = sig[(sig['tix'] >= 0) & (sig['dix'] >= 0) & (sig['dix'] < n_days - 1)]
+
+    # Fill missing risk levels from the ATR panel on the signal day
+    missing = sig['StopLoss'].isna() | sig['Target'].isna()
+    if missing.any():
+        levels = calculate_atr_levels_panel(
+            prices['High'].reindex(index=dates, columns=tickers),
+            prices['Low'].reindex(index=dates, columns=tickers),
+            close_df, atr_multiplier=atr_multiplier)
+        d, t = sig.loc[missing, 'dix'].to_numpy(), sig.loc[missing, 'tix'].to_numpy()
+        sig.loc[missing, 'StopLoss'] = sig.loc[missing, 'StopLoss'].fillna(
+            pd.Series(levels['stop_loss'].to_numpy()[d, t], index=sig.index[missing]))
+        sig.loc[missing, 'Target'] = sig.loc[missing, 'Target'].fillna(
+            pd.Series(levels['target'].to_numpy()[d, t], index=sig.index[missing]))
+
+    # Best score first within each day; entries happen on dix + 1
+    sig = sig.sort_values(['dix', 'Score'], ascending=[True, False])
+    sig_day = sig['dix'].to_numpy() + 1
+    sig_tix = sig['tix'].to_numpy()
+    sig_stop = sig['StopLoss'].to_numpy(dtype=float)
+    sig_target = sig['Target'].to_numpy(dtype=float)
+    day_start = np.searchsorted(sig_day, np.arange(n_days), side='left')
+    day_end = np.searchsorted(sig_day, np.arange(n_days), side='right')
+
+    # --- Position book (fixed capacity arrays) ---
+    pos_tix = np.full(max_positions, -1, dtype=np.int64)
+    pos_shares = np.zeros(max_positions)
+    pos_entry = np.zeros(max_positions)
+    pos_stop = np.zeros(max_positions)
+    pos_target = np.zeros(max_positions)
+    pos_day = np.zeros(max_positions, dtype=np.int64)
+
+    half_cost = cost_bps / 10_000 / 2
+    cash = float(initial_capital)
+    last_close = close_df.ffill().to_numpy(dtype=float)
+
+    trades = []
+    equity = np.zeros(n_days)
+
+    for day in range(n_days):
+        active = pos_tix >= 0
+
+        # 1. Entries at today's open
+        if day_start[day] < day_end[day]:
+            held_value = (pos_shares[active] * last_close[day - 1, pos_tix[active]]).sum() if day > 0 else 0.0
+            equity_now = cash + np.nan_to_num(held_value)
+            for k in range(day_start[day], day_end[day]):
+                free = np.flatnonzero(pos_tix < 0)
+                if free.size == 0:
+                    break
+                tix = sig_tix[k]
+                if (pos_tix == tix).any():
+                    continue
+                price = opens[day, tix]
+                if not np.isfinite(price) or price <= 0:
+                    continue
+                budget = min(equity_now * position_pct, cash)
+                shares = np.floor(budget / (price * (1 + half_cost)) / lot_size) * lot_size
+                if shares <= 0:
+                    continue
+                slot = free[0]
+                cash -= shares * price * (1 + half_cost)
+                pos_tix[slot] = tix
+                pos_shares[slot] = shares
+                pos_entry[slot] = price
+                pos_stop[slot] = sig_stop[k] if np.isfinite(sig_stop[k]) else 0.0
+                pos_target[slot] = sig_target[k] if np.isfinite(sig_target[k]) else np.inf
+                pos_day[slot] = day
+
+        # 2. Exits against today's bar (vectorized over the book)
+        active = np.flatnonzero(pos_tix >= 0)
+        if active.size:
+            tix = pos_tix[active]
+            o, h, l, c = opens[day, tix], highs[day, tix], lows[day, tix], closes[day, tix]
+            has_bar = np.isfinite(l) & np.isfinite(h)
+            hit_stop = has_bar & (l <= pos_stop[active])
+            hit_target = has_bar & ~hit_stop & (h >= pos_target[active])
+            held = day - pos_day[active] + 1
+            timed_out = has_bar & ~hit_stop & ~hit_target & (held >= max_hold_days)
+            last_day = (day == n_days - 1) & ~(hit_stop | hit_target | timed_out)
+
+            # Gaps through the level fill at the open
+            stop_px = np.where(o < pos_stop[active], o, pos_stop[active])
+            target_px = np.where(o > pos_target[active], o, pos_target[active])
+            exit_px = np.select([hit_stop, hit_target, timed_out | last_day],
+                                [stop_px, target_px, np.where(np.isfinite(c), c, last_close[day, tix])],
+                                np.nan)
+            reason = np.select([hit_stop, hit_target, timed_out, last_day],
+                               [EXIT_STOP, EXIT_TARGET, EXIT_TIME, EXIT_END], "")
+
+            for j in np.flatnonzero(reason != ""):
+                slot = active[j]
+                proceeds = pos_shares[slot] * exit_px[j] * (1 - half_cost)
+                cost_basis = pos_shares[slot] * pos_entry[slot] * (1 + half_cost)
+                cash += proceeds
+                trades.append({
+                    'Ticker': tickers[pos_tix[slot]],
+                    'EntryDate': dates[pos_day[slot]],
+                    'EntryPrice': pos_entry[slot],
+                    'ExitDate': dates[day],
+                    'ExitPrice': round(float(exit_px[j]), 2),
+                    'Shares': int(pos_shares[slot]),
+                    'StopLoss': pos_stop[slot],
+                    'Target': pos_target[slot] if np.isfinite(pos_target[slot]) else np.nan,
+                    'HoldDays': int(held[j]),
+                    'ExitReason': str(reason[j]),
+                    'PnL': round(proceeds - cost_basis, 0),
+                    'Return_%': round((proceeds / cost_basis - 1) * 100, 2),
+                })
+                pos_tix[slot] = -1
+                pos_shares[slot] = 0.0
+
+        # 3. Mark to market at the close
+        active = pos_tix >= 0
+        held_value = (pos_shares[active] * last_close[day, pos_tix[active]]).sum()
+        equity[day] = cash + np.nan_to_num(held_value)
+
+    trades_df = pd.DataFrame(trades)
+    equity_df = pd.DataFrame({'Equity': equity}, index=dates)
+    equity_df['Drawdown_%'] = (equity_df['Equity'] / equity_df['Equity'].cummax() - 1) * 100
+
+    return {
+        'trades': trades_df,
+        'equity': equity_df,
+        'summary': summarize(trades_df, equity_df, initial_capital)
+    }
+
+def summarize(trades_df, equity_df, initial_capital=INITIAL_CAPITAL):
+    """Headline statistics for a simulation run"""
+    final = float(equity_df['Equity'].iloc[-1]) if not equity_df.empty else initial_capital
+    summary = {
+        "trades": len(trades_df),
+        "final_equity": round(final, 0),
+        "total_return_%": round((final / initial_capital - 1) * 100, 2),
+        "max_drawdown_%": round(float(equity_df['Drawdown_%'].min()), 2) if not equity_df.empty else 0,
+        "win_rate_%": 0,
+        "avg_return_%": 0,
+        "exits": {},
+    }
+    if not trades_df.empty:
+        summary["win_rate_%"] = round(float((trades_df['PnL'] > 0).mean()) * 100, 1)
+        summary["avg_return_%"] = round(float(trades_df['Return_%'].mean()), 2)
+        summary["exits"] = {str(k): int(v) for k, v in trades_df['ExitReason'].value_counts().items()}
+    return summary
+
+if __name__ == "__main__":
+    # Usage: python portfolio_simulator.py signals.csv  (needs Date, Ticker, Score columns)
+    if len(sys.argv) < 2:
+        print("Usage: python portfolio_simulator.py <signals.csv>")
+        sys.exit(1)
+
+    from market_utils import download_panel
+
+    signals = pd.read_csv(sys.argv[1])
+    tickers = sorted({t if t.endswith(".JK") else t + ".JK" for t in signals['Ticker'].astype(str)})
+    print(f"[INFO] Loading prices for {len(tickers)} tickers...")
+    prices = download_panel(tickers, period="2y")
+
+    result = simulate_portfolio(signals, prices)
+    s = result['summary']
+    print(f"Trades: {s['trades']} | Return: {s['total_return_%']}% | MaxDD: {s['max_drawdown_%']}%")
+    print(f"Win rate: {s['win_rate_%']}% | Avg trade: {s['avg_return_%']}% | Exits: {s['exits']}")
@@ -0,0 +1,213 @@
+"""
+Cross-Sectional Ranking Engine
+Universe-wide returns, percentile ranks (RS 1-99) and rank z-scores
+"""
+
+import time
+
+import pandas as pd
+import numpy as np
+
+# Return horizons in trading days (1M, 3M, 6M, 9M, 12M)
+RETURN_HORIZONS = (21, 63, 126, 189, 252)
+
+# IBD-style weighting: most recent quarter counts double
+RS_WEIGHTS = {63: 0.4, 126: 0.2, 189: 0.2, 252: 0.2}
+
+RS_MIN = 1
+RS_MAX = 99
+
+# ========================================
+# RETURNS
+# ========================================
+
+def compute_returns(close, horizons=RETURN_HORIZONS):
+    """
+    Multi-horizon returns for the whole panel in one pass
+
+    Args:
+        close: wide DataFrame (index = dates, columns = tickers)
+        horizons: lookbacks in bars
+
+    Returns:
+        dict {horizon: wide DataFrame of % returns}
+    """
+    values = close.to_numpy(dtype=float)
+    out = {}
+    for h in horizons:
+        ret = np.full_like(values, np.nan)
+        if h < len(values):
+            ret[h:] = (values[h:] / values[:-h] - 1) * 100
+        out[h] = pd.DataFrame(ret, index=close.index, columns=close.columns)
+    return out
+
+# ========================================
+# RANKS
+# ========================================
+
+def percentile_rank(frame, low=RS_MIN, high=RS_MAX):
+    """
+    Row-wise percentile rank scaled to [low, high]
+
+    Works on a wide frame (each date ranked across tickers) or a Series
+    (one cross-section). NaNs stay NaN and do not count towards the universe.
+    """
+    if isinstance(frame, pd.Series):
+        pct = frame.rank(pct=True, method='average')
+    else:
+        pct = frame.rank(axis=1, pct=True, method='average')
+    return (low + (high - low) * pct).round()
+
+# Wichura (1988) AS241 rational approximations, highest power first (the
+# coefficients statistics.NormalDist.inv_cdf uses), for a vectorized inverse
+# normal CDF: about 1e-16 relative error for 0 < p < 1
+_AS241_CENTRAL = (
+    [2.5090809287301226727e+3, 3.3430575583588128105e+4, 6.7265770927008700853e+4,
+     4.5921953931549871457e+4, 1.3731693765509461125e+4, 1.9715909503065514427e+3,
+     1.3314166789178437745e+2, 3.3871328727963666080e+0],
+    [5.2264952788528545610e+3, 2.8729085735721942674e+4, 3.9307895800092710610e+4,
+     2.1213794301586595867e+4, 5.3941960214247511077e+3, 6.8718700749205790830e+2,
+     4.2313330701600911252e+1, 1.0],
+)
+_AS241_INTERMEDIATE = (
+    [7.7454501427834140764e-4, 2.2723844989269184583e-2, 2.4178072517745061177e-1,
+     1.2704582524523683826e+0, 3.6478483247632046050e+0, 5.7694972214606914055e+0,
+     4.6303378461565452959e+0, 1.4234371107496835773e+0],
+    [1.0507500716444168432e-9, 5.4759380849953449460e-4, 1.5198666563616457197e-2,
+     1.4810397642748007459e-1, 6.8976733498510000455e-1, 1.6763848301838038494e+0,
+     2.0531916266377588219e+0, 1.0],
+)
+_AS241_TAIL = (
+    [2.0103343992922881327e-7, 2.7115555687434875782e-5, 1.2426609473880784386e-3,
+     2.6532189526576123093e-2, 2.9656057182850489123e-1, 1.7848265399172913358e+0,
+     5.4637849111641143699e+0, 6.6579046435011037772e+0],
+    [2.0442631033899397856e-15, 1.4215117583164458887e-7, 1.8463183175100546818e-5,
+     7.8686913114561329059e-4, 1.4875361290850614853e-2, 1.3692988092273580531e-1,
+     5.9983220655588793769e-1, 1.0],
+)
+
+def norm_ppf(p):
+    """Inverse standard normal CDF of an array of probabilities in (0, 1)"""
+    p = np.asarray(p, dtype=float)
+    q = p - 0.5
+    z = np.full_like(p, np.nan)
+
+    central = np.abs(q) <= 0.425
+    r = 0.180625 - q[central] ** 2
+    num, den = _AS241_CENTRAL
+    z[central] = q[central] * np.polyval(num, r) / np.polyval(den, r)
+
+    tails = ~central & (p > 0) & (p < 1)
+    r = np.sqrt(-np.log(np.minimum(p[tails], 1.0 - p[tails])))
+    x = np.empty_like(r)
+    for mask, shift, (num, den) in ((r <= 5.0, 1.6, _AS241_INTERMEDIATE),
+                                    (r > 5.0, 5.0, _AS241_TAIL)):
+        x[mask] = np.polyval(num, r[mask] - shift) / np.polyval(den, r[mask] - shift)
+    z[tails] = np.where(q[tails] < 0, -x, x)
+    return z
+
+def rank_zscore(frame):
+    """
+    Rank-based z-score (inverse normal of the cross-sectional rank)
+
+    Robust to outliers: a 300% gap-up and a 30% gain only differ by rank.
+    """
+    is_series = isinstance(frame, pd.Series)
+    if is_series:
+        u = (frame.rank(method='average') - 0.5) / frame.notna().sum()
+    else:
+        u = (frame.rank(axis=1, method='average') - 0.5).div(frame.notna().sum(axis=1), axis=0)
+
+    z = norm_ppf(u.to_numpy(dtype=float))
+    if is_series:
+        return pd.Series(z, index=frame.index)
+    return pd.DataFrame(z, index=frame.index, columns=frame.columns)
+
+def rs_score_panel(close, weights=RS_WEIGHTS):
+    """
+    Weighted multi-horizon return for every date and ticker (the RS score
+    before ranking). Horizons without enough history are dropped and the
+    remaining weights renormalized per cell.
+    """
+    returns = compute_returns(close, tuple(weights))
+    num = np.zeros(close.shape)
+    den = np.zeros(close.shape)
+    for h, w in weights.items():
+        r = returns[h].to_numpy()
+        ok = np.isfinite(r)
+        num += np.where(ok, r * w, 0.0)
+        den += np.where(ok, w, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        score = np.where(den > 0, num / den, np.nan)
+    return pd.DataFrame(score, index=close.index, columns=close.columns)
+
+def rs_rating_panel(close, weights=RS_WEIGHTS):
+    """Universe RS rating (1-99) for every date and ticker: rs_score_panel ranked across the universe each day"""
+    return percentile_rank(rs_score_panel(close, weights))
+
+def latest_rs_ratings(close, weights=RS_WEIGHTS):
+    """RS rating (1-99) for the last bar only, as a Series keyed by ticker"""
+    if close.empty:
+        return pd.Series(dtype=float)
+    return rs_rating_panel(close.iloc[-(max(weights) + 1):], weights).iloc[-1]
+
+def rank_features(df, columns, suffix_pct="_Pct", suffix_z="_Z"):
+    """
+    Add percentile rank and rank z-score columns to a screener result table
+
+    Example: rank_features(df, ['Rel_Vol', 'CMF']) adds Rel_Vol_Pct, Rel_Vol_Z, ...
+    """
+    df = df.copy()
+    for col in columns:
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors='coerce')
+        df[f"{col}{suffix_pct}"] = percentile_rank(values)
+        df[f"{col}{suffix_z}"] = rank_zscore(values).round(3)
+    return df
+
+# ========================================
+# CACHED UNIVERSE RS
+# ========================================
+
+_rs_cache = {}
+
+def get_cached_rs_panels(tickers, period="2y"):
+    """
+    Universe RS panels with caching (valid until the next daily bar):
+    {'rating': RS 1-99, 'z': rank z-score of the RS score}, each a
+    dates x tickers frame
+
+    Downloads the whole universe in one request so every screener can look
+    up a ticker's rank on any day without re-fetching (spec_engine exposes
+    them as the RS_Rank / RS_Z features of specs with 'ranks').
+    """
+    from idx_calendar import is_fresh
+    from market_utils import download_panel
+
+    key = (tuple(sorted(tickers)), period)
+    now = time.time()
+    cached = _rs_cache.get(key)
+    if cached is None or not is_fresh(cached[0], "daily", now):
+        panels = {'rating': pd.DataFrame(), 'z': pd.DataFrame()}
+        try:
+            panel = download_panel(list(key[0]), period=period)
+            if panel:
+                score = rs_score_panel(panel['Close'])
+                panels = {'rating': percentile_rank(score), 'z': rank_zscore(score)}
+        except Exception as e:
+            print(f"[WARN] RS ranking failed: {e}")
+        cached = (now, panels)
+        _rs_cache[key] = cached
+    return cached[1]
+
+def get_cached_rs_ratings(tickers, period="2y"):
+    """Latest universe RS ratings (1-99) keyed by ticker (see get_cached_rs_panels)"""
+    rating = get_cached_rs_panels(tickers, period)['rating']
+    return rating.iloc[-1] if not rating.empty else pd.Series(dtype=float)
+
+if __name__ == "__main__":
+    from stock_universe import LQ45_TICKERS
+
+    ratings = get_cached_rs_ratings(LQ45_TICKERS)
+    print(ratings.sort_values(ascending=False).head(10).to_string())
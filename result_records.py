@@ -0,0 +1,333 @@
+"""
+Compact Result Records
+Screener results packed into NumPy structured arrays: text columns become
+integer codes into per-column tables and reason lists become a uint64
+bitmask with a decode table (the same idea as stock_universe's index
+flags). A date x ticker history of scans is one preallocated 2-D array,
+saved and loaded as .npz (or exported as an Arrow record batch).
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+REASON_COLUMNS = ('Reasons', 'Reason', 'ReasonCodes')
+MAX_REASON_CODES = 64
+MISSING_CODE = -1
+
+# ========================================
+# REASON BITMASK
+# ========================================
+
+def reason_separator(values):
+    """'|' (idx_swing / vwap_pro style) if any value uses it, else ', '"""
+    text = pd.Series(values, dtype=object).dropna().astype(str)
+    return "|" if text.str.contains("|", regex=False).any() else ", "
+
+def reason_table(codes=(), sep=None):
+    """
+    Decode table: codes (bit i = codes[i]), order (how decoded codes are
+    joined, e.g. the screener's rule order) and separator
+    """
+    return {'codes': list(codes), 'order': list(codes), 'sep': sep}
+
+def _merge_order(order, parts):
+    """Decode order consistent with every observed reason string (first-seen on ties)"""
+    from graphlib import CycleError, TopologicalSorter
+
+    graph = {code: set() for code in order}
+    for a, b in zip(order, order[1:]):
+        graph[b].add(a)
+    same_row = parts.index.to_numpy()[1:] == parts.index.to_numpy()[:-1]
+    values = parts.to_numpy()
+    pairs = pd.DataFrame({'a': values[:-1][same_row], 'b': values[1:][same_row]}).drop_duplicates()
+    for a, b in zip(pairs['a'], pairs['b']):
+        graph.setdefault(b, set()).add(a)
+        graph.setdefault(a, set())
+    seen = list(dict.fromkeys(list(order) + list(pd.unique(values))))
+    for code in seen:
+        graph.setdefault(code, set())
+    rank = {code: i for i, code in enumerate(seen)}
+    try:
+        sorter = TopologicalSorter(graph)
+        sorter.prepare()
+        merged = []
+        while sorter.is_active():
+            ready = sorted(sorter.get_ready(), key=rank.get)
+            merged.extend(ready)
+            sorter.done(*ready)
+        return merged
+    except CycleError:
+        return seen
+
+def encode_reasons(values, table=None):
+    """
+    Reason strings -> uint64 bitmasks
+
+    Args:
+        values: reason strings such as "EMA_Flow, VolUp, Green"
+        table: reason_table to extend in place (separator detected if unset)
+
+    Returns:
+        (masks, table); missing values encode as 0
+    """
+    table = reason_table() if table is None else table
+    if table['sep'] is None:
+        table['sep'] = reason_separator(values)
+    # Reason strings repeat across rows: split each distinct string once
+    rows, distinct = pd.factorize(pd.Series(values, dtype=object))
+    parts = pd.Series(distinct, dtype=object).astype(str).str.split(table['sep'], regex=False).explode().str.strip()
+    parts = parts[parts.notna() & (parts != "")]
+    codes = table['codes']
+    for code in pd.unique(parts):
+        if code not in codes:
+            codes.append(code)
+    if len(codes) > MAX_REASON_CODES:
+        raise ValueError(f"More than {MAX_REASON_CODES} distinct reason codes")
+    table['order'] = _merge_order(table['order'], parts)
+    bit = {code: np.uint64(1) << np.uint64(i) for i, code in enumerate(codes)}
+
+    distinct_masks = np.zeros(len(distinct) + 1, dtype=np.uint64)  # last slot: missing
+    if len(parts):
+        np.bitwise_or.at(distinct_masks, parts.index.to_numpy(), parts.map(bit).to_numpy(dtype=np.uint64))
+    return distinct_masks[rows], table
+
+def decode_reasons(masks, table):
+    """uint64 bitmasks -> reason strings in the table's order (0 -> NaN)"""
+    masks = np.asarray(masks, dtype=np.uint64)
+    out = np.full(masks.shape, np.nan, dtype=object)
+    bits = [(code, np.uint64(1) << np.uint64(table['codes'].index(code))) for code in table['order']]
+    sep = table['sep'] or ", "
+    cache = {value: sep.join(code for code, bit in bits if value & bit)
+             for value in np.unique(masks[masks != 0])}
+    nonzero = masks != 0
+    out[nonzero] = [cache[v] for v in masks[nonzero]]
+    return out
+
+def has_reason(masks, table, code):
+    """Boolean array: rows whose mask includes code"""
+    if code not in table['codes']:
+        return np.zeros(np.shape(masks), dtype=bool)
+    return (np.asarray(masks, dtype=np.uint64) & (np.uint64(1) << np.uint64(table['codes'].index(code)))) != 0
+
+# ========================================
+# PACK / UNPACK (one scan)
+# ========================================
+
+def _column_kind(name, values):
+    if pd.api.types.is_bool_dtype(values):
+        return 'value', np.bool_
+    if pd.api.types.is_integer_dtype(values) or pd.api.types.is_float_dtype(values) \
+            or pd.api.types.is_datetime64_dtype(values):
+        return 'value', values.dtype
+    if name in REASON_COLUMNS:
+        return 'reasons', np.uint64
+    return 'code', np.int32
+
+def pack_results(df, tables=None, reasons=None, float_dtype=None):
+    """
+    Result DataFrame -> packed dict
+
+    Args:
+        df: screener result table
+        tables / reasons: decode tables to share (and extend) across scans;
+            seed reasons with reason_table(rule_codes) to fix bit numbers
+        float_dtype: e.g. np.float32 to halve float columns (lossy)
+
+    Returns:
+        dict with records (structured array), columns (original order),
+        tables {column: [values]} and reasons {column: reason_table}
+    """
+    tables = {} if tables is None else tables
+    reasons = {} if reasons is None else reasons
+    fields, arrays = [], []
+    for col in df.columns:
+        values = df[col]
+        kind, dtype = _column_kind(col, values)
+        if kind == 'reasons':
+            masks, reasons[col] = encode_reasons(values, reasons.get(col))
+            arrays.append(masks)
+        elif kind == 'code':
+            table = tables.setdefault(col, [])
+            lookup = {v: i for i, v in enumerate(table)}
+            present = values.notna().to_numpy()
+            for v in pd.unique(values[present]):
+                if v not in lookup:
+                    lookup[v] = len(table)
+                    table.append(v)
+            codes = np.full(len(values), MISSING_CODE, dtype=np.int32)
+            codes[present] = values[present].map(lookup).to_numpy(dtype=np.int32)
+            arrays.append(codes)
+        else:
+            if float_dtype is not None and pd.api.types.is_float_dtype(values):
+                dtype = float_dtype
+            arrays.append(values.to_numpy(dtype=dtype))
+        fields.append((col, dtype))
+
+    records = np.empty(len(df), dtype=fields)
+    for (col, _), arr in zip(fields, arrays):
+        records[col] = arr
+    return {'records': records, 'columns': list(df.columns), 'tables': tables, 'reasons': reasons}
+
+def _unpack_field(packed, col, values):
+    if col in packed['reasons']:
+        return decode_reasons(values, packed['reasons'][col])
+    if col in packed['tables']:
+        table = np.array(packed['tables'][col] + [np.nan], dtype=object)
+        return table[np.where(values == MISSING_CODE, len(table) - 1, values)]
+    return values
+
+def unpack_results(packed):
+    """Packed dict -> DataFrame with the original columns and values"""
+    records = packed['records']
+    return pd.DataFrame({col: _unpack_field(packed, col, records[col]) for col in packed['columns']})
+
+# ========================================
+# DATE x TICKER HISTORY
+# ========================================
+
+def allocate_history(dates, tickers, dtype):
+    """
+    Empty history: records of shape (dates, tickers) plus a 'present' flag
+
+    Floats start as NaN, codes as MISSING_CODE, masks / ints / flags as 0.
+    """
+    dtype = np.dtype([('present', np.bool_)] + [(n, dtype.fields[n][0]) for n in dtype.names if n != 'present'])
+    records = np.zeros((len(dates), len(tickers)), dtype=dtype)
+    for name in dtype.names:
+        kind = dtype.fields[name][0].kind
+        if kind == 'f':
+            records[name] = np.nan
+        elif kind == 'M':
+            records[name] = np.datetime64('NaT')
+    return {'records': records, 'dates': pd.DatetimeIndex(dates), 'tickers': pd.Index(tickers),
+            'columns': [n for n in dtype.names if n != 'present'], 'tables': {}, 'reasons': {}}
+
+def history_from_long(df, date_col='Date', ticker_col='Ticker', float_dtype=None):
+    """
+    Long scan rows (one per date and ticker) -> history dict
+
+    All rows are packed at once with shared decode tables and scattered
+    into the preallocated (dates x tickers) array.
+    """
+    dates = pd.DatetimeIndex(pd.to_datetime(df[date_col]))
+    date_axis = dates.unique().sort_values()
+    ticker_axis = pd.Index(pd.unique(df[ticker_col])).sort_values()
+    packed = pack_results(df.drop(columns=[date_col, ticker_col]), float_dtype=float_dtype)
+    history = allocate_history(date_axis, ticker_axis, packed['records'].dtype)
+    history['tables'], history['reasons'] = packed['tables'], packed['reasons']
+
+    di = date_axis.get_indexer(dates)
+    ti = ticker_axis.get_indexer(df[ticker_col])
+    target = history['records']
+    for name in packed['records'].dtype.names:
+        target[name][di, ti] = packed['records'][name]
+    target['present'][di, ti] = True
+    return history
+
+def history_field(history, column):
+    """One column of a history as a wide DataFrame (index = dates, columns = tickers)"""
+    records = history['records']
+    values = np.where(records['present'], _unpack_field(history, column, records[column]), np.nan) \
+        if column in history['tables'] or column in history['reasons'] else records[column]
+    return pd.DataFrame(values, index=history['dates'], columns=history['tickers'])
+
+def history_to_long(history):
+    """History dict -> long DataFrame (Date, Ticker, columns...) of the present cells"""
+    records = history['records']
+    di, ti = np.nonzero(records['present'])
+    flat = {'records': records[di, ti], 'columns': history['columns'],
+            'tables': history['tables'], 'reasons': history['reasons']}
+    df = unpack_results(flat)
+    df.insert(0, 'Ticker', history['tickers'][ti])
+    df.insert(0, 'Date', history['dates'][di])
+    return df
+
+# ========================================
+# SERIALIZATION
+# ========================================
+
+def save_records(obj, path):
+    """Write a packed scan or a history to .npz (decode tables as JSON)"""
+    meta = {'columns': obj['columns'], 'tables': obj['tables'], 'reasons': obj['reasons']}
+    arrays = {'records': obj['records'], 'meta': np.array(json.dumps(meta, default=str))}
+    if 'dates' in obj:
+        dates = obj['dates']
+        arrays['dates'] = (dates.tz_localize(None) if dates.tz is not None else dates).to_numpy()
+        arrays['tickers'] = np.asarray(obj['tickers'], dtype=str)
+    np.savez(path, **arrays)
+
+def load_records(path):
+    """Read save_records output back into a packed scan or history dict"""
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        obj = {'records': data['records'], 'columns': meta['columns'],
+               'tables': meta['tables'], 'reasons': meta['reasons']}
+        if 'dates' in data:
+            obj['dates'] = pd.DatetimeIndex(data['dates'])
+            obj['tickers'] = pd.Index(data['tickers'].tolist())
+    return obj
+
+def to_arrow(obj):
+    """
+    Arrow RecordBatch of a packed scan or history (requires pyarrow)
+
+    Code columns become dictionary arrays; reason masks stay uint64 with
+    the decode table in the schema metadata.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("pyarrow is required for to_arrow (pip install pyarrow)") from None
+
+    records = obj['records']
+    columns = {}
+    if records.ndim == 2:
+        di, ti = np.nonzero(records['present'])
+        records = records[di, ti]
+        columns['Date'] = pa.array(obj['dates'][di].tz_localize(None) if obj['dates'].tz is not None else obj['dates'][di])
+        columns['Ticker'] = pa.DictionaryArray.from_arrays(pa.array(ti.astype(np.int32)), pa.array(list(obj['tickers'])))
+    for col in obj['columns']:
+        values = records[col]
+        if col in obj['tables']:
+            columns[col] = pa.DictionaryArray.from_arrays(
+                pa.array(values, mask=values == MISSING_CODE), pa.array([str(v) for v in obj['tables'][col]]))
+        else:
+            columns[col] = pa.array(values)
+    metadata = {'reasons': json.dumps(obj['reasons'])}
+    return pa.RecordBatch.from_arrays(list(columns.values()), names=list(columns), metadata=metadata)
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+
+    rng = np.random.default_rng(0)
+    codes = ["EMA_Flow", "VolUp", "Green", "Breakout", "NearHigh", "StrongClose"]
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=250)
+    tickers = [f"T{i:03d}.JK" for i in range(900)]
+    n = len(dates) * len(tickers)
+    long = pd.DataFrame({
+        'Date': np.repeat(dates, len(tickers)),
+        'Ticker': np.tile(tickers, len(dates)),
+        'Score': rng.integers(0, 11, n),
+        'Close': rng.uniform(50, 10000, n).round(0),
+        'Rel_Vol': rng.uniform(0, 5, n).round(2),
+        'Decision': rng.choice(["READY", "WATCH", "WAIT"], n),
+        # Screeners append reasons in rule order
+        'Reasons': [", ".join(sorted(rng.choice(codes, rng.integers(1, 4), replace=False), key=codes.index))
+                    for _ in range(n)],
+    })
+    print(f"DataFrame: {long.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    t0 = time.perf_counter()
+    history = history_from_long(long)
+    print(f"History {history['records'].shape}: {history['records'].nbytes / 1e6:.1f} MB "
+          f"({(time.perf_counter() - t0) * 1000:.0f} ms)")
+    path = os.path.join(tempfile.mkdtemp(), "history.npz")
+    t0 = time.perf_counter()
+    save_records(history, path)
+    loaded = load_records(path)
+    print(f"Save + load: {(time.perf_counter() - t0) * 1000:.0f} ms, {os.path.getsize(path) / 1e6:.1f} MB on disk")
+    back = history_to_long(loaded)
+    print("Round trip identical:", back.equals(long.sort_values(['Date', 'Ticker']).reset_index(drop=True)))
@@ -0,0 +1,275 @@
+"""
+Scan Snapshot Store & Query Layer
+Keeps the latest result of every screener in an in-memory columnar cache
+and serves filter / sort / top-N queries from it without re-scanning
+"""
+
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from idx_calendar import INTRADAY_TTL, is_fresh
+from stock_universe import INDEX_FLAGS, TICKER_INDEX_MASK, TICKER_SECTOR, UNCLASSIFIED_SECTOR, normalize_ticker
+
+# Screeners whose results change within a session; the rest work on daily bars
+INTRADAY_SCREENERS = {'intraday_momentum'}
+
+# key -> snapshot dict; snapshots are never mutated, only replaced
+_snapshots = {}
+_lock = threading.Lock()
+
+# Callables (screener_key, previous snapshot or None, new snapshot)
+_listeners = []
+
+# ========================================
+# SNAPSHOTS
+# ========================================
+
+def frame_version(df):
+    """
+    Content hash of a result table (used as ETag / cache key); changes with
+    the values, the row order and the column names
+    """
+    crc = zlib.crc32("\x1f".join(map(str, df.columns)).encode())
+    if not df.empty:
+        row_hash = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        crc = zlib.crc32(row_hash.tobytes(), crc)
+    return f"{len(df)}:{crc:x}"
+
+def _config_hash(screener_key):
+    """Current config_store hash of a spec screener (None for other keys)"""
+    try:
+        from config_store import config_hash
+        return config_hash(screener_key)
+    except KeyError:
+        return None
+
+def save_snapshot(screener_key, df, saved_at=None, config="current"):
+    """
+    Store a finished scan as the latest snapshot for screener_key
+
+    Columns are kept as NumPy arrays, with the index bitmask and sector
+    of every row precomputed so index filters are a single AND. saved_at
+    (epoch seconds) defaults to now. config is the config_store hash the
+    scan ran with ("current" = now, None = unknown).
+    """
+    df = df.reset_index(drop=True) if df is not None else pd.DataFrame()
+    if 'Ticker' in df.columns:
+        keys = df['Ticker'].map(normalize_ticker)
+        index_mask = keys.map(TICKER_INDEX_MASK).fillna(0).to_numpy(dtype=np.int64)
+        sector = keys.map(TICKER_SECTOR).fillna(UNCLASSIFIED_SECTOR).to_numpy(dtype=object)
+    else:
+        index_mask = np.zeros(len(df), dtype=np.int64)
+        sector = np.full(len(df), UNCLASSIFIED_SECTOR, dtype=object)
+
+    snapshot = {
+        'key': screener_key,
+        'order': list(df.columns),
+        'columns': {c: df[c].to_numpy() for c in df.columns},
+        'index_mask': index_mask,
+        'sector': sector,
+        'rows': len(df),
+        'version': frame_version(df),
+        'saved_at': time.time() if saved_at is None else saved_at,
+        'config': _config_hash(screener_key) if config == "current" else config,
+    }
+    with _lock:
+        previous = _snapshots.get(screener_key)
+        _snapshots[screener_key] = snapshot
+    for listener in list(_listeners):
+        try:
+            listener(screener_key, previous, snapshot)
+        except Exception as e:
+            print(f"[WARN] Snapshot listener failed: {e}")
+    return snapshot
+
+def add_listener(fn):
+    """Call fn(screener_key, previous, snapshot) whenever a snapshot is saved"""
+    if fn not in _listeners:
+        _listeners.append(fn)
+
+def get_snapshot(screener_key, load_fallback=True):
+    """
+    Latest snapshot for screener_key (None if there is none)
+
+    With load_fallback, a screener that has not been scanned in this
+    process is seeded from its latest saved CSV (timestamped with the
+    file's modification time, so freshness checks stay honest).
+    """
+    snapshot = _snapshots.get(screener_key)
+    if snapshot is None and load_fallback:
+        import os
+        from screener_wrappers import latest_csv_path, load_latest_csv
+        pattern = _csv_pattern(screener_key)
+        if pattern:
+            path = latest_csv_path(pattern)
+            df = load_latest_csv(pattern) if path else pd.DataFrame()
+            if not df.empty:
+                snapshot = save_snapshot(screener_key, df, saved_at=os.path.getmtime(path), config=None)
+    return snapshot
+
+def _csv_pattern(screener_key):
+    """Glob of a screener's saved CSVs: the spec's output, else the module's pattern"""
+    from screener_wrappers import SCREENER_ITERATORS, _spec_keys
+    if screener_key in _spec_keys():
+        from screener_specs import get_plan
+        from spec_engine import output_pattern
+        return output_pattern(get_plan(screener_key))
+    if screener_key in SCREENER_ITERATORS:
+        return SCREENER_ITERATORS[screener_key][2]
+    return None
+
+def is_snapshot_fresh(snapshot, now=None):
+    """
+    True while a snapshot still reflects the market (idx_calendar rules):
+    intraday screeners for INTRADAY_TTL seconds during a session, daily
+    screeners until the next daily bar; both stay valid after the close.
+    A snapshot scored under other config_store params is stale.
+    """
+    if snapshot is None or not is_config_current(snapshot):
+        return False
+    mode = "intraday" if snapshot['key'] in INTRADAY_SCREENERS else "daily"
+    return is_fresh(snapshot['saved_at'], mode, now, ttl=INTRADAY_TTL)
+
+def is_config_current(snapshot):
+    """False when the snapshot was scored under other config_store params"""
+    return snapshot.get('config') is None or snapshot['config'] == _config_hash(snapshot['key'])
+
+def snapshot_frame(snapshot, rows=None):
+    """Materialize a snapshot (or a subset of its rows) as a DataFrame"""
+    if snapshot is None:
+        return pd.DataFrame()
+    cols = snapshot['columns']
+    if rows is None:
+        return pd.DataFrame({c: cols[c] for c in snapshot['order']})
+    return pd.DataFrame({c: cols[c][rows] for c in snapshot['order']})
+
+def list_snapshots():
+    """Summary of the snapshots currently held: key -> (rows, version, saved_at, fresh)"""
+    return {k: (s['rows'], s['version'], s['saved_at'], is_snapshot_fresh(s))
+            for k, s in list(_snapshots.items())}
+
+# ========================================
+# QUERY
+# ========================================
+
+_CONDITION = re.compile(r"^\s*(.+?)\s*(>=|<=|==|!=|>|<|~)\s*(.+?)\s*$")
+_SPLIT = re.compile(r"\s*(?:&|\band\b)\s*", re.IGNORECASE)
+
+def parse_filter(expr):
+    """
+    Parse a filter expression into (column, op, value) conditions
+
+    Conditions are joined with '&' or 'and'; ops are > >= < <= == != and
+    ~ (case-insensitive contains), e.g. "RS_Rating > 120 & Decision ~ READY".
+    """
+    if not expr or not expr.strip():
+        return []
+    conditions = []
+    for part in _SPLIT.split(expr.strip()):
+        m = _CONDITION.match(part)
+        if not m:
+            raise ValueError(f"Invalid condition: {part!r}")
+        column, op, value = m.groups()
+        value = value.strip("'\"")
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+        conditions.append((column, op, value))
+    return conditions
+
+def _condition_mask(values, op, value):
+    if op == '~':
+        text = pd.Series(values).astype(str).str.upper()
+        return text.str.contains(str(value).upper(), regex=False, na=False).to_numpy()
+
+    if isinstance(value, float):
+        values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+    else:
+        values = pd.Series(values).astype(str).to_numpy()
+    with np.errstate(invalid='ignore'):
+        if op == '>':
+            return values > value
+        if op == '>=':
+            return values >= value
+        if op == '<':
+            return values < value
+        if op == '<=':
+            return values <= value
+        if op == '==':
+            return values == value
+        return values != value
+
+def query_snapshot(snapshot, where=None, index=None, sector=None,
+                   sort=None, ascending=False, top=None):
+    """
+    Filter / sort / top-N over a snapshot
+
+    Args:
+        snapshot: dict from get_snapshot / save_snapshot
+        where: filter expression (see parse_filter) or list of conditions
+        index: index name(s) from stock_universe.INDEX_FLAGS (e.g. 'LQ45');
+               a row matches if it belongs to any of them
+        sector: sector name(s)
+        sort: column to sort by (stable, NaN last)
+        top: keep the first N rows after sorting
+
+    Returns:
+        DataFrame with the matching rows
+    """
+    if snapshot is None or snapshot['rows'] == 0:
+        return pd.DataFrame()
+
+    cols = snapshot['columns']
+    mask = np.ones(snapshot['rows'], dtype=bool)
+
+    conditions = parse_filter(where) if isinstance(where, str) else (where or [])
+    for column, op, value in conditions:
+        if column not in cols:
+            raise KeyError(f"Unknown column: {column}")
+        mask &= _condition_mask(cols[column], op, value)
+
+    if index:
+        names = [index] if isinstance(index, str) else index
+        flags = 0
+        for name in names:
+            if name not in INDEX_FLAGS:
+                raise KeyError(f"Unknown index: {name}")
+            flags |= INDEX_FLAGS[name][0]
+        mask &= (snapshot['index_mask'] & flags) != 0
+
+    if sector:
+        names = [sector] if isinstance(sector, str) else sector
+        mask &= np.isin(snapshot['sector'], names)
+
+    rows = np.flatnonzero(mask)
+
+    if sort:
+        if sort not in cols:
+            raise KeyError(f"Unknown column: {sort}")
+        key = pd.Series(cols[sort][rows])
+        order = key.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+        rows = rows[order]
+
+    if top:
+        rows = rows[:int(top)]
+
+    return snapshot_frame(snapshot, rows)
+
+def query(screener_key, **kwargs):
+    """Query the latest snapshot of a screener (see query_snapshot)"""
+    return query_snapshot(get_snapshot(screener_key), **kwargs)
+
+if __name__ == "__main__":
+    import sys
+    key = sys.argv[1] if len(sys.argv) > 1 else 'ultimate'
+    expr = sys.argv[2] if len(sys.argv) > 2 else None
+    t0 = time.perf_counter()
+    res = query(key, where=expr, sort='Score', top=20)
+    print(res.to_string() if not res.empty else f"No snapshot / no matches for {key}")
+    print(f"Query time: {(time.perf_counter() - t0) * 1000:.1f} ms")
@@ -0,0 +1,568 @@
+"""
+Batch Screener CLI
+Pre-market / after-close jobs for cron, on the declarative screener specs:
+
+    python screener.py fetch
+    python screener.py scan all --workers 4 --format csv
+    python screener.py scan idx_swing --set REL_VOL=1.5 --output-dir experiments
+    python screener.py backtest idx_swing --start 2026-01-02 --date 2026-06-30
+    python screener.py sweep idx_swing --param REL_VOL=1.2,1.5,2.0
+    python screener.py report all
+
+Market data is fetched once per run and shared; the CPU-bound stages (one
+job per screener, per backtest date chunk or per sweep combination) run
+in a process pool. Every run ends with a stage summary and an exit code:
+0 ok, 1 some jobs failed, 2 usage error, 3 no market data.
+
+Screener thresholds come from config_store (screener_config.json or
+--config); --set overrides them for one run.
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+EXIT_NO_DATA = 3
+
+FORMATS = ("csv", "json", "parquet", "npz")
+BACKTEST_MONTHS = 6  # Default backtest window when --start is not given
+
+# ========================================
+# RUN SUMMARY
+# ========================================
+
+def new_run(command, args):
+    return {'command': command, 'args': {k: v for k, v in vars(args).items() if k != 'func'},
+            'started_at': time.time(), 'stages': [], 'exit_code': None}
+
+@contextlib.contextmanager
+def stage(run, name, kind="job"):
+    """
+    Record one stage (status, seconds, rows, detail); exceptions mark it
+    failed and are not re-raised, so one screener cannot stop the batch
+    """
+    info = {'name': name, 'kind': kind, 'status': "ok", 'seconds': 0.0, 'rows': None, 'detail': ""}
+    run['stages'].append(info)
+    t0 = time.perf_counter()
+    try:
+        yield info
+    except Exception as e:
+        info['status'] = "failed"
+        info['detail'] = f"{type(e).__name__}: {e}"
+    finally:
+        info['seconds'] = round(time.perf_counter() - t0, 2)
+
+def exit_code(run):
+    """3 if every data fetch failed, 1 if any stage failed, else 0"""
+    stages = run['stages']
+    fetches = [s['status'] for s in stages if s['kind'] == "fetch"]
+    if "failed" in fetches and "ok" not in fetches:
+        return EXIT_NO_DATA
+    if any(s['status'] == "failed" for s in stages):
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+def print_summary(run, as_json=False, path=None):
+    run['finished_at'] = time.time()
+    run['seconds'] = round(run['finished_at'] - run['started_at'], 2)
+    if path:
+        with open(path, 'w') as f:
+            json.dump(run, f, indent=2, default=str)
+    if as_json:
+        print(json.dumps(run, default=str))
+        return
+    print()
+    print(f"=== {run['command']} summary ({run['seconds']:.1f}s, exit {run['exit_code']}) ===")
+    for s in run['stages']:
+        rows = "" if s['rows'] is None else f"{s['rows']} rows"
+        print(f"  {s['name']:<30} {s['status']:<7} {s['seconds']:>7.1f}s  {rows:<11} {s['detail']}")
+
+# ========================================
+# HELPERS
+# ========================================
+
+def resolve_universe(name):
+    """
+    'expanded', an index ('lq45', 'idx80', ...), 'file:<path>' or a
+    comma-separated ticker list; named universes stay names so they
+    resolve point-in-time (universe_history) on the run's dates
+    """
+    from stock_universe import INDEX_FLAGS
+    if name is None:
+        return None
+    if name.upper() in INDEX_FLAGS:
+        return name.upper()
+    if name.lower() == "expanded":
+        return "expanded"
+    if name.startswith("file:"):
+        return name
+    return [t.strip().upper() if t.strip().upper().endswith(".JK") else t.strip().upper() + ".JK"
+            for t in name.split(",") if t.strip()]
+
+def resolve_keys(names):
+    from screener_specs import SPECS
+    keys = list(SPECS) if names in (["all"], "all") else list(names)
+    unknown = [k for k in keys if k not in SPECS]
+    if unknown:
+        raise SystemExit(f"Unknown screener(s): {', '.join(unknown)} (choose from {', '.join(SPECS)} or all)")
+    return keys
+
+def get_plan(key, overrides=None, universe=None):
+    """Plan with config_store params plus per-run overrides and an optional universe"""
+    from screener_specs import get_plan as compiled
+    plan = compiled(key, overrides)
+    if universe is not None:
+        plan = dict(plan, universe=universe if isinstance(universe, str) else list(universe))
+    return plan
+
+def worker_plan(key, params):
+    """Plan with exactly the params resolved in the parent (workers may not see its overrides)"""
+    from screener_specs import get_plan as compiled
+    return dict(compiled(key), params=params)
+
+def run_overrides(args, keys):
+    """
+    {key: overrides} from --set NAME=VALUE (every screener with that param)
+    and --set key.NAME=VALUE (one screener)
+    """
+    import config_store
+    out = {key: {} for key in keys}
+    for item in args.set or []:
+        name, _, value = item.partition("=")
+        if not value:
+            raise SystemExit(f"--set must look like [screener.]NAME=VALUE (got {item!r})")
+        scope, _, name = name.strip().rpartition(".")
+        targets = [scope] if scope else [k for k in keys if name in config_store.schema(k)]
+        if not targets or (scope and scope not in out):
+            raise SystemExit(f"--set {item}: no selected screener has param {name}")
+        for key in targets:
+            out[key][name] = parse_value(value.strip())
+    try:
+        for key, values in out.items():
+            config_store.validate(key, values)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    return out
+
+def parse_date(text):
+    if text is None or text == "today":
+        return None
+    return pd.Timestamp(text).normalize()
+
+def parse_value(text):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+def output_path(name, fmt, out_dir=None, key=None):
+    """
+    Spec output name with the format's extension; inside out_dir if given,
+    prefixed with key there when the name does not already say which screener
+    """
+    base = os.path.splitext(name)[0]
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+        base = os.path.basename(base)
+        if key and not base.startswith(key):
+            base = f"{key}_{base}"
+        base = os.path.join(out_dir, base)
+    elif os.path.dirname(base):
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+    return f"{base}.{fmt}"
+
+def write_frame(df, path, fmt):
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "json":
+        df.to_json(path, orient='records', date_format='iso')
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        from result_records import pack_results, save_records
+        save_records(pack_results(df), path)
+    return path
+
+def run_jobs(fn, jobs, workers):
+    """
+    Yield (job, result, error) for fn(*job); a process pool when workers > 1,
+    in-process otherwise (easier to debug, no pickling)
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            try:
+                yield job, fn(*job), None
+            except Exception as e:
+                yield job, None, e
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = {pool.submit(fn, *job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+# ========================================
+# WORKER JOBS (module level so they pickle)
+# ========================================
+
+def scan_job(key, params, inputs):
+    """Evaluate one screener on pre-loaded inputs (see spec_engine.load_inputs)"""
+    from spec_engine import _resolve, evaluate
+    plan = worker_plan(key, params)
+    prepare = _resolve(plan['prepare'])
+    if prepare is not None and inputs.get('minute') is not None:
+        prepare(inputs['tickers'])  # Volume profiles load from the cache the parent built
+    return evaluate(plan, **inputs)
+
+def replay_job(key, params, panel, report, extras, dates, members=None):
+    """Signals for a chunk of backtest dates (long table: Date + result columns)"""
+    from spec_engine import replay
+    plan = worker_plan(key, params)
+    frames = []
+    for day, df in replay(plan, panel, report, dates, extras, members).items():
+        if not df.empty:
+            frames.append(df.assign(Date=day))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def select_signals(signals, decision=None, top=None, close=None, max_corr=None):
+    """
+    Rows whose Decision contains decision, best top per day by Score; with
+    max_corr, the top are picked diversified (correlation_engine) on close
+    """
+    if signals.empty:
+        return signals
+    if decision and 'Decision' in signals.columns:
+        signals = signals[signals['Decision'].astype(str).str.contains(decision, case=False, regex=False)]
+    if top and max_corr is not None and close is not None:
+        from correlation_engine import diversify_signals
+        signals = diversify_signals(signals, close, top, max_corr)
+    elif top:
+        signals = signals.sort_values(['Date', 'Score'], ascending=[True, False]).groupby('Date').head(top)
+    return signals.reset_index(drop=True)
+
+def sweep_job(key, params, combo, panel, report, extras, dates, options, members=None):
+    """Backtest summary for one parameter combination"""
+    from portfolio_simulator import simulate_portfolio
+    signals = select_signals(replay_job(key, params, panel, report, extras, dates, members),
+                             options['decision'], options['top'], panel['Close'], options['max_corr'])
+    result = simulate_portfolio(signals, panel, max_hold_days=options['hold'])
+    summary = {k: v for k, v in result['summary'].items() if k != 'exits'}
+    return {**combo, **summary, 'signals': len(signals)}
+
+# ========================================
+# COMMANDS
+# ========================================
+
+def cmd_fetch(args, run):
+    """Warm the persistent stores: closes / forward returns and 1m volume profiles"""
+    from screener_specs import SPECS
+    from spec_engine import _PERIOD_DAYS, load_panel, load_universe
+
+    tickers = load_universe(resolve_universe(args.universe) or "expanded")
+    keys = list(SPECS)
+    periods = [get_plan(k)['period'] for k in keys]
+    period = args.period or max(periods, key=_PERIOD_DAYS.get)
+
+    for adjust in sorted({get_plan(k)['adjust'] for k in keys}):
+        with stage(run, f"fetch daily ({adjust})", kind="fetch") as info:
+            panel, report = load_panel(tickers, period, adjust, refresh=True)
+            if not panel:
+                raise RuntimeError("no daily bars downloaded")
+            info['rows'] = int(panel['Close'].notna().any().sum())
+            if adjust == "total":
+                from analytics_store import record_prices
+                info['detail'] = f"{record_prices(panel['Close'])} closes stored"
+    with stage(run, "fetch 1m volume profiles") as info:
+        from volume_profile import load_profiles
+        profiles = load_profiles(tickers, refresh=True)
+        info['rows'] = len(profiles['curves'])
+
+def cmd_scan(args, run):
+    """Fetch once for every screener, then evaluate them in parallel"""
+    from analytics_store import record_scan
+    from spec_engine import is_live, load_inputs, output_name
+
+    as_of = parse_date(args.date)
+    universe = resolve_universe(args.universe)
+    jobs, plans = [], {}
+    live = is_live(as_of)
+    keys = resolve_keys(args.screeners)
+    overrides = run_overrides(args, keys)
+    for key in keys:
+        with stage(run, f"fetch {key}", kind="fetch") as info:
+            plan = get_plan(key, overrides[key], universe)
+            if plan['minute'] and not live:
+                info['status'] = "skipped"
+                info['detail'] = "needs today's 1m bars"
+                continue
+            inputs = load_inputs(plan, as_of=as_of)
+            if inputs is None:
+                raise RuntimeError("no daily bars")
+            info['rows'] = len(inputs['tickers'])
+            jobs.append((key, plan['params'], inputs))
+            plans[key] = plan
+
+    for (key, _, _), df, error in run_jobs(scan_job, jobs, args.workers):
+        with stage(run, f"scan {key}") as info:
+            if error is not None:
+                raise error
+            info['rows'] = len(df)
+            name = output_name(plans[key], None if live else as_of) or f"{key}_{pd.Timestamp.now():%Y%m%d}.csv"
+            if overrides[key]:
+                # Never replace the saved results the app falls back to
+                root, ext = os.path.splitext(name)
+                name = f"{root}_config{plans[key]['config']}{ext}"
+            info['detail'] = write_frame(df, output_path(name, args.format, args.output_dir, key), args.format)
+            if overrides[key]:
+                info['detail'] += f" (config {plans[key]['config']})"
+            elif args.record and not df.empty:
+                record_scan(key, df, None if live else as_of)
+    run['stages'].sort(key=lambda s: (s['kind'] != "fetch", s['name']))
+
+def _history_inputs(key, start, end, universe, overrides=None):
+    """
+    Long panel for replaying key over [start, end], the plan's context, the
+    dates and the point-in-time membership mask (None without history)
+    """
+    from spec_engine import _day_index, covering_period, load_panel, load_universe, plan_extras
+    from universe_history import members_between, membership_panel
+
+    plan = get_plan(key, overrides, universe)
+    if plan['minute']:
+        raise ValueError(f"{key} needs 1m bars and cannot be backtested")
+    # Everyone who was a member at some point in the window, not just today's list
+    tickers = members_between(plan['universe'], start, end)
+    if tickers is None:
+        tickers = load_universe(plan['universe'])
+    panel, report = load_panel(tickers, covering_period(plan['period'], start), plan['adjust'])
+    if not panel:
+        raise RuntimeError("no daily bars")
+    # Session-date index (the simulator matches naive signal dates); the
+    # panel runs past end so trades opened near end can still exit
+    panel = {f: frame.set_axis(_day_index(frame.index)) for f, frame in panel.items()}
+    days = panel['Close'].index
+    dates = list(days[(days >= start) & (days <= end)])
+    extras = plan_extras(plan, tickers, start)
+    members = membership_panel(plan['universe'], dates, panel['Close'].columns)
+    return plan, panel, report, extras, dates, members
+
+def _backtest_window(args):
+    from idx_calendar import session_date
+    end = parse_date(args.date) or pd.Timestamp(session_date())
+    start = parse_date(args.start) if args.start else end - pd.DateOffset(months=BACKTEST_MONTHS)
+    if start >= end:
+        raise SystemExit("--start must be before --date")
+    return start, end
+
+def cmd_backtest(args, run):
+    """Replay each screener over past sessions and simulate the portfolio"""
+    from portfolio_simulator import simulate_portfolio
+
+    start, end = _backtest_window(args)
+    universe = resolve_universe(args.universe)
+    keys = resolve_keys(args.screeners)
+    overrides = run_overrides(args, keys)
+    for key in keys:
+        with stage(run, f"fetch {key}", kind="fetch") as info:
+            plan, panel, report, extras, dates, members = _history_inputs(key, start, end, universe,
+                                                                          overrides[key])
+            info['rows'] = len(dates)
+            if members is not None:
+                info['detail'] = f"{members.any().sum()} point-in-time members"
+        if run['stages'][-1]['status'] != "ok":
+            continue
+
+        with stage(run, f"replay {key}") as info:
+            chunks = [list(c) for c in np.array_split(np.array(dates, dtype=object), max(args.workers, 1)) if len(c)]
+            jobs = [(key, plan['params'], panel, report, extras, chunk,
+                     None if members is None else members.loc[chunk]) for chunk in chunks]
+            frames = []
+            for _, df, error in run_jobs(replay_job, jobs, args.workers):
+                if error is not None:
+                    raise error
+                frames.append(df)
+            signals = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            signals = select_signals(signals, args.decision, args.top, panel['Close'], args.max_corr)
+            info['rows'] = len(signals)
+
+        with stage(run, f"simulate {key}") as info:
+            result = simulate_portfolio(signals, panel, max_hold_days=args.hold)
+            s = result['summary']
+            info['rows'] = s['trades']
+            info['detail'] = (f"return {s['total_return_%']}% | maxDD {s['max_drawdown_%']}% | "
+                              f"win {s['win_rate_%']}%")
+            tag = f"{key}_backtest_{start:%Y%m%d}_{end:%Y%m%d}"
+            write_frame(result['trades'], output_path(f"{tag}_trades", args.format, args.output_dir), args.format)
+            write_frame(result['equity'].reset_index(), output_path(f"{tag}_equity", args.format, args.output_dir),
+                        args.format)
+
+def cmd_sweep(args, run):
+    """Backtest every combination of --param values (one pool job each)"""
+    if len(resolve_keys(args.screeners)) != 1:
+        raise SystemExit("sweep takes exactly one screener")
+    key = resolve_keys(args.screeners)[0]
+    grid = {}
+    for spec in args.param or []:
+        name, _, values = spec.partition("=")
+        if not values:
+            raise SystemExit(f"--param must look like NAME=v1,v2 (got {spec!r})")
+        grid[name.strip()] = [parse_value(v.strip()) for v in values.split(",")]
+    if not grid:
+        raise SystemExit("sweep needs at least one --param NAME=v1,v2")
+    combos = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    base = run_overrides(args, [key])[key]
+    try:
+        params = [get_plan(key, {**base, **combo})['params'] for combo in combos]
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    start, end = _backtest_window(args)
+    with stage(run, f"fetch {key}", kind="fetch") as info:
+        plan, panel, report, extras, dates, members = _history_inputs(key, start, end,
+                                                                      resolve_universe(args.universe))
+        info['rows'] = len(dates)
+    if run['stages'][-1]['status'] != "ok":
+        return
+
+    options = {'decision': args.decision, 'top': args.top, 'hold': args.hold, 'max_corr': args.max_corr}
+    jobs = [(key, p, combo, panel, report, extras, dates, options, members) for p, combo in zip(params, combos)]
+    rows = []
+    for job, summary, error in run_jobs(sweep_job, jobs, args.workers):
+        label = ", ".join(f"{k}={v}" for k, v in job[2].items())
+        with stage(run, f"sweep {label}") as info:
+            if error is not None:
+                raise error
+            info['rows'] = summary['trades']
+            info['detail'] = f"return {summary['total_return_%']}% | maxDD {summary['max_drawdown_%']}%"
+            rows.append(summary)
+    if rows:
+        table = pd.DataFrame(rows).sort_values('total_return_%', ascending=False)
+        path = output_path(f"{key}_sweep_{start:%Y%m%d}_{end:%Y%m%d}", args.format, args.output_dir)
+        write_frame(table, path, args.format)
+        print(table.to_string(index=False))
+
+def cmd_report(args, run):
+    """Decision hit rates and signal IC per screener from analytics_store history"""
+    from analytics_store import decision_breakdown
+    from signal_analytics import get_signal_report
+
+    start = parse_date(args.start) if args.start else None
+    end = parse_date(args.date)
+    for key in resolve_keys(args.screeners):
+        with stage(run, f"report {key}") as info:
+            breakdown = decision_breakdown(key, args.horizon, start, end)
+            report = get_signal_report(key, start, end)
+            if breakdown.empty and report is None:
+                info['status'] = "empty"
+                info['detail'] = "no stored history yet (scan records it unless --no-record)"
+                continue
+            info['rows'] = int(breakdown['Signals'].sum()) if not breakdown.empty else 0
+            tag = f"{key}_report"
+            write_frame(breakdown, output_path(f"{tag}_decisions", args.format, args.output_dir), args.format)
+            if report is not None:
+                ic = report['ic'].reset_index()
+                write_frame(ic, output_path(f"{tag}_ic", args.format, args.output_dir), args.format)
+                write_frame(report['buckets'], output_path(f"{tag}_buckets", args.format, args.output_dir),
+                            args.format)
+                row = ic[ic['Horizon'] == args.horizon]
+                if not row.empty:
+                    info['detail'] = f"IC@{args.horizon}d {row['Mean_IC'].iloc[0]} (t={row['t_stat'].iloc[0]})"
+
+# ========================================
+# ENTRY POINT
+# ========================================
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--universe", help="expanded, an index (lq45, idx80, ...), file:<path> or "
+                                           "comma-separated tickers; named universes use universe_history.csv")
+    common.add_argument("--date", help="as-of session (YYYY-MM-DD, default today); backtest end date")
+    common.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="process pool size (1 = in-process)")
+    common.add_argument("--format", choices=FORMATS, default="csv", help="output format")
+    common.add_argument("--output-dir", help="write outputs here instead of the screeners' usual paths")
+    common.add_argument("--summary", help="also write the run summary as JSON to this path")
+    common.add_argument("--json", action="store_true", help="print the run summary as one JSON line")
+    common.add_argument("--config", help="config_store JSON file to use instead of screener_config.json")
+    common.add_argument("--set", action="append", metavar="[SCREENER.]NAME=VALUE",
+                        help="per-run param override (repeatable); overridden scans are not recorded")
+
+    backtest = argparse.ArgumentParser(add_help=False)
+    backtest.add_argument("--start", help="first session (default: --date minus 6 months)")
+    backtest.add_argument("--decision", default=None, help="only rows whose Decision contains this (e.g. READY)")
+    backtest.add_argument("--top", type=int, default=None, help="best N signals per day by Score")
+    backtest.add_argument("--hold", type=int, default=None, help="max holding days (default config_swing)")
+    backtest.add_argument("--max-corr", type=float, default=None,
+                          help="diversify the daily top: skip picks correlated above this with earlier ones")
+
+    parser = argparse.ArgumentParser(prog="screener", description="IDX screener batch jobs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("fetch", parents=[common], help="warm the data stores")
+    p.add_argument("--period", help="daily history to download (default: longest spec period)")
+    p.set_defaults(func=cmd_fetch)
+
+    p = sub.add_parser("scan", parents=[common], help="run screeners")
+    p.add_argument("screeners", nargs="+", help="screener key(s) or all")
+    p.add_argument("--no-record", dest="record", action="store_false", help="do not append to analytics_store")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("backtest", parents=[common, backtest], help="replay screeners and simulate trades")
+    p.add_argument("screeners", nargs="+", help="screener key(s) or all")
+    p.set_defaults(func=cmd_backtest)
+
+    p = sub.add_parser("sweep", parents=[common, backtest], help="backtest a grid of spec @params")
+    p.add_argument("screeners", nargs=1, help="screener key")
+    p.add_argument("--param", action="append", help="NAME=v1,v2,... (repeat for a grid)")
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser("report", parents=[common], help="hit rates and IC from stored scans")
+    p.add_argument("screeners", nargs="+", help="screener key(s) or all")
+    p.add_argument("--start", help="first scan date")
+    p.add_argument("--horizon", type=int, default=5, choices=(1, 3, 5, 10), help="forward-return horizon")
+    p.set_defaults(func=cmd_report)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'hold', None) is None and args.command in ("backtest", "sweep"):
+        import config_swing as cfg
+        args.hold = cfg.BACKTEST_HOLD_DAYS
+    if getattr(args, 'max_corr', None) is not None and args.top is None:
+        import config_swing as cfg
+        args.top = cfg.BACKTEST_TOP_N
+    run = new_run(args.command, args)
+    if args.config:
+        import config_store
+        config_store.use_file(args.config)
+    try:
+        args.func(args, run)
+    except SystemExit as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        run['exit_code'] = EXIT_USAGE
+        print_summary(run, args.json, args.summary)
+        return EXIT_USAGE
+    except Exception as e:
+        run['stages'].append({'name': args.command, 'kind': "job", 'status': "failed", 'seconds': 0.0,
+                              'rows': None, 'detail': f"{type(e).__name__}: {e}"})
+    run['exit_code'] = exit_code(run)
+    print_summary(run, args.json, args.summary)
+    return run['exit_code']
+
+if __name__ == "__main__":
+    sys.exit(main())
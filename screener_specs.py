@@ -0,0 +1,475 @@
+"""
+Screener Specs
+The six screeners as declarative specs for spec_engine: data source,
+indicators, features, filters, score rules, decision and output columns.
+A new screen is a new entry in SPECS.
+
+Indicators are names from the indicators registry (EMA20, ATR14, ...),
+computed once per shared panel. Expressions are DataFrame.eval strings
+over the per-ticker feature table (thresholds as @params); anything eval
+cannot say is a callable(X, ctx). The params here are defaults: get_plan
+applies config_store (config file, runtime and per-run overrides).
+"""
+
+import numpy as np
+import pandas as pd
+
+import config_swing as cfg
+
+# ========================================
+# SHARED RULE PIECES
+# ========================================
+
+def _atr_levels(X, ctx, side):
+    """calculate_atr_stop_loss (2x ATR, 1:2 target) on the last bar"""
+    atr = X['ATR14']
+    if side == 'stop':
+        return (X['Close'] - atr * 2.0).round(0)
+    return (X['Close'] + atr * 2.0 * 2).round(0)
+
+def _ready_rank(df):
+    """vwap_screener_pro ranking (READY first, then Score)"""
+    from vwap_screener_pro import rank_results
+    return rank_results(df)
+
+# ========================================
+# SPECS
+# ========================================
+
+IDX_SWING = {
+    'name': "IDX Swing Screener",
+    'universe': "file:idx_universe.txt",
+    'period': cfg.FETCH_PERIOD,
+    'min_history': cfg.MIN_HISTORY_DAYS,
+    'params': {
+        'MIN_PRICE': cfg.MIN_PRICE, 'MIN_LIQ': cfg.MIN_LIQUIDITY_IDR,
+        'TRAP_WICK': cfg.TRAP_WICK_RATIO_MAX, 'TRAP_BODY': cfg.TRAP_BODY_RATIO_MAX,
+        'REL_VOL': cfg.READY_REL_VOL_MIN, 'CLOSE_LOC': cfg.READY_CLOSE_LOC_MIN,
+        'BODY': cfg.READY_BODY_RATIO_MIN, 'DIST_MAX': cfg.READY_VWMA_DIST_MAX,
+        'SCORE_VWMA': cfg.SCORE_VWMA_ABOVE, 'SCORE_REL_VOL': cfg.SCORE_REL_VOL,
+        'SCORE_CLOSE_LOC': cfg.SCORE_CLOSE_LOC, 'SCORE_BODY': cfg.SCORE_BODY_RATIO,
+        'SCORE_TIGHT': cfg.SCORE_VWMA_TIGHT, 'SCORE_TREND': cfg.SCORE_TREND_OK,
+    },
+    # Registry names for the config periods, under the legacy column names
+    'indicators': {
+        'VWMA20': f"VWMA{cfg.VWMA_PERIOD}",
+        'EMA20': f"EMA{cfg.EMA_FAST_PERIOD}",
+        'EMA50': f"EMA{cfg.EMA_SLOW_PERIOD}",
+        'RelVol': f"RelVol{cfg.VOL_SMA_PERIOD}",
+        'AvgValue20': f"AvgValue{cfg.VALUE_SMA_PERIOD}",
+        'ADR20': f"ADR{cfg.ADR_PERIOD}",
+    },
+    'features': {
+        'Close': 'Close',
+        'VWMA20': 'VWMA20',
+        'VWMA_Dist': "(Close - VWMA20) / VWMA20 * 100",
+        'Rel_Vol': 'RelVol',
+        'AvgValue20D_IDR': 'AvgValue20',
+        'ADR20': 'ADR20',
+        'Range': 'Range',
+        'CloseLocation': lambda X, ctx: ((X['Close'] - ctx['at']('Low')) / X['Range']).where(X['Range'] != 0, 0.5),
+        'BodyRatio': lambda X, ctx: ((X['Close'] - ctx['at']('Open')).abs() / X['Range']).where(X['Range'] != 0, 0.0),
+        'WickRatio': "1 - BodyRatio",
+        'EMA20': 'EMA20',
+        'EMA50': 'EMA50',
+        'TrendOK': "(Close > EMA20) & (EMA20 > EMA50)",
+    },
+    'gates': [
+        (lambda X, ctx: X['Close'].isna() | X['VWMA20'].isna(), {'Decision': 'AVOID_NODATA', 'Score': 0, 'Reasons': 'NODATA'}),
+        ("Close < @MIN_PRICE", {'Decision': 'AVOID_LOWPRICE', 'Score': 0, 'Reasons': 'LOWPRICE'}),
+        ("AvgValue20D_IDR < @MIN_LIQ", {'Decision': 'AVOID_LIQUIDITY', 'Score': 0, 'Reasons': 'LOWLIQ'}),
+        ("WickRatio > @TRAP_WICK and BodyRatio < @TRAP_BODY", {'Decision': 'AVOID_TRAP', 'Score': 0, 'Reasons': 'TRAP'}),
+    ],
+    'score': [
+        ("Close > VWMA20", "@SCORE_VWMA", 'VWMA+'),
+        ("Rel_Vol >= @REL_VOL", "@SCORE_REL_VOL", 'VOL+'),
+        ("CloseLocation >= @CLOSE_LOC", "@SCORE_CLOSE_LOC", 'CLOC+'),
+        ("BodyRatio >= @BODY", "@SCORE_BODY", 'BODY+'),
+        ("abs(VWMA_Dist) <= 10.0", "@SCORE_TIGHT", 'TIGHT+'),
+        ("TrendOK", "@SCORE_TREND", 'TREND+'),
+    ],
+    'reason_sep': "|",
+    'no_reason': "NONE",
+    'score_dtype': int,
+    'decision': [
+        ("Close > VWMA20 and Rel_Vol >= @REL_VOL and CloseLocation >= @CLOSE_LOC"
+         " and BodyRatio >= @BODY and VWMA_Dist <= @DIST_MAX and TrendOK", 'READY'),
+        (None, {
+            'prefix': "WAIT_", 'sep': "+", 'empty': "WAIT",
+            'flags': [
+                ("~TrendOK", 'TREND'),
+                ("Rel_Vol < @REL_VOL", 'VOL'),
+                ("CloseLocation < @CLOSE_LOC", 'CLOC'),
+                ("BodyRatio < @BODY", 'BODY'),
+                ("VWMA_Dist > @DIST_MAX", 'DIST'),
+            ],
+        }),
+    ],
+    'columns': {
+        'Date': lambda X, ctx: X['Date'].dt.strftime('%Y-%m-%d'),
+        'Ticker': lambda X, ctx: X['Ticker'].str.replace('.JK', '', regex=False),
+        'Close': ('Close', 2),
+        'VWMA20': ('VWMA20', 2),
+        'VWMA_Dist_%': ('VWMA_Dist', 2),
+        'Rel_Vol': ('Rel_Vol', 2),
+        'AvgValue20D_IDR': lambda X, ctx: (X['AvgValue20D_IDR'] / 1e9).map(lambda v: f"{v:.2f}B"),
+        'ADR20_%': ('ADR20', 2),
+        'CloseLocation': ('CloseLocation', 3),
+        'BodyRatio': ('BodyRatio', 3),
+        'WickRatio': ('WickRatio', 3),
+        'EMA20': ('EMA20', 2),
+        'EMA50': ('EMA50', 2),
+        'TrendOK': 'TrendOK',
+        'Decision': 'Decision',
+        'Score': 'Score',
+        'ReasonCodes': 'Reasons',
+    },
+    'post': "idx_swing_screener:rank_results",
+    'output': f"{cfg.OUTPUT_DIR}/{cfg.OUTPUT_PREFIX_SCREENER}_{{date}}.csv",
+}
+
+VWAP_PRO = {
+    'name': "VWAP Production Screener",
+    'period': "6mo",
+    'adjust': "split",
+    'min_history': 60,
+    'params': {
+        'MIN_PRICE': 100, 'MIN_LIQ': 10_000_000_000, 'DIST_LIMIT': 20,
+        'REL_VOL': 1.2, 'CLOSE_LOC': 0.60, 'BODY': 0.45, 'TRAP_WICK': 0.55, 'TRAP_RVOL': 1.5,
+    },
+    'features': {
+        'Close': 'Close',
+        'VWMA20': 'VWMA20',
+        'VWMA_Dist': "(Close / VWMA20 - 1) * 100",
+        'Rel_Vol': 'RelVol20',
+        'AvgValue20D_IDR': 'AvgValue20',
+        'ADR20': 'ADR20',
+        'Range': lambda X, ctx: (ctx['at']('High') - ctx['at']('Low')).replace(0, 0.0001),
+        'CloseLocation': lambda X, ctx: (X['Close'] - ctx['at']('Low')) / X['Range'],
+        'BodyRatio': lambda X, ctx: (X['Close'] - ctx['at']('Open')).abs() / X['Range'],
+        'WickRatio': "1.0 - BodyRatio",
+        'TrendOK': lambda X, ctx: (X['Close'] > ctx['at']('EMA20')) & (ctx['at']('EMA20') > ctx['at']('EMA50')),
+        'Ready': "Close > VWMA20 and Rel_Vol >= @REL_VOL and CloseLocation >= 0.70"
+                 " and BodyRatio >= @BODY and VWMA_Dist <= @DIST_LIMIT",
+    },
+    'gates': [
+        (lambda X, ctx: X['VWMA20'].isna() | X['Rel_Vol'].isna(), {'Decision': 'AVOID', 'Reasons': 'NoData', 'Score': 0}),
+        ("Close < @MIN_PRICE", {'Decision': 'AVOID', 'Reasons': 'LowPrice', 'Score': 0}),
+        ("AvgValue20D_IDR < @MIN_LIQ", {'Decision': 'WAIT', 'Reasons': 'LowLiq', 'Score': 0}),
+        ("VWMA_Dist > @DIST_LIMIT", {'Decision': 'WAIT', 'Reasons': 'WAIT_OVEREXT', 'Score': 0}),
+        ("WickRatio > @TRAP_WICK and Rel_Vol > @TRAP_RVOL", {'Decision': 'AVOID', 'Reasons': 'AVOID_TRAP', 'Score': 0}),
+    ],
+    'score': [
+        (None, lambda X, ctx: 30 * np.tanh(np.maximum(X['Rel_Vol'] - 1, 0))),
+        (None, "25 * CloseLocation"),
+        (None, lambda X, ctx: 15 * np.minimum(1.0, X['BodyRatio'])),
+        ("TrendOK", 15),
+        ("Close > VWMA20", 15),
+    ],
+    'reasons': [
+        ("CloseLocation < @CLOSE_LOC", 'WAIT_WEAK_CLOSE'),
+        ("Ready and TrendOK", 'OK'),
+        ("Ready and ~TrendOK", 'WAIT_TREND'),
+        ("~Ready and Close <= VWMA20", 'WAIT_BELOW_VWMA'),
+        ("~Ready and Rel_Vol < @REL_VOL", 'WAIT_LOW_RVOL'),
+    ],
+    'reason_sep': "|",
+    'no_reason': "WAIT",
+    'score_clip': (0, 100),
+    'score_dtype': int,
+    'decision': [("Ready and TrendOK", 'READY')],
+    'default_decision': 'WAIT',
+    'columns': {
+        'Date': lambda X, ctx: X['Date'].dt.strftime("%Y-%m-%d"),
+        'Ticker': 'Ticker',
+        'Close': 'Close',
+        'VWMA20': ('VWMA20', 0),
+        'VWMA_Dist_%': ('VWMA_Dist', 2),
+        'Rel_Vol': ('Rel_Vol', 2),
+        'AvgValue20D_IDR': ('AvgValue20D_IDR', 0),
+        'ADR20_%': ('ADR20', 2),
+        'CloseLocation': ('CloseLocation', 2),
+        'BodyRatio': ('BodyRatio', 2),
+        'TrendOK': 'TrendOK',
+        'Decision': 'Decision',
+        'Score': 'Score',
+        'ReasonCodes': 'Reasons',
+    },
+    'post': _ready_rank,
+    'output': "screener_output/idx_vwap_daily_{date}.csv",
+}
+
+BSJP = {
+    'name': "BSJP Screener",
+    'period': "3mo",
+    'min_history': 20,
+    'today': True,
+    'params': {'MIN_PRICE': 50, 'MIN_VALUE': 1_000_000_000},
+    'features': {
+        'Close': 'Close',
+        'Volume': 'Volume',
+        'High': 'High',
+        'Low': 'Low',
+        'Prev_Close': ('Close', 1),
+        'First_Open': ('Open', 'first'),
+        'Value': "Close * Volume",
+        'Change_Pct': "(Close - Prev_Close) / Prev_Close * 100",
+        'Vol_SMA5': 'Vol_SMA5',
+        'Rel_Vol': lambda X, ctx: (X['Volume'] / X['Vol_SMA5']).where(X['Vol_SMA5'] > 0, 0),
+        'Range': "High - Low",
+        'Wick_Ratio': lambda X, ctx: ((X['High'] - np.maximum(X['Close'], X['First_Open'])) / X['Range']).where(X['Range'] != 0, 0),
+        'Lower_Wick': lambda X, ctx: ((np.minimum(X['Close'], X['First_Open']) - X['Low']) / X['Range']).where(X['Range'] != 0, 0),
+        'EMA5': 'EMA5',
+        'EMA20': 'EMA20',
+    },
+    'filters': ["Close >= @MIN_PRICE", "Value >= @MIN_VALUE"],
+    'score': [
+        ("Close > EMA5 and EMA5 > EMA20", 2, "EMA_Flow"),
+        {'tiers': [("Rel_Vol > 1.5", 2, "VolUp"), ("Rel_Vol > 1.0", 1)]},
+        {'tiers': [("Change_Pct > 1.0", 2, "Green"), ("Change_Pct > 0", 1)]},
+        ("Wick_Ratio < 0.3", 1, "StrongClose"),
+        ("Lower_Wick > 0.5 and Change_Pct > 0", 2, "Hammer"),
+    ],
+    'score_dtype': int,
+    'min_score': 1,
+    'columns': {
+        'Ticker': 'Ticker',
+        'Close': 'Close',
+        'Change%': ('Change_Pct', 2),
+        'Volume_B': ("Value / 1000000000", 2),
+        'Rel_Vol': ('Rel_Vol', 2),
+        'Wick_Ratio': ('Wick_Ratio', 2),
+        'Score': 'Score',
+        'Reasons': 'Reasons',
+    },
+    'output': "bsjp_results_{date}.csv",
+}
+
+def ultimate_context(tickers):
+    """IHSG close for the 60-day RS rating (universe RS ranks come with 'ranks')"""
+    from corporate_actions import get_bars
+    ihsg = get_bars("^JKSE", period="6mo")
+    return {'ihsg': ihsg['Close'] if not ihsg.empty else pd.Series(dtype=float)}
+
+def _rs_rating(X, ctx):
+    """ultimate_screener.calculate_rs_rating for every ticker at once"""
+    ihsg = ctx['extras'].get('ihsg', pd.Series(dtype=float))
+    if len(ihsg) < 60:
+        return pd.Series(50, index=X.index)
+    stock = (X['Close'] - ctx['at']('Close', 59)) / ctx['at']('Close', 59) * 100
+    ihsg_ret = (ihsg.iloc[-1] - ihsg.iloc[-60]) / ihsg.iloc[-60] * 100
+    if ihsg_ret == 0:
+        return pd.Series(np.where(stock > 0, 100, 50), index=X.index)
+    rating = (stock / ihsg_ret * 100).clip(0, 200)
+    return rating.fillna(50).astype(int)
+
+ULTIMATE = {
+    'name': "Ultimate Hybrid Screener",
+    'period': "6mo",
+    'min_history': 60,
+    'today': True,
+    'context': "screener_specs:ultimate_context",
+    'ranks': True,
+    'params': {'MIN_PRICE': 50, 'MIN_LIQ': 1_000_000_000},
+    'features': {
+        'Close': 'Close',
+        'Volume': 'Volume',
+        'Value': "Close * Volume",
+        'EMA20': 'EMA20',
+        'EMA50': 'EMA50',
+        'RSI': 'RSI14',
+        'CMF': 'CMF20',
+        'ATR14': 'ATR14',
+        'Vol_SMA20': 'Vol_SMA20',
+        'Rel_Vol': lambda X, ctx: (X['Volume'] / X['Vol_SMA20']).where(X['Vol_SMA20'] > 0, 0),
+        'TrendOK': "Close > EMA20 and EMA20 > EMA50",
+        'MoneyIn': "CMF > 0.05",
+        'RS_Rating': _rs_rating,
+    },
+    'filters': ["Close >= @MIN_PRICE", "Value >= @MIN_LIQ"],
+    'score': [
+        {'tiers': [("TrendOK", 3, "Uptrend"), ("Close > EMA50", 1, "AboveEMA50")]},
+        ("MoneyIn", 2, "MoneyIn"),
+        ("RSI > 50", 1, "RSI+"),
+        ("Rel_Vol > 1.2", 2, "VolSpike"),
+        {'tiers': [("RS_Rating > 120", 2, "Outperform"), ("RS_Rating > 100", 1, "RS+")]},
+        ("RSI > 75", -1, "Overbought"),
+    ],
+    'score_dtype': int,
+    'min_score': 1,
+    'columns': {
+        'Ticker': 'Ticker',
+        'Close': 'Close',
+        'Score': 'Score',
+        'Validation': lambda X, ctx: np.minimum(X['Score'] * 10 + 20 * (X['TrendOK'] & X['MoneyIn']) + 15 * (X['RS_Rating'] > 120), 100),
+        'RS_Rating': 'RS_Rating',
+        'RS_Rank': lambda X, ctx: X['RS_Rank'].astype(int) if X['RS_Rank'].notna().all() else X['RS_Rank'],
+        'Rel_Vol': ('Rel_Vol', 2),
+        'CMF': ('CMF', 3),
+        'RSI': ('RSI', 1),
+        'StopLoss': lambda X, ctx: _atr_levels(X, ctx, 'stop'),
+        'Target': lambda X, ctx: _atr_levels(X, ctx, 'target'),
+        'RR': lambda X, ctx: "1:2",
+        'Reasons': 'Reasons',
+    },
+    'output': "ultimate_results_{date}.csv",
+}
+
+def _obv_signal(X, ctx):
+    """smart_money_screener.detect_obv_divergence on the last 10 bars"""
+    price_slope = (X['Close'] - ctx['at']('Close', 9)) / ctx['at']('Close', 9)
+    obv_10 = ctx['at']('OBV', 9)
+    obv_slope = (X['OBV'] - obv_10) / (obv_10 + 1).abs()
+    return pd.Series(np.select(
+        [(price_slope < 0.02) & (obv_slope > 0.05), (price_slope > 0) & (obv_slope > 0)],
+        ["BULLISH", "ACCUMULATION"], "NEUTRAL"), index=X.index)
+
+SMART_MONEY = {
+    'name': "Smart Money Screener",
+    'period': "6mo",
+    'min_history': 30,
+    'today': True,
+    'params': {'MIN_PRICE': 50},
+    'features': {
+        'Close': 'Close',
+        'Volume': 'Volume',
+        'CMF': 'CMF20',
+        'MFI': 'MFI14',
+        'OBV': 'OBV',
+        'ATR14': 'ATR14',
+        'OBV_Signal': _obv_signal,
+        'OBV_Up': lambda X, ctx: X['OBV'] > ctx['at']('OBV', 4),
+        'Vol_SMA20': 'Vol_SMA20',
+        'Vol_Spike': lambda X, ctx: (X['Volume'] > X['Vol_SMA20'] * 2) & (X['Vol_SMA20'] > 0),
+    },
+    'filters': ["Close >= @MIN_PRICE"],
+    'score': [
+        {'tiers': [("CMF > 0.10", 3, "StrongAccum"), ("CMF > 0.05", 2, "Accum"), ("CMF > 0", 1, "MoneyIn")]},
+        {'tiers': [("MFI > 60", 2, "MFI_Strong"), ("MFI > 50", 1, "MFI+")]},
+        {'tiers': [("OBV_Signal == 'BULLISH'", 3, "OBV_Divergence"),
+                   ("OBV_Signal == 'ACCUMULATION'", 2, "OBV_Accum"),
+                   ("OBV_Up", 1, "OBV+")]},
+        ("Vol_Spike", 2, "VolSpike"),
+    ],
+    'score_dtype': int,
+    'min_score': 1,
+    'columns': {
+        'Ticker': 'Ticker',
+        'Close': 'Close',
+        'Score': 'Score',
+        'Validation_Score': "Score * 15",
+        'CMF': ('CMF', 3),
+        'MFI': ('MFI', 1),
+        'OBV_Signal': 'OBV_Signal',
+        'StopLoss': lambda X, ctx: _atr_levels(X, ctx, 'stop'),
+        'Target': lambda X, ctx: _atr_levels(X, ctx, 'target'),
+        'Reasons': 'Reasons',
+    },
+    'output': "smart_money_enhanced_{date}.csv",
+}
+
+def intraday_prepare(tickers):
+    """Volume curves for the RVOL projection (built once per session date)"""
+    from volume_profile import load_profiles
+    try:
+        load_profiles(tickers)
+    except Exception as e:
+        print(f"[WARN] Volume profiles unavailable, using linear projection: {e}")
+
+def _minute_features(X, ctx):
+    """Today's open, last price, volume, VWAP and last bar time from the 1m panel"""
+    from spec_engine import first_valid_pos, last_valid_pos, value_at
+    from volume_profile import project_volume
+
+    minute = ctx['minute'] or {}
+    if not minute or 'Close' not in minute:
+        # No 1m data: every row fails the M_Bars filter (empty result, not an error)
+        empty = pd.DataFrame(np.nan, index=X.index, columns=['M_Open', 'Price', 'VWAP', 'Projected_Vol'])
+        return empty.assign(M_Bars=0)[['M_Bars', 'M_Open', 'Price', 'VWAP', 'Projected_Vol']]
+    m = {f: frame.reindex(columns=X.index) for f, frame in minute.items()}
+    last = last_valid_pos(m['Close'])
+    total = m['Volume'].sum()
+    price = value_at(m['Close'], last)
+    tp_v = (m['High'] + m['Low'] + m['Close']) / 3 * m['Volume']
+    index = m['Close'].index
+    return pd.DataFrame({
+        'M_Bars': m['Close'].notna().sum(),
+        'M_Open': value_at(m['Open'], first_valid_pos(m['Close'])),
+        'Price': price,
+        'VWAP': (tp_v.sum() / total).where(total > 0, price),
+        'Projected_Vol': [project_volume(t, v, index[p]) if p >= 0 else np.nan
+                          for t, v, p in zip(X.index, total, last)],
+    }, index=X.index)
+
+INTRADAY_MOMENTUM = {
+    'name': "Intraday Momentum Screener",
+    'period': "1mo",
+    'min_history': 5,
+    'minute': True,
+    'prepare': "screener_specs:intraday_prepare",
+    'params': {'MIN_PRICE': 50},
+    'features': {
+        'Minute': _minute_features,
+        'Prev_Close': ('Close', 1),
+        'Gap': "(M_Open - Prev_Close) / Prev_Close * 100",
+        'Change': "(Price - M_Open) / M_Open * 100",
+        'Avg_Vol_20': ('Vol_SMA20', 1),
+        'RVOL': lambda X, ctx: (X['Projected_Vol'] / X['Avg_Vol_20']).where(
+            X['Avg_Vol_20'].notna() & (X['Avg_Vol_20'] != 0),
+            (X['Projected_Vol'] / ctx['get']('Volume').mean().reindex(X.index)).where(
+                ctx['get']('Volume').mean().reindex(X.index) > 0, 1.0)),
+        'VWAP_Dist': lambda X, ctx: ((X['Price'] - X['VWAP']) / X['VWAP'] * 100).where(X['VWAP'] > 0, 0),
+        'RSI': 'RSI14',
+    },
+    'filters': ["M_Bars >= 5", "Price >= @MIN_PRICE", "Gap >= -2.0"],
+    'score': [
+        {'tiers': [("Gap > 0.5", 2, "GapUp"), ("Gap > 0", 1, "Flat")]},
+        {'tiers': [("RVOL > 2.0", 3, "VolSpike"), ("RVOL > 1.2", 2, "VolUp"), ("RVOL > 0.8", 1)]},
+        ("Price > VWAP", 2, "AboveVWAP"),
+        {'tiers': [("Change > 1.0", 2, "Momo+"), ("Change > 0", 1)]},
+        ("RSI > 80", -2, "OVERBOUGHT"),
+    ],
+    'score_dtype': int,
+    'min_score': 1,
+    'decision': [("Score >= 7", 'READY'), ("Score >= 4", 'WATCH')],
+    'default_decision': 'WAIT',
+    'columns': {
+        'Ticker': 'Ticker',
+        'Time': lambda X, ctx: pd.Timestamp.now().strftime("%H:%M"),
+        'Close': 'Price',
+        'Change%': ('Change', 2),
+        'Gap%': ('Gap', 2),
+        'RVOL': ('RVOL', 2),
+        'VWAP_Dist%': ('VWAP_Dist', 2),
+        'RSI': lambda X, ctx: X['RSI'].round(1).fillna(50),
+        'Score': 'Score',
+        'Decision': 'Decision',
+        'Reasons': 'Reasons',
+    },
+    'output': "intraday_momentum_{now}.csv",
+}
+
+SPECS = {
+    'intraday_momentum': INTRADAY_MOMENTUM,
+    'bsjp': BSJP,
+    'idx_swing': IDX_SWING,
+    'vwap_pro': VWAP_PRO,
+    'ultimate': ULTIMATE,
+    'smart_money': SMART_MONEY,
+}
+
+_plans = {}
+
+def get_plan(key, overrides=None):
+    """
+    Plan for a spec key (compiled once) with the current config_store params
+    and optional per-run overrides; plan['config'] is their hash
+    """
+    import config_store
+    from spec_engine import compile_spec
+    if key not in _plans:
+        if key not in SPECS:
+            raise KeyError(f"Unknown screener spec: {key}")
+        _plans[key] = compile_spec(SPECS[key], key)
+    params = config_store.params(key, overrides)
+    return dict(_plans[key], params=params, config=config_store.hash_params(params))
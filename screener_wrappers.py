@@ -3,18 +3,28 @@ Screener Wrapper Module
 Runs screeners LIVE and returns DataFrame results
 """
 
-import pandas as pd
 import glob
+import importlib.util
 import os
+import threading
+import time
 from datetime import datetime
 
+def latest_csv_path(pattern):
+    """Path of the newest CSV matching the pattern (None if there is none)"""
+    files = glob.glob(pattern)
+    if not files:
+        return None
+    return max(files, key=os.path.getctime)
+
 def load_latest_csv(pattern):
     """Load the latest CSV file matching the pattern"""
+    import pandas as pd
+    
     try:
-        files = glob.glob(pattern)
-        if not files:
+        latest_file = latest_csv_path(pattern)
+        if latest_file is None:
             return pd.DataFrame()
-        latest_file = max(files, key=os.path.getctime)
         df = pd.read_csv(latest_file)
         if 'Score' in df.columns:
             df = df.sort_values('Score', ascending=False).reset_index(drop=True)
@@ -48,7 +58,9 @@ def run_idx_swing():
     """Run IDX Swing Screener LIVE"""
     try:
         from idx_swing_screener import main
-        main()
+        df = main()
+        if df is not None and not df.empty:
+            return df
     except Exception as e:
         print(f"IDX Swing error: {e}")
     return load_latest_csv("idx_vwap_daily_*.csv")
@@ -57,10 +69,12 @@ def run_vwap_pro():
     """Run VWAP Pro Screener LIVE"""
     try:
         from vwap_screener_pro import run_daily_scan
-        run_daily_scan()
+        df = run_daily_scan()
+        if df is not None and not df.empty:
+            return df
     except Exception as e:
         print(f"VWAP Pro error: {e}")
-    return load_latest_csv("idx_vwap_daily_*.csv")
+    return load_latest_csv("screener_output/idx_vwap_daily_*.csv")
 
 def run_ultimate():
     """Run Ultimate Screener LIVE"""
@@ -93,15 +107,249 @@ SCREENER_FUNCTIONS = {
     'smart_money': run_smart_money
 }
 
-def run_screener(screener_key):
-    """Run any screener by key"""
-    if screener_key not in SCREENER_FUNCTIONS:
+# Streaming entry points: (module, generator function, fallback CSV pattern)
+SCREENER_ITERATORS = {
+    'intraday_momentum': ('intraday_momentum_screener', 'iter_intraday_screener', "intraday_momentum_*.csv"),
+    'bsjp': ('bsjp_screener', 'iter_screener', "bsjp_results_*.csv"),
+    'idx_swing': ('idx_swing_screener', 'iter_main', "idx_vwap_daily_*.csv"),
+    'vwap_pro': ('vwap_screener_pro', 'iter_daily_scan', "screener_output/idx_vwap_daily_*.csv"),
+    'ultimate': ('ultimate_screener', 'iter_ultimate', "ultimate_results_*.csv"),
+    'smart_money': ('smart_money_screener', 'iter_screener', "smart_money_enhanced_*.csv")
+}
+
+# Run the six built-in screeners through their declarative specs
+# (screener_specs) instead of the per-ticker modules. Keys that exist only
+# as specs, and screeners whose config_store params differ from the
+# defaults (the per-ticker modules cannot read them), always use the spec
+# engine.
+USE_SPEC_ENGINE = False
+
+def _spec_keys():
+    try:
+        from screener_specs import SPECS
+        return set(SPECS)
+    except Exception as e:
+        print(f"[WARN] Screener specs unavailable: {e}")
+        return set()
+
+def _config_hash(screener_key):
+    """config_store hash of a spec screener's params (None for other keys)"""
+    if screener_key not in _spec_keys():
+        return None
+    from config_store import config_hash
+    return config_hash(screener_key)
+
+def _resolve_iterator(screener_key, overrides=None):
+    """(generator function, fallback CSV pattern) for a key, or None"""
+    import importlib
+    from functools import partial
+    
+    if screener_key in _spec_keys():
+        from config_store import is_customized
+        if USE_SPEC_ENGINE or screener_key not in SCREENER_ITERATORS or is_customized(screener_key, overrides):
+            from screener_specs import get_plan
+            from spec_engine import iter_spec_screener, output_pattern
+            return (partial(iter_spec_screener, screener_key, overrides=overrides),
+                    output_pattern(get_plan(screener_key)))
+    if screener_key in SCREENER_ITERATORS:
+        module_name, func_name, pattern = SCREENER_ITERATORS[screener_key]
+        return (lambda **kwargs: getattr(importlib.import_module(module_name), func_name)(**kwargs)), pattern
+    return None
+
+def iter_screener(screener_key, chunk_size=None, overrides=None):
+    """
+    Run any screener by key, yielding partial results as the scan progresses
+    
+    Yields dicts with done, total and results (DataFrame so far). Exactly
+    one item has final=True: when the scan finds nothing it carries the
+    latest saved CSV instead (except runs with per-run overrides), on
+    failure the CSV plus an 'error' message. Finished live scans are stored as the latest
+    snapshot in scan_store and appended to the analytics_store history,
+    except runs with per-run param overrides (experiments).
+    """
+    import pandas as pd
+    
+    try:
+        resolved = _resolve_iterator(screener_key, overrides)
+    except ValueError as e:
+        yield {"done": 0, "total": 0, "results": pd.DataFrame(), "final": True, "error": str(e)}
+        return
+    if resolved is None:
+        yield {"done": 0, "total": 0, "results": pd.DataFrame(), "final": True,
+               "error": f"Unknown screener: {screener_key}"}
+        return
+    
+    func, pattern = resolved
+    last = {"done": 0, "total": 0, "results": pd.DataFrame()}
+    try:
+        kwargs = {"chunk_size": chunk_size} if chunk_size else {}
+        for progress in func(**kwargs):
+            last = progress
+            if progress.get("final"):
+                break
+            yield progress
+        if last.get("final") and (overrides or not last["results"].empty):
+            if not last["results"].empty and not overrides:
+                from scan_store import save_snapshot
+                save_snapshot(screener_key, last["results"])
+                _record_history(screener_key, last["results"])
+            yield last
+            return
+    except Exception as e:
+        print(f"{screener_key} error: {e}")
+        last = dict(last, error=str(e))
+    
+    # Nothing (or failure) from the live scan: fall back to the last saved CSV
+    yield dict(last, results=load_latest_csv(pattern) if pattern else pd.DataFrame(), final=True)
+
+# ========================================
+# SINGLE-FLIGHT SCANS
+# ========================================
+
+# Seconds a caller waits on someone else's scan before falling back to
+# the last snapshot
+SCAN_WAIT_TIMEOUT = 600
+SCAN_POLL_INTERVAL = 0.5
+
+# (key, config hash) -> flight dict (one in-flight scan per screener and
+# config; a caller arriving after a config change starts a new scan)
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def _join_flight(screener_key):
+    """Return (flight, is_leader); the first caller for a key becomes the leader"""
+    flight_key = (screener_key, _config_hash(screener_key))
+    with _inflight_lock:
+        flight = _inflight.get(flight_key)
+        if flight is not None:
+            flight['waiters'] += 1
+            return flight, False
+        flight = {
+            'key': screener_key,
+            'flight_key': flight_key,
+            'done': threading.Event(),
+            'progress': {"done": 0, "total": 0, "results": None},
+            'final': None,
+            'started': time.time(),
+            'waiters': 0,
+        }
+        _inflight[flight_key] = flight
+        return flight, True
+
+def _land_flight(flight, final=None):
+    """Publish the final progress item and release waiting callers"""
+    with _inflight_lock:
+        flight['final'] = final
+        if _inflight.get(flight['flight_key']) is flight:
+            del _inflight[flight['flight_key']]
+    flight['done'].set()
+
+def _snapshot_fallback(screener_key, progress, reason):
+    """Final progress item carrying the last stored snapshot"""
+    from scan_store import get_snapshot, snapshot_frame
+    return dict(progress, results=snapshot_frame(get_snapshot(screener_key)),
+                final=True, stale=True, error=reason)
+
+def get_scan_progress(screener_key):
+    """
+    Progress handle of the in-flight scan for screener_key (None if idle)
+    
+    Returns dict with done, total, started (epoch seconds) and waiters.
+    """
+    flights = [f for f in list(_inflight.values()) if f['key'] == screener_key]
+    if not flights:
+        return None
+    flight = max(flights, key=lambda f: f['started'])
+    progress = flight['progress']
+    return {"done": progress.get("done", 0), "total": progress.get("total", 0),
+            "started": flight['started'], "waiters": flight['waiters']}
+
+def iter_screener_shared(screener_key, chunk_size=None, timeout=SCAN_WAIT_TIMEOUT,
+                         poll_interval=SCAN_POLL_INTERVAL, overrides=None):
+    """
+    iter_screener with single-flight semantics
+    
+    The first caller for a screener runs the scan; callers arriving while it
+    runs follow its progress (items marked shared=True) and receive the same
+    final results object. A follower that waits longer than timeout gets the
+    last snapshot instead (stale=True). Runs with per-run overrides are
+    never shared.
+    """
+    if overrides:
+        yield from iter_screener(screener_key, chunk_size, overrides)
+        return
+    
+    flight, leader = _join_flight(screener_key)
+    
+    if leader:
+        final = None
+        try:
+            for progress in iter_screener(screener_key, chunk_size):
+                flight['progress'] = progress
+                if progress.get("final"):
+                    # Release followers before handing the result to our caller,
+                    # who may stop iterating right after the final item
+                    final = progress
+                    _land_flight(flight, final)
+                yield progress
+        finally:
+            if final is None:
+                _land_flight(flight)
+        return
+    
+    deadline = time.time() + timeout
+    seen = None
+    while not flight['done'].wait(poll_interval):
+        progress = flight['progress']
+        if progress is not seen and progress.get("results") is not None:
+            seen = progress
+            yield dict(progress, shared=True)
+        if time.time() > deadline:
+            yield _snapshot_fallback(screener_key, flight['progress'],
+                                     f"Timed out after {timeout}s waiting for running scan")
+            return
+    
+    if flight['final'] is not None:
+        yield dict(flight['final'], shared=True)
+    else:
+        yield _snapshot_fallback(screener_key, flight['progress'], "Running scan was interrupted")
+
+def _record_history(screener_key, df):
+    """Append a finished scan to the SQLite history (never fails the scan)"""
+    try:
+        from analytics_store import record_scan
+        record_scan(screener_key, df)
+    except Exception as e:
+        print(f"[WARN] Scan history not recorded: {e}")
+
+def run_screener(screener_key, timeout=SCAN_WAIT_TIMEOUT, overrides=None):
+    """
+    Run any screener by key (the result becomes its latest snapshot unless
+    overrides, per-run config_store params, are given)
+    
+    Concurrent calls for the same key share one scan and get the same
+    DataFrame; see iter_screener_shared.
+    """
+    import pandas as pd
+    
+    if screener_key not in SCREENER_FUNCTIONS and screener_key not in _spec_keys():
         print(f"Unknown screener: {screener_key}")
         return pd.DataFrame()
-    return SCREENER_FUNCTIONS[screener_key]()
+    
+    last = None
+    for progress in iter_screener_shared(screener_key, timeout=timeout, overrides=overrides):
+        last = progress
+    if last is None or last["results"] is None:
+        return pd.DataFrame()
+    return last["results"]
 
 def get_screener_status():
-    """Check status of all screeners"""
+    """
+    Check status of all screeners
+    
+    Uses find_spec so the check does not import the screener modules
+    (and with them yfinance / the universe) just to report availability.
+    """
     status = {}
     modules = [
         ('intraday_momentum_screener', 'Intraday Momentum'),
@@ -113,10 +361,10 @@ def get_screener_status():
     ]
     for module_name, display_name in modules:
         try:
-            __import__(module_name)
-            status[display_name] = "[OK] Ready"
-        except ImportError:
-            status[display_name] = "[!] Not Found"
+            if importlib.util.find_spec(module_name) is not None:
+                status[display_name] = "[OK] Ready"
+            else:
+                status[display_name] = "[!] Not Found"
         except Exception as e:
             status[display_name] = f"[!] {str(e)[:20]}"
     return status
@@ -0,0 +1,207 @@
+"""
+Signal Analytics
+Does a screener's Score predict forward returns? Hit rate and mean return
+per score bucket, daily rank IC and IC decay, all vectorized over the
+date x ticker panel and cached per screener version
+"""
+
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+HORIZONS = (1, 3, 5, 10)
+DECAY_HORIZONS = tuple(range(1, 21))
+
+# Same bands as the dashboard's "Score Interpretation" (0-10 scores)
+SCORE_BUCKETS = [(-np.inf, 4, "1-3 Wait"), (4, 7, "4-6 Good"), (7, np.inf, "7-10 Excellent")]
+QUANTILE_BUCKETS = 5  # Used for screeners whose score is not on the 0-10 scale
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "signal_cache")
+
+# ========================================
+# CORE (panels: index = dates, columns = tickers)
+# ========================================
+
+def forward_returns(close, horizons=HORIZONS):
+    """{h: close[t+h] / close[t] - 1} over trading days"""
+    return {h: close.shift(-h) / close - 1 for h in horizons}
+
+def _align(score, close):
+    close = close.reindex(columns=score.columns)
+    close = close[~close.index.duplicated()].sort_index()
+    score = score.reindex(index=close.index)
+    return score, close
+
+def score_buckets(score):
+    """Bucket label per cell: fixed 0-10 bands, or quintiles per date for other scales"""
+    values = score.to_numpy(dtype=float)
+    labels = np.full(values.shape, None, dtype=object)
+    finite = values[np.isfinite(values)]
+    if finite.size == 0 or finite.max() <= 10:
+        for low, high, name in SCORE_BUCKETS:
+            labels[(values >= low) & (values < high)] = name
+    else:
+        pct = score.rank(axis=1, pct=True).to_numpy()
+        q = np.ceil(pct * QUANTILE_BUCKETS).clip(1, QUANTILE_BUCKETS)
+        for i in range(1, QUANTILE_BUCKETS + 1):
+            labels[q == i] = f"Q{i}"
+    return labels
+
+def bucket_stats(score, fwd):
+    """
+    Count, hit rate and mean / median forward return per score bucket
+
+    Args:
+        score: score panel
+        fwd: {horizon: forward return panel} aligned to score
+    """
+    labels = score_buckets(score)
+    rows = []
+    for h, ret in fwd.items():
+        r = ret.to_numpy(dtype=float)
+        valid = ~np.isnan(r) & (labels != None)  # noqa: E711
+        frame = pd.DataFrame({'Bucket': labels[valid], 'Ret': r[valid], 'Hit': r[valid] > 0})
+        g = frame.groupby('Bucket')
+        stats = pd.DataFrame({
+            'Count': g.size(),
+            'Hit_Rate_%': (g['Hit'].mean() * 100).round(1),
+            'Mean_Ret_%': (g['Ret'].mean() * 100).round(2),
+            'Median_Ret_%': (g['Ret'].median() * 100).round(2),
+        })
+        stats['Horizon'] = h
+        rows.append(stats.reset_index())
+    if not rows:
+        return pd.DataFrame()
+    return pd.concat(rows, ignore_index=True)[['Horizon', 'Bucket', 'Count', 'Hit_Rate_%', 'Mean_Ret_%', 'Median_Ret_%']]
+
+def rank_ic(score, ret, min_names=5):
+    """Daily Spearman IC between score and forward return (Series by date)"""
+    mask = score.notna() & ret.notna()
+    s = score.where(mask).rank(axis=1)
+    r = ret.where(mask).rank(axis=1)
+    s = s.sub(s.mean(axis=1), axis=0)
+    r = r.sub(r.mean(axis=1), axis=0)
+    num = (s * r).sum(axis=1)
+    den = np.sqrt((s ** 2).sum(axis=1) * (r ** 2).sum(axis=1))
+    ic = num / den.replace(0, np.nan)
+    return ic[mask.sum(axis=1) >= min_names]
+
+def ic_summary(score, fwd):
+    """Mean IC, IC std, IR and t-stat per horizon"""
+    rows = {}
+    for h, ret in fwd.items():
+        ic = rank_ic(score, ret).dropna()
+        n = len(ic)
+        mean, std = (ic.mean(), ic.std()) if n else (np.nan, np.nan)
+        rows[h] = {
+            'Days': n,
+            'Mean_IC': round(mean, 4) if n else np.nan,
+            'IC_Std': round(std, 4) if n > 1 else np.nan,
+            'IC_IR': round(mean / std, 2) if n > 1 and std > 0 else np.nan,
+            't_stat': round(mean / std * np.sqrt(n), 2) if n > 1 and std > 0 else np.nan,
+        }
+    out = pd.DataFrame(rows).T.astype({'Days': int})
+    out.index.name = 'Horizon'
+    return out
+
+def decay_curve(score, close, horizons=DECAY_HORIZONS):
+    """Mean rank IC by holding horizon (how fast the signal fades)"""
+    fwd = forward_returns(close, horizons)
+    return pd.Series({h: rank_ic(score, fwd[h]).mean() for h in horizons}, name='Mean_IC')
+
+def analyze_signal(score, close, horizons=HORIZONS):
+    """
+    Full report for one score panel
+
+    Returns:
+        dict with buckets (DataFrame), ic (DataFrame by horizon) and
+        decay (Series of mean IC for 1..20 days)
+    """
+    score, close = _align(score, close)
+    fwd = forward_returns(close, horizons)
+    return {
+        'buckets': bucket_stats(score, fwd),
+        'ic': ic_summary(score, fwd),
+        'decay': decay_curve(score, close),
+    }
+
+# ========================================
+# CACHED PER SCREENER VERSION
+# ========================================
+
+_report_cache = {}
+
+def screener_version(screener_key):
+    """
+    crc32 of the screener's source (plus config_swing for idx_swing);
+    spec-only screeners hash screener_specs and spec_engine
+    """
+    import importlib.util
+    from screener_wrappers import SCREENER_ITERATORS
+
+    if screener_key in SCREENER_ITERATORS:
+        modules = [SCREENER_ITERATORS[screener_key][0]]
+    else:
+        from screener_specs import SPECS
+        if screener_key not in SPECS:
+            raise KeyError(f"Unknown screener: {screener_key}")
+        modules = ['screener_specs', 'spec_engine']
+    if screener_key == 'idx_swing':
+        modules.append('config_swing')
+    crc = 0
+    for name in modules:
+        spec = importlib.util.find_spec(name)
+        if spec is not None and spec.origin and os.path.exists(spec.origin):
+            with open(spec.origin, 'rb') as f:
+                crc = zlib.crc32(f.read(), crc)
+    return f"{crc:08x}"
+
+def _data_version(score, close):
+    if score.empty:
+        return "empty"
+    return f"{score.index[-1]:%Y%m%d}-{score.shape[0]}x{score.shape[1]}-{close.index[-1]:%Y%m%d}"
+
+def get_signal_report(screener_key, start=None, end=None, refresh=False, db_path=None):
+    """
+    Signal report for a screener from analytics_store history
+
+    Cached in memory and in CACHE_DIR per (screener source version, data
+    range), so dashboards load instantly until the code or data changes.
+    """
+    from analytics_store import price_history, score_history
+
+    score = score_history(screener_key, start, end, path=db_path)
+    if score.empty:
+        return None
+    close = price_history(list(score.columns), start=score.index[0], path=db_path)
+    if close.empty:
+        return None
+
+    key = f"{screener_key}_{screener_version(screener_key)}_{_data_version(score, close)}"
+    if not refresh and key in _report_cache:
+        return _report_cache[key]
+
+    path = os.path.join(CACHE_DIR, f"{key}.pkl")
+    if not refresh and os.path.exists(path):
+        report = pd.read_pickle(path)
+    else:
+        report = analyze_signal(score, close)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        pd.to_pickle(report, path)
+    _report_cache[key] = report
+    return report
+
+if __name__ == "__main__":
+    import sys
+    key = sys.argv[1] if len(sys.argv) > 1 else "idx_swing"
+    report = get_signal_report(key)
+    if report is None:
+        print(f"No history for {key}; run analytics_store backfill first")
+    else:
+        print(report['buckets'].to_string(index=False))
+        print()
+        print(report['ic'].to_string())
+        print()
+        print(report['decay'].round(4).to_string())
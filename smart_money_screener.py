@@ -1,50 +1,16 @@
-import yfinance as yf
 import pandas as pd
-import numpy as np
 import time
-from datetime import datetime
 
 from stock_universe import EXPANDED_UNIVERSE as STOCK_UNIVERSE
-from market_utils import get_cached_market_regime, calculate_atr_stop_loss
+from market_utils import get_cached_market_regime, calculate_atr_stop_loss, iter_scan, SCAN_CHUNK_SIZE
+from idx_calendar import session_date
+from data_quality import clean_bars, MIN_HEALTH
+from corporate_actions import get_bars
+from bar_resampler import prefetch_today, splice_today, today_bar
+from indicators import compute as compute_indicators
 
 MIN_PRICE = 50
 
-def calculate_mfi(df, length=14):
-    typical_price = (df['High'] + df['Low'] + df['Close']) / 3
-    money_flow = typical_price * df['Volume']
-    
-    positive_flow = np.where(typical_price > typical_price.shift(1), money_flow, 0)
-    negative_flow = np.where(typical_price < typical_price.shift(1), money_flow, 0)
-    
-    positive_flow = pd.Series(positive_flow, index=df.index)
-    negative_flow = pd.Series(negative_flow, index=df.index)
-    
-    positive_flow_sum = positive_flow.rolling(window=length).sum()
-    negative_flow_sum = negative_flow.rolling(window=length).sum()
-    
-    mfi = 100 - (100 / (1 + positive_flow_sum / (negative_flow_sum + 0.0001)))
-    return mfi
-
-def calculate_cmf(df, length=20):
-    denom = df['High'] - df['Low']
-    denom = denom.replace(0, 0.0001)
-    mf_multiplier = ((df['Close'] - df['Low']) - (df['High'] - df['Close'])) / denom
-    mf_volume = mf_multiplier * df['Volume']
-    cmf = mf_volume.rolling(window=length).sum() / df['Volume'].rolling(window=length).sum()
-    return cmf
-
-def calculate_obv(df):
-    """Calculate On-Balance Volume (OBV) - institutional accumulation indicator"""
-    obv = [0]
-    for i in range(1, len(df)):
-        if df['Close'].iloc[i] > df['Close'].iloc[i-1]:
-            obv.append(obv[-1] + df['Volume'].iloc[i])
-        elif df['Close'].iloc[i] < df['Close'].iloc[i-1]:
-            obv.append(obv[-1] - df['Volume'].iloc[i])
-        else:
-            obv.append(obv[-1])
-    return pd.Series(obv, index=df.index)
-
 def detect_obv_divergence(df):
     """Detect bullish divergence: Price down, OBV up (accumulation)"""
     try:
@@ -64,28 +30,23 @@ def detect_obv_divergence(df):
 
 def analyze_ticker(ticker):
     try:
-        df = yf.download(ticker, period="6mo", interval="1d", progress=False)
+        df = get_bars(ticker, period="6mo")
         if len(df) < 30: return None
         if isinstance(df.columns, pd.MultiIndex): df.columns = [c[0] for c in df.columns]
+        df, health = clean_bars(df, ticker)
+        if health < MIN_HEALTH or len(df) < 30: return None
 
-        # Real-time
-        try:
-            df_today = yf.download(ticker, period="1d", interval="1m", progress=False)
-            if not df_today.empty:
-                if isinstance(df_today.columns, pd.MultiIndex): 
-                    df_today.columns = [c[0] for c in df_today.columns]
-                current_price = df_today.iloc[-1]['Close']
-            else:
-                current_price = df.iloc[-1]['Close']
-        except:
-             current_price = df.iloc[-1]['Close']
+        # Real-time: today-so-far bar from the shared 1m panel
+        df = splice_today(df, today_bar(ticker))
+        current_price = df.iloc[-1]['Close']
              
         if current_price < MIN_PRICE: return None
         
         # Indicators (ENHANCED with OBV)
-        df['CMF'] = calculate_cmf(df, 20)
-        df['MFI'] = calculate_mfi(df, 14)
-        df['OBV'] = calculate_obv(df)
+        ind = compute_indicators(df, ['CMF20', 'MFI14', 'OBV', 'Vol_SMA20'])
+        df['CMF'] = ind['CMF20']
+        df['MFI'] = ind['MFI14']
+        df['OBV'] = ind['OBV']
         
         # ATR Stop Loss (NEW FEATURE)
         risk_mgmt = calculate_atr_stop_loss(df, atr_multiplier=2.0)
@@ -95,7 +56,7 @@ def analyze_ticker(ticker):
         obv_trend_up = df['OBV'].iloc[-1] > df['OBV'].iloc[-5]
         
         # Volume spike detection
-        avg_volume = df['Volume'].rolling(20).mean().iloc[-1]
+        avg_volume = ind['Vol_SMA20'].iloc[-1]
         vol_spike = df['Volume'].iloc[-1] > (avg_volume * 2) if avg_volume > 0 else False
         
         row = df.iloc[-1]
@@ -155,7 +116,8 @@ def analyze_ticker(ticker):
         return None
     return None
 
-def run_screener():
+def iter_screener(chunk_size=SCAN_CHUNK_SIZE):
+    """Scan the universe, yielding partial results every chunk_size tickers"""
     print(f"Running Smart Money Screener...")
     print(f"Universe: {len(STOCK_UNIVERSE)} stocks")
     
@@ -163,27 +125,33 @@ def run_screener():
     regime_info = get_cached_market_regime()
     print(f"Market Regime: {regime_info['regime']}")
     
-    results = []
+    df = pd.DataFrame()
+    
+    # Today's 1m bars for the whole universe in one request (see bar_resampler)
+    prefetch_today(STOCK_UNIVERSE)
     
     start_t = time.time()
-    for i, ticker in enumerate(STOCK_UNIVERSE):
-        print(f"[{i+1}/{len(STOCK_UNIVERSE)}] Scanning {ticker}...", end='\r')
-        res = analyze_ticker(ticker)
-        if res:
-            results.append(res)
+    for progress in iter_scan(STOCK_UNIVERSE, analyze_ticker, chunk_size):
+        print(f"[{progress['done']}/{progress['total']}] Scanning {progress['ticker']}...", end='\r')
+        df = progress['results']
+        yield progress
     
     elapsed = time.time() - start_t
     print(f"\nScan completed in {elapsed:.1f}s")
             
-    if results:
-        df = pd.DataFrame(results)
-        df = df.sort_values('Score', ascending=False)
-        fname = f"smart_money_enhanced_{datetime.now().strftime('%Y%m%d')}.csv"
+    if not df.empty:
+        fname = f"smart_money_enhanced_{session_date().strftime('%Y%m%d')}.csv"
         df.to_csv(fname, index=False)
         print(f"Found {len(df)} candidates. Saved to {fname}")
-        return df
-    print("No candidates found.")
-    return pd.DataFrame()
+    else:
+        print("No candidates found.")
+    yield {"done": len(STOCK_UNIVERSE), "total": len(STOCK_UNIVERSE), "results": df, "final": True}
+
+def run_screener():
+    df = pd.DataFrame()
+    for progress in iter_screener():
+        df = progress['results']
+    return df
 
 if __name__ == "__main__":
     run_screener()
@@ -0,0 +1,613 @@
+"""
+Declarative Screener Engine
+Compiles screener specs (see screener_specs) into plans that are evaluated
+once over the universe panel: one download, indicators as wide frames and
+filters / gates / score rules / decisions as vectorized column expressions
+instead of a per-ticker loop
+"""
+
+import importlib
+import threading
+import time
+import weakref
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import indicators
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+_PERIOD_DAYS = {"5d": 7, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827}
+
+# Spec keys and their defaults
+SPEC_DEFAULTS = {
+    'name': None,
+    'universe': "expanded",     # "expanded", "file:<path>", a list, or "module:function"
+    'period': "6mo",
+    'adjust': "total",          # "total" or "split" (see corporate_actions)
+    'min_history': 1,           # Valid daily bars required
+    'today': False,             # Splice today's bar from 1m data onto the daily panel
+    'minute': False,            # Load today's 1m panel (ctx['minute'])
+    'prepare': None,            # "module:function"(tickers) run before evaluation
+    'context': None,            # "module:function"(tickers) -> dict, ctx['extras']
+    'ranks': False,             # Universe RS rank (RS_Rank, 1-99) and rank z-score (RS_Z) features
+    'params': {},               # Thresholds, available as @name in expressions
+    'indicators': {},           # alias -> registry name (see indicators), or fn(panel, get) -> wide frame
+    'features': {},             # name -> source (see _feature)
+    'filters': [],              # conditions; rows failing any are dropped
+    'gates': [],                # (condition, {column: value}); first match overrides the result
+    'score': [],                # (condition, points[, reason]) or {'tiers': [...]}; None = always
+    'reasons': [],              # (condition, code) appended after score reasons
+    'reason_sep': ", ",
+    'no_reason': "Baseline",
+    'score_clip': None,         # (low, high)
+    'score_dtype': None,        # e.g. int (truncates like int())
+    'min_score': None,
+    'decision': [],             # (condition, label); label may be a flags dict
+    'default_decision': None,
+    'columns': {},              # output column -> source or (source, ndigits)
+    'post': None,               # "module:function"(df) -> df, else sort by Score
+    'output': None,             # CSV name; {date} = session date, {now} = %Y%m%d_%H%M
+}
+
+# ========================================
+# COMPILATION
+# ========================================
+
+def _resolve(ref):
+    """'module:function' -> callable (callables pass through)"""
+    if ref is None or callable(ref):
+        return ref
+    module_name, func_name = ref.split(':', 1)
+    return getattr(importlib.import_module(module_name), func_name)
+
+def _check_condition(cond, where):
+    if not (cond is None or isinstance(cond, str) or callable(cond)):
+        raise ValueError(f"{where}: condition must be an expression string or callable")
+
+def compile_spec(spec, key=None):
+    """
+    Validate a spec and fill in defaults
+
+    Returns a plan dict (the spec with every key present and score rules
+    normalized to lists of tiers) ready for evaluate.
+    """
+    unknown = set(spec) - set(SPEC_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown spec keys: {sorted(unknown)}")
+    plan = {k: spec.get(k, v) for k, v in SPEC_DEFAULTS.items()}
+    plan['key'] = key
+    if plan['name'] is None:
+        plan['name'] = key
+    if plan['adjust'] not in ("total", "split"):
+        raise ValueError(f"{key}: adjust must be 'total' or 'split'")
+    if plan['period'] not in _PERIOD_DAYS:
+        raise ValueError(f"{key}: period must be one of {list(_PERIOD_DAYS)}")
+    if not plan['columns']:
+        raise ValueError(f"{key}: spec needs output columns")
+    for alias, source in plan['indicators'].items():
+        if not callable(source):
+            try:
+                indicators.dependency_order([source])
+            except (KeyError, ValueError) as e:
+                raise ValueError(f"{key}: indicator {alias}: {e}") from None
+
+    tiers = []
+    for rule in plan['score']:
+        group = rule['tiers'] if isinstance(rule, dict) else [rule]
+        normalized = []
+        for tier in group:
+            cond, points, reason = (tuple(tier) + (None,))[:3]
+            _check_condition(cond, f"{key} score")
+            normalized.append((cond, points, reason))
+        tiers.append(normalized)
+    plan['score'] = tiers
+
+    for cond in plan['filters']:
+        _check_condition(cond, f"{key} filter")
+    for cond, _ in plan['gates'] + plan['reasons'] + plan['decision']:
+        _check_condition(cond, f"{key} rule")
+    return plan
+
+# ========================================
+# EXPRESSIONS
+# ========================================
+
+def _eval(expr, X, ctx):
+    """Expression string (DataFrame.eval with @params), callable(X, ctx) or constant"""
+    if callable(expr):
+        out = expr(X, ctx)
+    elif isinstance(expr, str):
+        out = X.eval(expr, local_dict=ctx['params'], engine='python')
+    else:
+        return pd.Series(expr, index=X.index)
+    if isinstance(out, pd.Series):
+        return out.reindex(X.index)
+    return pd.Series(np.broadcast_to(out, len(X.index)), index=X.index)
+
+def _mask(cond, X, ctx):
+    """Boolean row mask; None means every row"""
+    if cond is None:
+        return np.ones(len(X), dtype=bool)
+    return _eval(cond, X, ctx).fillna(False).astype(bool).to_numpy()
+
+def _join_codes(acc, mask, code, sep):
+    """Vectorized append of code to the reason strings where mask is set"""
+    joined = np.where(acc == "", code, acc + sep + code)
+    return np.where(mask, joined, acc)
+
+# ========================================
+# PANEL ACCESS
+# ========================================
+
+def last_valid_pos(frame):
+    """Row position of each column's last non-NaN value (-1 if none)"""
+    valid = frame.notna().to_numpy()
+    n = len(valid)
+    pos = n - 1 - np.argmax(valid[::-1], axis=0)
+    return np.where(valid.any(axis=0), pos, -1)
+
+def first_valid_pos(frame):
+    valid = frame.notna().to_numpy()
+    return np.where(valid.any(axis=0), np.argmax(valid, axis=0), -1)
+
+def value_at(frame, pos):
+    """Per-column value at row positions pos (NaN where pos < 0)"""
+    values = frame.to_numpy(dtype=float)
+    out = np.full(len(pos), np.nan)
+    ok = pos >= 0
+    out[ok] = values[pos[ok], np.flatnonzero(ok)]
+    return pd.Series(out, index=frame.columns)
+
+def _make_context(plan, panel, tickers, extras, minute, source=None):
+    memo = {}
+    source = panel if source is None else source
+    subset = list(source['Close'].columns) != tickers
+
+    def get(name):
+        """
+        Panel field, spec indicator or registry indicator; registry nodes are
+        computed on the whole source panel so every spec shares them
+        """
+        if name in panel:
+            return panel[name]
+        if name not in memo:
+            ref = plan['indicators'].get(name, name)
+            if callable(ref):
+                memo[name] = ref(panel, get)
+            else:
+                frame = indicators.get(source, ref)
+                memo[name] = frame.reindex(columns=tickers) if subset else frame
+        return memo[name]
+
+    last = last_valid_pos(panel['Close'])
+    first = first_valid_pos(panel['Close'])
+
+    def at(name, lag=0):
+        """Indicator value lag bars before each ticker's last bar"""
+        frame = get(name) if isinstance(name, str) else name
+        pos = np.where(last - lag >= 0, last - lag, -1) if lag else last
+        return value_at(frame, np.where(last >= 0, pos, -1))
+
+    return {
+        'panel': panel, 'minute': minute, 'tickers': tickers, 'extras': extras or {},
+        'params': dict(plan['params']), 'get': get, 'at': at,
+        'last_pos': last, 'first_pos': first,
+    }
+
+def _feature(source, X, ctx):
+    """
+    Feature value per ticker
+
+    source: indicator / field name (value at the last bar), (name, lag) for
+    lag bars earlier, (name, 'first') for the first bar, an expression over
+    earlier features, or callable(X, ctx); a callable may return a
+    DataFrame to add several features at once
+    """
+    if callable(source):
+        out = source(X, ctx)
+        if isinstance(out, pd.DataFrame):
+            return out.reindex(X.index)
+        return _eval(lambda X, ctx: out, X, ctx).to_numpy()
+    if isinstance(source, tuple):
+        name, which = source
+        if which == 'first':
+            return value_at(ctx['get'](name), ctx['first_pos']).to_numpy()
+        return ctx['at'](name, which).to_numpy()
+    if isinstance(source, str) and (source in ctx['panel'] or source in ctx['plan']['indicators']
+                                    or (source not in X.columns and indicators.is_indicator(source))):
+        return ctx['at'](source).to_numpy()
+    return _eval(source, X, ctx).to_numpy()
+
+# ========================================
+# EVALUATION
+# ========================================
+
+def evaluate(plan, panel, tickers=None, extras=None, minute=None):
+    """
+    Run a compiled plan over a daily panel
+
+    Args:
+        plan: compile_spec output
+        panel: dict of wide frames (index = dates, columns = tickers)
+        tickers: columns to evaluate (default all)
+        extras: context dict (e.g. universe RS ranks)
+        minute: today's 1m panel for intraday specs
+
+    Returns:
+        result DataFrame with the spec's output columns
+    """
+    source = panel
+    if tickers is not None:
+        panel = {f: frame.reindex(columns=tickers) for f, frame in panel.items()}
+    tickers = list(panel['Close'].columns)
+    ctx = _make_context(plan, panel, tickers, extras, minute, source)
+    ctx['plan'] = plan
+
+    last = ctx['last_pos']
+    dates = panel['Close'].index
+    X = pd.DataFrame({'Ticker': tickers}, index=tickers)
+    X['Date'] = [dates[p] if p >= 0 else pd.NaT for p in last]
+    if plan['ranks']:
+        # Latest row of the (as-of cut) universe rank panels, see plan_extras
+        for name, key in (('RS_Rank', 'rs_rating'), ('RS_Z', 'rs_z')):
+            frame = ctx['extras'].get(key)
+            X[name] = frame.iloc[-1].reindex(tickers).to_numpy(dtype=float) \
+                if frame is not None and not frame.empty else np.nan
+    for name, source in plan['features'].items():
+        value = _feature(source, X, ctx)
+        if isinstance(value, pd.DataFrame):
+            for col in value.columns:
+                X[col] = value[col].to_numpy()
+        else:
+            X[name] = value
+
+    keep = last >= 0
+    for cond in plan['filters']:
+        keep &= _mask(cond, X, ctx)
+    X = X[keep]
+    if X.empty:
+        return pd.DataFrame(columns=list(plan['columns']))
+
+    # Score and reason codes (rule order = reason order)
+    sep = plan['reason_sep']
+    score = np.zeros(len(X))
+    reasons = np.full(len(X), "", dtype=object)
+    for tiers in plan['score']:
+        taken = np.zeros(len(X), dtype=bool)
+        for cond, points, reason in tiers:
+            hit = _mask(cond, X, ctx) & ~taken
+            taken |= hit
+            score += np.where(hit, _eval(points, X, ctx).to_numpy(dtype=float), 0.0)
+            if reason:
+                reasons = _join_codes(reasons, hit, reason, sep)
+    for cond, code in plan['reasons']:
+        reasons = _join_codes(reasons, _mask(cond, X, ctx), code, sep)
+    if plan['score_clip'] is not None:
+        score = np.clip(score, *plan['score_clip'])
+    X['Score'] = score.astype(plan['score_dtype']) if plan['score_dtype'] else score
+    X['Reasons'] = np.where(reasons == "", plan['no_reason'], reasons)
+
+    if plan['decision'] or plan['default_decision'] is not None:
+        decision = np.full(len(X), plan['default_decision'], dtype=object)
+        decided = np.zeros(len(X), dtype=bool)
+        for cond, label in plan['decision']:
+            hit = _mask(cond, X, ctx) & ~decided
+            decided |= hit
+            decision = np.where(hit, _flag_label(label, X, ctx), decision)
+        X['Decision'] = decision
+
+    # Gates override the whole result (first match wins)
+    gated = np.zeros(len(X), dtype=bool)
+    for cond, values in plan['gates']:
+        hit = _mask(cond, X, ctx) & ~gated
+        gated |= hit
+        rows = X.index[hit]
+        for col, value in values.items():
+            if col not in X.columns:
+                X[col] = None
+            X.loc[rows, col] = value
+
+    if plan['min_score'] is not None:
+        X = X[X['Score'] >= plan['min_score']]
+
+    out = pd.DataFrame(index=X.index)
+    for col, source in plan['columns'].items():
+        ndigits = None
+        if isinstance(source, tuple):
+            source, ndigits = source
+        if isinstance(source, str) and source in X.columns:
+            values = X[source]
+        else:
+            values = _eval(source, X, ctx)
+        out[col] = values.round(ndigits) if ndigits is not None else values
+    out = out.reset_index(drop=True)
+
+    post = _resolve(plan['post'])
+    if post is not None:
+        return post(out)
+    if 'Score' in out.columns:
+        out = out.sort_values('Score', ascending=False).reset_index(drop=True)
+    return out
+
+def _flag_label(label, X, ctx):
+    """Decision label: string, or {'prefix', 'flags': [(cond, code)], 'sep', 'empty'}"""
+    if not isinstance(label, dict):
+        return label
+    codes = np.full(len(X), "", dtype=object)
+    for cond, code in label['flags']:
+        codes = _join_codes(codes, _mask(cond, X, ctx), code, label.get('sep', "+"))
+    return np.where(codes == "", label['empty'], label.get('prefix', "") + codes)
+
+# ========================================
+# DATA
+# ========================================
+
+# adjust -> {'panel', 'report', 'tickers', 'period', 'fetched_at', 'views'}
+_panels = {}
+_panel_lock = threading.Lock()
+
+# Daily bars change while the session is open: reuse a panel at most this long
+PANEL_REFRESH_SECONDS = 300
+
+def _day_index(index):
+    """Naive session dates of a (possibly tz-aware) daily index"""
+    return (index.tz_localize(None) if index.tz is not None else index).normalize()
+
+def window(panel, period, as_of=None):
+    """Rows of the period window ending at as_of (default: the last row)"""
+    index = panel['Close'].index
+    keep = np.ones(len(index), dtype=bool)
+    if as_of is not None:
+        keep = np.asarray(_day_index(index) <= pd.Timestamp(as_of).normalize())
+    if not keep.any():
+        return {f: frame.iloc[:0] for f, frame in panel.items()}
+    last = index[keep][-1]
+    keep &= np.asarray(index >= last - pd.Timedelta(days=_PERIOD_DAYS[period]))
+    return {f: frame[keep] for f, frame in panel.items()}
+
+def covering_period(period, as_of=None):
+    """Shortest download period holding period's window as of a past date"""
+    if as_of is None:
+        return period
+    from idx_calendar import session_date
+    needed = _PERIOD_DAYS[period] + max((session_date() - pd.Timestamp(as_of).date()).days, 0)
+    for name, days in sorted(_PERIOD_DAYS.items(), key=lambda kv: kv[1]):
+        if days >= needed:
+            return name
+    return max(_PERIOD_DAYS, key=_PERIOD_DAYS.get)
+
+def load_panel(tickers, period="6mo", adjust="total", refresh=False, as_of=None):
+    """
+    Validated daily panel for the universe (one request per adjustment)
+
+    Shared by every spec: the longest period fetched so far is reused and
+    sliced. The same (period, tickers, as_of) view is returned while the
+    download is current, so specs share its memoized indicators. Returns
+    (panel, health report).
+    """
+    from data_quality import record_health, validate_panel
+    from idx_calendar import is_fresh
+    from market_utils import download_panel
+
+    tickers = list(tickers)
+    view_period, period = period, covering_period(period, as_of)
+    with _panel_lock:
+        entry = _panels.get(adjust)
+        stale = entry is None or refresh or not set(tickers) <= entry['tickers'] \
+            or _PERIOD_DAYS[entry['period']] < _PERIOD_DAYS[period] \
+            or not is_fresh(entry['fetched_at'], "intraday", ttl=PANEL_REFRESH_SECONDS)
+        if stale:
+            fetch_period = period if entry is None or _PERIOD_DAYS[period] >= _PERIOD_DAYS[entry['period']] \
+                else entry['period']
+            # Keep every ticker fetched so far, so specs on other universes do not evict each other
+            fetch = sorted(set(tickers) | (entry['tickers'] if entry is not None else set()))
+            raw = download_panel(fetch, period=fetch_period, auto_adjust=(adjust == "total"), validate=False)
+            if not raw:
+                return {}, pd.DataFrame()
+            panel, report = validate_panel(raw)
+            record_health(report)
+            entry = {'panel': panel, 'report': report, 'tickers': set(fetch),
+                     'period': fetch_period, 'fetched_at': time.time(), 'views': {}}
+            _panels[adjust] = entry
+
+        view_key = (view_period, tuple(tickers), None if as_of is None else str(pd.Timestamp(as_of).date()))
+        view = entry['views'].get(view_key)
+        if view is None:
+            panel = {f: frame.reindex(columns=tickers) for f, frame in entry['panel'].items()}
+            if len(panel['Close'].index):
+                panel = window(panel, view_period, as_of)
+            view = (panel, entry['report'].reindex(tickers))
+            entry['views'][view_key] = view
+    return view
+
+# id(daily Close frame) -> (1m panel, spliced panel)
+_today_views = {}
+
+def with_today(panel, minute):
+    """panel with today's bar spliced on, reused while the 1m panel is unchanged"""
+    from bar_resampler import splice_today_panel, today_bars
+
+    anchor = panel['Close']
+    key = id(anchor)
+    cached = _today_views.get(key)
+    if cached is not None and cached[0] is minute:
+        return cached[1]
+    spliced = splice_today_panel(panel, today_bars(minute))
+    if cached is None:
+        weakref.finalize(anchor, _today_views.pop, key, None)
+    _today_views[key] = (minute, spliced)
+    return spliced
+
+def load_universe(universe, as_of=None):
+    """
+    Tickers of a universe spec; named universes with rows in
+    universe_history.csv give their members as of as_of (default today)
+    """
+    if isinstance(universe, (list, tuple)):
+        return list(universe)
+    from universe_history import members_as_of
+    members = members_as_of(universe, as_of)
+    if members is not None:
+        return members
+    if universe == "expanded":
+        from stock_universe import EXPANDED_UNIVERSE
+        return list(EXPANDED_UNIVERSE)
+    if universe.startswith("file:"):
+        with open(universe[5:], 'r') as f:
+            return [line.strip() for line in f if line.strip()]
+    from stock_universe import INDEX_FLAGS
+    if universe.upper() in INDEX_FLAGS:
+        return list(INDEX_FLAGS[universe.upper()][1])
+    return list(_resolve(universe)())
+
+def eligible_tickers(panel, report, min_history):
+    """Tickers with enough valid bars and health >= data_quality.MIN_HEALTH"""
+    from data_quality import MIN_HEALTH
+    bars = panel['Close'].notna().sum()
+    health = report['Health'].reindex(bars.index).fillna(0) if not report.empty else 0
+    ok = (bars >= min_history) & (health >= MIN_HEALTH)
+    return list(bars.index[ok])
+
+def output_name(plan, as_of=None):
+    if not plan['output']:
+        return None
+    from idx_calendar import session_date
+    day = session_date() if as_of is None else pd.Timestamp(as_of).date()
+    now = datetime.now() if as_of is None else pd.Timestamp(as_of).to_pydatetime()
+    return plan['output'].format(date=day.strftime('%Y%m%d'), now=now.strftime('%Y%m%d_%H%M'))
+
+def output_pattern(plan):
+    """Glob for the spec's saved CSVs"""
+    if not plan['output']:
+        return None
+    return plan['output'].format(date="*", now="*")
+
+def extras_as_of(extras, as_of):
+    """Context with every dated Series / DataFrame cut at as_of (no look-ahead)"""
+    if not extras or as_of is None:
+        return extras
+    out = {}
+    for name, value in extras.items():
+        if isinstance(value, (pd.Series, pd.DataFrame)) and isinstance(value.index, pd.DatetimeIndex):
+            value = value[np.asarray(_day_index(value.index) <= pd.Timestamp(as_of).normalize())]
+        out[name] = value
+    return out
+
+def plan_extras(plan, tickers, start=None):
+    """
+    Context for a plan: its 'context' provider plus, with 'ranks', the
+    universe RS rating / z-score panels (ranking_engine, shared by every
+    spec); start = first date a backtest needs ranks for
+    """
+    context = _resolve(plan['context'])
+    extras = dict(context(tickers)) if context is not None else {}
+    if plan['ranks']:
+        from ranking_engine import get_cached_rs_panels
+        panels = get_cached_rs_panels(tickers, "2y" if start is None else covering_period("1y", start))
+        extras.update(rs_rating=panels['rating'], rs_z=panels['z'])
+    return extras or None
+
+def is_live(as_of):
+    from idx_calendar import session_date
+    return as_of is None or pd.Timestamp(as_of).date() >= session_date()
+
+def load_inputs(plan, tickers=None, as_of=None):
+    """
+    Everything evaluate needs for a plan: {'panel', 'tickers' (eligible),
+    'extras', 'minute'}, or None without data
+
+    as_of runs the screen on the bars up to a past session (1m-only specs
+    cannot); today's 1m data is only used for a live run.
+    """
+    live = is_live(as_of)
+    tickers = load_universe(plan['universe'], None if live else as_of) if tickers is None else list(tickers)
+    if not live and plan['minute']:
+        raise ValueError(f"{plan['key']}: needs today's 1m bars, cannot run as of {as_of}")
+    prepare = _resolve(plan['prepare'])
+    if prepare is not None and live:
+        prepare(tickers)
+
+    panel, report = load_panel(tickers, plan['period'], plan['adjust'], as_of=None if live else as_of)
+    if not panel:
+        return None
+
+    minute = None
+    if live and (plan['today'] or plan['minute']):
+        from bar_resampler import get_minute_panel, prefetch_today
+        prefetch_today(tickers)
+        minute = get_minute_panel()
+        if plan['today']:
+            panel = with_today(panel, minute)
+
+    # Health is judged on the validated history, before today's bar is added
+    eligible = eligible_tickers(panel, report, plan['min_history'])
+    extras = plan_extras(plan, tickers)
+    return {'panel': panel, 'tickers': eligible, 'extras': extras_as_of(extras, None if live else as_of),
+            'minute': minute}
+
+def replay(plan, panel, report, dates, extras=None, members=None):
+    """
+    Evaluate a plan as of each date on a long history panel (for backtests)
+
+    Each date sees only its own period window, exactly as a live scan on
+    that day would. members (universe_history.membership_panel, dates x
+    tickers) limits each date to that day's constituents. Returns
+    {date: result DataFrame}.
+    """
+    results = {}
+    for day in dates:
+        view = window(panel, plan['period'], day)
+        if view['Close'].empty:
+            continue
+        eligible = eligible_tickers(view, report, plan['min_history'])
+        if members is not None:
+            eligible = list(pd.Index(eligible)[members.loc[day].reindex(eligible, fill_value=False).to_numpy()])
+        results[day] = evaluate(plan, view, eligible, extras_as_of(extras, day))
+    return results
+
+def run_plan(plan, save=True, as_of=None):
+    """Load data, evaluate and (optionally) save; returns the result DataFrame"""
+    inputs = load_inputs(plan, as_of=as_of)
+    if inputs is None:
+        return pd.DataFrame(columns=list(plan['columns']))
+    df = evaluate(plan, **inputs)
+
+    fname = output_name(plan, None if is_live(as_of) else as_of) if save else None
+    if fname and not df.empty:
+        df.to_csv(fname, index=False)
+        print(f"Found {len(df)} candidates. Saved to {fname}")
+    return df
+
+def iter_spec_screener(key, chunk_size=None, overrides=None):
+    """
+    Streaming entry point for a spec screener (same progress dicts as the
+    per-ticker screeners; chunk_size is accepted for compatibility).
+    overrides are per-run params on top of config_store.
+    """
+    from screener_specs import get_plan
+
+    plan = get_plan(key, overrides)
+    tickers = load_universe(plan['universe'])
+    total = len(tickers)
+    print(f"Running {plan['name']} (spec)...")
+    print(f"Universe: {total} stocks")
+    yield {"done": 0, "total": total, "ticker": None, "results": pd.DataFrame(columns=list(plan['columns']))}
+
+    start_t = time.time()
+    df = run_plan(plan, save=not overrides)  # Experiments do not replace the saved CSV
+    print(f"Scan completed in {time.time() - start_t:.1f}s")
+    yield {"done": total, "total": total, "results": df, "final": True}
+
+if __name__ == "__main__":
+    import sys
+    from screener_specs import SPECS, get_plan
+
+    keys = sys.argv[1:] or list(SPECS)
+    for key in keys:
+        t0 = time.perf_counter()
+        result = run_plan(get_plan(key), save=False)
+        print(f"{key}: {len(result)} rows in {time.perf_counter() - t0:.1f}s")
+        print(result.head(5).to_string(index=False))
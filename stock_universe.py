@@ -62,5 +62,87 @@ def get_expanded_universe():
 
 EXPANDED_UNIVERSE = get_expanded_universe()
 
+# ========================================
+# SECTOR MAPPING (IDX-IC sectors)
+# ========================================
+SECTORS = {
+    "Financials": ["ARTO", "BBCA", "BBHI", "BBKP", "BBNI", "BBRI", "BBTN", "BBYB", "BDMN", "BFIN", "BJBR",
+                   "BJTM", "BMAS", "BMRI", "BNGA", "BRIS", "BSIM", "BTPN", "BTPS", "MAYA", "PNBN", "PNLF", "SRTG"],
+    "Energy": ["ABMM", "ADMR", "ADRO", "AKRA", "BUMI", "BYAN", "DEWA", "DOID", "ELSA", "ENRG", "HRUM", "INDY",
+               "ITMG", "MCOL", "MEDC", "PGAS", "PTBA", "RAJA", "SGER", "WINS"],
+    "Basic Materials": ["ALDO", "ALKA", "AMMN", "ANTM", "AVIA", "BRPT", "ESSA", "IGAR", "INCO", "INKP", "INTP",
+                        "MBMA", "MDKA", "NCKL", "NKEK", "PSAB", "SMBR", "SMGR", "TINS", "TKIM", "TPIA"],
+    "Consumer Non-Cyclicals": ["AALI", "AMRT", "AYLS", "CLEO", "CMRY", "CPIN", "DSNG", "GGRM", "HMSP", "ICBP",
+                               "INDF", "JPFA", "LSIP", "MAIN", "MPPA", "MYOR", "SSMS", "TAPG", "UCID", "UNVR"],
+    "Consumer Cyclicals": ["ACES", "AUTO", "BMTR", "ERAA", "FILM", "GJTL", "HDTX", "LPPF", "MAPA", "MAPI",
+                           "MNCN", "PANR", "PBRX", "RALS", "SCMA"],
+    "Healthcare": ["HEAL", "KAEF", "KLBF", "MERK", "MIKA", "SIDO"],
+    "Industrials": ["ASII", "KBLI", "UNTR"],
+    "Infrastructures": ["ADHI", "BUKK", "EXCL", "ISAT", "JKON", "JSMR", "MTEL", "PGEO", "PTPP", "SSIA", "TBIG",
+                        "TLKM", "TOWR", "WIKA", "WSKT", "WTON"],
+    "Properties & Real Estate": ["APLN", "ASRI", "BAPA", "BSDE", "CTRA", "DILD", "DMAS", "KIJA", "LPKR", "PANI",
+                                 "PWON", "SMRA", "TRIN"],
+    "Technology": ["BELI", "BUKA", "EMTK", "GOTO", "MCAS"],
+    "Transportation & Logistics": ["ASSA", "BIRD", "GIAA"],
+}
+UNCLASSIFIED_SECTOR = "Unclassified"
+
+# ========================================
+# INDEX MEMBERSHIP BITMASK
+# ========================================
+INDEX_LQ45 = 1 << 0
+INDEX_IDX80 = 1 << 1
+INDEX_KOMPAS100 = 1 << 2
+INDEX_MSCI_BIG = 1 << 3
+INDEX_MSCI_MID = 1 << 4
+INDEX_MSCI_SMALL = 1 << 5
+
+INDEX_FLAGS = {
+    "LQ45": (INDEX_LQ45, LQ45_TICKERS),
+    "IDX80": (INDEX_IDX80, IDX80_TICKERS),
+    "KOMPAS100": (INDEX_KOMPAS100, KOMPAS100_PROXY_TICKERS),
+    "MSCI_BIG": (INDEX_MSCI_BIG, MSCI_BIG_CAP),
+    "MSCI_MID": (INDEX_MSCI_MID, MSCI_MID_CAP),
+    "MSCI_SMALL": (INDEX_MSCI_SMALL, MSCI_SMALL_CAP),
+}
+
+LOT_SIZE = 100  # IDX board lot (uniform since 2014)
+
+def _build_lookups():
+    """Precompute ticker -> bitmask / sector dicts (O(1) lookups)"""
+    masks = {}
+    for flag, tickers in INDEX_FLAGS.values():
+        for t in tickers:
+            masks[t] = masks.get(t, 0) | flag
+    sectors = {}
+    for sector, codes in SECTORS.items():
+        for code in codes:
+            sectors[code + ".JK"] = sector
+    return masks, sectors
+
+TICKER_INDEX_MASK, TICKER_SECTOR = _build_lookups()
+
+def normalize_ticker(ticker):
+    """'BBCA' -> 'BBCA.JK' (screeners report both forms)"""
+    ticker = str(ticker).strip().upper()
+    return ticker if ticker.endswith(".JK") else ticker + ".JK"
+
+def get_index_mask(ticker):
+    """Index membership bitmask for a ticker (0 = not in any list)"""
+    return TICKER_INDEX_MASK.get(normalize_ticker(ticker), 0)
+
+def is_member(ticker, index_name):
+    """True if ticker belongs to the named index (e.g. 'LQ45')"""
+    return bool(get_index_mask(ticker) & INDEX_FLAGS[index_name][0])
+
+def get_indices(ticker):
+    """List of index names a ticker belongs to"""
+    mask = get_index_mask(ticker)
+    return [name for name, (flag, _) in INDEX_FLAGS.items() if mask & flag]
+
+def get_sector(ticker):
+    """IDX-IC sector for a ticker"""
+    return TICKER_SECTOR.get(normalize_ticker(ticker), UNCLASSIFIED_SECTOR)
+
 if __name__ == "__main__":
     print(f"EXPANDED UNIVERSE: {len(EXPANDED_UNIVERSE)} stocks")
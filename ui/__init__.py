@@ -15,19 +15,30 @@ from .components import (
     screener_form_card,
     results_header,
     metric_row,
+    breadth_card,
     empty_state,
     score_badge,
     decision_badge,
     info_box,
     divider
 )
-from .table import (
-    render_table_basic,
-    render_table_styled,
-    render_top_picks,
-    download_button
+
+# Table helpers pull in pandas; load them on first access (PEP 562)
+# so the home page can paint before pandas is imported.
+_LAZY_TABLE_NAMES = (
+    'render_table_basic',
+    'render_table_styled',
+    'render_top_picks',
+    'download_button',
+    'export_bytes'
 )
 
+def __getattr__(name):
+    if name in _LAZY_TABLE_NAMES:
+        from . import table
+        return getattr(table, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     'inject_global_css',
     'hero',
@@ -41,6 +52,7 @@ __all__ = [
     'screener_form_card',
     'results_header',
     'metric_row',
+    'breadth_card',
     'empty_state',
     'score_badge',
     'decision_badge',
@@ -49,5 +61,6 @@ __all__ = [
     'render_table_basic',
     'render_table_styled',
     'render_top_picks',
-    'download_button'
+    'download_button',
+    'export_bytes'
 ]
@@ -185,6 +185,30 @@ def metric_row(metrics: list):
         with cols[i]:
             st.metric(label=label, value=value, delta=delta)
 
+def breadth_card(breadth_info: dict):
+    """
+    Render market internals (from market_breadth.breadth_regime)
+    """
+    regime = breadth_info.get("regime", "UNKNOWN")
+    variant = "ready" if regime.startswith("BULL") else "avoid" if regime.startswith("BEAR") else "wait"
+    st.markdown(f"""
+    <div style="display: flex; align-items: center; gap: 0.75rem; margin: 0.5rem 0 1rem 0;">
+        <span style="color: rgba(234, 240, 255, 0.6); font-size: 0.9rem;">Breadth Regime</span>
+        <span class="tx-badge tx-badge-{variant}">{regime}</span>
+    </div>
+    """, unsafe_allow_html=True)
+
+    metric_row([
+        ("> EMA20", f"{breadth_info.get('pct_above_ema20', 0):.0f}%", None),
+        ("> EMA50", f"{breadth_info.get('pct_above_ema50', 0):.0f}%", None),
+        ("> EMA200", f"{breadth_info.get('pct_above_ema200', 0):.0f}%", None),
+    ])
+    metric_row([
+        ("A/D Line", f"{breadth_info.get('ad_line', 0):,.0f}", f"{breadth_info.get('ad_slope', 0):+,.0f} (10D)"),
+        ("New Highs / Lows", f"{breadth_info.get('new_highs', 0)} / {breadth_info.get('new_lows', 0)}", None),
+        ("Up/Down Volume", f"{breadth_info.get('updown_vol_ratio', 0):.2f}x", None),
+    ])
+
 def empty_state(message: str = "Belum ada data", icon: str = "📭"):
     """Render empty state placeholder"""
     st.markdown(f"""
@@ -5,11 +5,69 @@ Styled dataframe wrappers for premium look
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+from collections import OrderedDict
 
-def render_table_basic(df: pd.DataFrame, height: int = 400):
+from scan_store import frame_version
+
+# Rows sent to the browser per page; larger results are paginated server-side
+TABLE_PAGE_SIZE = 100
+
+# Memoized export bytes: (version, format) -> bytes
+_EXPORT_CACHE = OrderedDict()
+_EXPORT_CACHE_MAX = 16
+
+def format_decision_column(decision: pd.Series) -> pd.Series:
+    """Vectorized Decision -> badge label (READY / WATCH / AVOID / WAIT)"""
+    upper = decision.astype(str).str.upper()
+    labels = np.select(
+        [upper.str.contains('READY'), upper.str.contains('WATCH'), upper.str.contains('AVOID')],
+        ['🟢 READY', '🟡 WATCH', '🔴 AVOID'],
+        '⚪ WAIT'
+    )
+    return pd.Series(labels, index=decision.index).where(decision.notna(), decision)
+
+def format_score_column(score: pd.Series) -> pd.Series:
+    """Vectorized Score -> '⭐ 8' / '● 5' / '○ 2'"""
+    values = pd.to_numeric(score, errors='coerce')
+    icons = np.select([values >= 7, values >= 4], ['⭐ ', '● '], '○ ')
+    text = pd.Series(icons, index=score.index) + values.fillna(0).astype(int).astype(str)
+    return text.where(values.notna(), score)
+
+def _page_slice(df: pd.DataFrame, page_size: int, key: str = None) -> pd.DataFrame:
+    """
+    Return the rows for the current page
+    
+    With a key, a page selector is rendered; without one (e.g. streaming
+    updates) only the first page is shown.
+    """
+    if not page_size or len(df) <= page_size:
+        return df
+    
+    n_pages = (len(df) + page_size - 1) // page_size
+    page = 1
+    if key is not None:
+        page = st.number_input(
+            f"Halaman (1-{n_pages})",
+            min_value=1,
+            max_value=n_pages,
+            value=1,
+            step=1,
+            key=key
+        )
+    start = (int(page) - 1) * page_size
+    end = min(start + page_size, len(df))
+    st.caption(f"Menampilkan {start + 1}-{end} dari {len(df)} baris")
+    return df.iloc[start:end]
+
+def render_table_basic(df: pd.DataFrame, height: int = 400,
+                       page_size: int = TABLE_PAGE_SIZE, key: str = None):
     """
     Render dataframe with glass card wrapper
     Basic version using st.dataframe
+    
+    Only the current page (page_size rows) is sent to the browser; pass a
+    unique key to get a page selector.
     """
     if df is None or df.empty:
         st.markdown("""
@@ -70,9 +128,9 @@ def render_table_basic(df: pd.DataFrame, height: int = 400):
                 format="%.2f%%"
             )
     
-    # Render dataframe
+    # Render dataframe (current page only)
     st.dataframe(
-        df,
+        _page_slice(df, page_size, key),
         use_container_width=True,
         height=height,
         column_config=column_config,
@@ -81,7 +139,8 @@ def render_table_basic(df: pd.DataFrame, height: int = 400):
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-def render_table_styled(df: pd.DataFrame, height: int = 400):
+def render_table_styled(df: pd.DataFrame, height: int = 400,
+                        page_size: int = TABLE_PAGE_SIZE, key: str = None):
     """
     Render styled table with custom HTML for badges
     More visual but less interactive
@@ -95,38 +154,16 @@ def render_table_styled(df: pd.DataFrame, height: int = 400):
         """, unsafe_allow_html=True)
         return
     
-    # Process dataframe for display
-    display_df = df.copy()
+    # Only format the rows that will be shown
+    display_df = _page_slice(df, page_size, key).copy()
     
-    # Convert Decision to badge HTML
+    # Convert Decision to badge label
     if 'Decision' in display_df.columns:
-        def decision_to_badge(val):
-            if pd.isna(val):
-                return val
-            val_str = str(val).upper()
-            if 'READY' in val_str:
-                return '🟢 READY'
-            elif 'WATCH' in val_str:
-                return '🟡 WATCH'
-            elif 'AVOID' in val_str:
-                return '🔴 AVOID'
-            else:
-                return '⚪ WAIT'
-        display_df['Decision'] = display_df['Decision'].apply(decision_to_badge)
+        display_df['Decision'] = format_decision_column(display_df['Decision'])
     
     # Format Score with stars
     if 'Score' in display_df.columns:
-        def score_to_stars(val):
-            if pd.isna(val):
-                return val
-            score = int(val)
-            if score >= 7:
-                return f"⭐ {score}"
-            elif score >= 4:
-                return f"● {score}"
-            else:
-                return f"○ {score}"
-        display_df['Score'] = display_df['Score'].apply(score_to_stars)
+        display_df['Score'] = format_score_column(display_df['Score'])
     
     # Render with basic wrapper
     st.markdown('<div class="tx-table-wrap">', unsafe_allow_html=True)
@@ -157,16 +194,17 @@ def render_top_picks(df: pd.DataFrame, top_n: int = 5):
     </div>
     """, unsafe_allow_html=True)
     
-    cols = st.columns(min(len(top_df), 5))
+    top_df = top_df.head(5)
+    cols = st.columns(len(top_df))
+    
+    # Column arrays instead of iterrows (no per-row Series construction)
+    n = len(top_df)
+    tickers = top_df['Ticker'].tolist() if 'Ticker' in top_df.columns else ['N/A'] * n
+    scores = top_df['Score'].tolist() if 'Score' in top_df.columns else [0] * n
+    closes = top_df['Close'].tolist() if 'Close' in top_df.columns else [0] * n
     
-    for i, (_, row) in enumerate(top_df.iterrows()):
-        if i >= 5:
-            break
+    for i, (ticker, score, close) in enumerate(zip(tickers, scores, closes)):
         with cols[i]:
-            ticker = row.get('Ticker', 'N/A')
-            score = row.get('Score', 0)
-            close = row.get('Close', 0)
-            
             # Determine badge color
             if score >= 7:
                 badge_style = "background: rgba(16, 185, 129, 0.2); border-color: rgba(16, 185, 129, 0.3);"
@@ -189,19 +227,62 @@ def render_top_picks(df: pd.DataFrame, top_n: int = 5):
             </div>
             """, unsafe_allow_html=True)
 
-def download_button(df: pd.DataFrame, filename: str = "results.csv"):
-    """Render styled download button"""
+def export_bytes(df: pd.DataFrame, fmt: str = "csv", version: str = None) -> bytes:
+    """
+    Serialize a result table once per version and format
+    
+    Reruns with the same result reuse the cached bytes instead of
+    re-serializing the whole frame.
+    """
+    if version is None:
+        version = frame_version(df)
+    cache_key = (version, fmt)
+    if cache_key in _EXPORT_CACHE:
+        _EXPORT_CACHE.move_to_end(cache_key)
+        return _EXPORT_CACHE[cache_key]
+    
+    if fmt == "parquet":
+        import io
+        buf = io.BytesIO()
+        df.to_parquet(buf, index=False)
+        data = buf.getvalue()
+    else:
+        data = df.to_csv(index=False).encode("utf-8")
+    
+    _EXPORT_CACHE[cache_key] = data
+    while len(_EXPORT_CACHE) > _EXPORT_CACHE_MAX:
+        _EXPORT_CACHE.popitem(last=False)
+    return data
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def download_button(df: pd.DataFrame, filename: str = "results.csv", version: str = None):
+    """Render styled download button (plus Parquet when pyarrow is installed)"""
     if df is None or df.empty:
         return
     
-    csv = df.to_csv(index=False)
+    if version is None:
+        version = frame_version(df)
     
     st.markdown('<div class="tx-btn-secondary">', unsafe_allow_html=True)
     st.download_button(
         label="📥 Download CSV",
-        data=csv,
+        data=export_bytes(df, "csv", version),
         file_name=filename,
         mime="text/csv",
         use_container_width=True
     )
+    if _parquet_available():
+        st.download_button(
+            label="📦 Download Parquet",
+            data=export_bytes(df, "parquet", version),
+            file_name=filename.rsplit('.', 1)[0] + ".parquet",
+            mime="application/octet-stream",
+            use_container_width=True
+        )
     st.markdown('</div>', unsafe_allow_html=True)
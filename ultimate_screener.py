@@ -1,11 +1,16 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import time
-from datetime import datetime
+from functools import partial
 
 from stock_universe import EXPANDED_UNIVERSE as STOCK_UNIVERSE
-from market_utils import get_cached_market_regime, calculate_atr_stop_loss, apply_regime_adjustment
+from market_utils import get_cached_market_regime, calculate_atr_stop_loss, apply_regime_adjustment, iter_scan, SCAN_CHUNK_SIZE
+from ranking_engine import get_cached_rs_ratings
+from idx_calendar import session_date
+from data_quality import clean_bars, MIN_HEALTH
+from corporate_actions import get_bars
+from bar_resampler import prefetch_today, splice_today, today_bar
+from indicators import compute as compute_indicators
 
 # Settings (RELAXED)
 MIN_PRICE = 50
@@ -13,29 +18,11 @@ MIN_LIQUIDITY = 1_000_000_000  # 1B
 EMA_FAST = 20
 EMA_SLOW = 50
 
-def calculate_ema(series, length):
-    return series.ewm(span=length, adjust=False).mean()
-
-def calculate_rsi(series, length):
-    delta = series.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=length).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=length).mean()
-    rs = gain / (loss + 0.0001)  # FIXED: Prevent division by zero
-    return 100 - (100 / (1 + rs))
-
-def calculate_cmf(df, length=20):
-    denom = df['High'] - df['Low']
-    denom = denom.replace(0, 0.0001)
-    mf_multiplier = ((df['Close'] - df['Low']) - (df['High'] - df['Close'])) / denom
-    mf_volume = mf_multiplier * df['Volume']
-    cmf = mf_volume.rolling(window=length).sum() / df['Volume'].rolling(window=length).sum()
-    return cmf
-
 def calculate_rs_rating(ticker, df):
     """Calculate Relative Strength Rating vs IHSG benchmark"""
     try:
-        # Fetch IHSG data
-        ihsg = yf.download("^JKSE", period="6mo", interval="1d", progress=False)
+        # IHSG data (fetched once, shared through the bar store)
+        ihsg = get_bars("^JKSE", period="6mo")
         if ihsg.empty or len(ihsg) < 60:
             return 50  # Neutral if IHSG data unavailable
         
@@ -54,41 +41,34 @@ def calculate_rs_rating(ticker, df):
     except:
         return 50  # Neutral on error
 
-def analyze_ultimate(ticker):
+def analyze_ultimate(ticker, rs_ranks=None):
     try:
-        df = yf.download(ticker, period="6mo", interval="1d", progress=False)
+        df = get_bars(ticker, period="6mo")
         if len(df) < 60: return None  # Need 60 days for RS Rating
         if isinstance(df.columns, pd.MultiIndex): df.columns = [c[0] for c in df.columns]
+        df, health = clean_bars(df, ticker)
+        if health < MIN_HEALTH or len(df) < 60: return None
 
-        # Real-time price
-        try:
-            df_today = yf.download(ticker, period="1d", interval="1m", progress=False)
-            if not df_today.empty:
-                if isinstance(df_today.columns, pd.MultiIndex): 
-                    df_today.columns = [c[0] for c in df_today.columns]
-                current_price = df_today.iloc[-1]['Close']
-                current_volume = df_today['Volume'].sum()
-            else:
-                current_price = df.iloc[-1]['Close']
-                current_volume = df.iloc[-1]['Volume']
-        except:
-            current_price = df.iloc[-1]['Close']
-            current_volume = df.iloc[-1]['Volume']
+        # Real-time: today-so-far bar from the shared 1m panel
+        df = splice_today(df, today_bar(ticker))
+        current_price = df.iloc[-1]['Close']
+        current_volume = df.iloc[-1]['Volume']
 
         if current_price < MIN_PRICE: return None
         value = current_price * current_volume
         if value < MIN_LIQUIDITY: return None
 
         # Indicators
-        df['EMA20'] = calculate_ema(df['Close'], EMA_FAST)
-        df['EMA50'] = calculate_ema(df['Close'], EMA_SLOW)
-        df['RSI'] = calculate_rsi(df['Close'], 14)
-        df['CMF'] = calculate_cmf(df, 20)
+        ind = compute_indicators(df, [f'EMA{EMA_FAST}', f'EMA{EMA_SLOW}', 'RSI14', 'CMF20', 'Vol_SMA20'])
+        df['EMA20'] = ind[f'EMA{EMA_FAST}']
+        df['EMA50'] = ind[f'EMA{EMA_SLOW}']
+        df['RSI'] = ind['RSI14']
+        df['CMF'] = ind['CMF20']
         
         # ATR Stop Loss (NEW FEATURE)
         risk_mgmt = calculate_atr_stop_loss(df, atr_multiplier=2.0)
         
-        vol_avg = df['Volume'].rolling(20).mean().iloc[-1]
+        vol_avg = ind['Vol_SMA20'].iloc[-1]
         rel_vol = current_volume / vol_avg if vol_avg > 0 else 0
 
         last_hist = df.iloc[-1]
@@ -99,6 +79,8 @@ def analyze_ultimate(ticker):
         
         # RS Rating calculation (NEW FEATURE)
         rs_rating = calculate_rs_rating(ticker, df)
+        # Universe percentile rank (1-99) from the cross-sectional engine
+        rs_rank = rs_ranks.get(ticker, np.nan) if rs_ranks is not None else np.nan
         
         # Momentum
         rsi_bull = last_hist['RSI'] > 50
@@ -149,6 +131,7 @@ def analyze_ultimate(ticker):
                 'Score': int(score),
                 'Validation': min(validation, 100),
                 'RS_Rating': rs_rating,
+                'RS_Rank': int(rs_rank) if not pd.isna(rs_rank) else None,
                 'Rel_Vol': round(rel_vol, 2),
                 'CMF': round(last_hist['CMF'], 3),
                 'RSI': round(last_hist['RSI'], 1),
@@ -162,7 +145,8 @@ def analyze_ultimate(ticker):
         return None
     return None
 
-def run_ultimate():
+def iter_ultimate(chunk_size=SCAN_CHUNK_SIZE):
+    """Scan the universe, yielding partial results every chunk_size tickers"""
     print(f"Running Ultimate Hybrid Screener...")
     print(f"Universe: {len(STOCK_UNIVERSE)} stocks")
     
@@ -170,27 +154,37 @@ def run_ultimate():
     regime_info = get_cached_market_regime()
     print(f"Market Regime: {regime_info['regime']} (IHSG: {regime_info['current']}, Dist: {regime_info['dist_pct']}%)")
     
-    results = []
+    # Universe RS ranks (one batch download, shared by all tickers)
+    rs_ranks = get_cached_rs_ratings(STOCK_UNIVERSE)
+    
+    df = pd.DataFrame()
+    
+    # Today's 1m bars for the whole universe in one request (see bar_resampler)
+    prefetch_today(STOCK_UNIVERSE)
     
     start_t = time.time()
-    for i, ticker in enumerate(STOCK_UNIVERSE):
-        print(f"[{i+1}/{len(STOCK_UNIVERSE)}] Scanning {ticker}...", end='\r')
-        res = analyze_ultimate(ticker)
-        if res:
-            results.append(res)
+    analyze = partial(analyze_ultimate, rs_ranks=rs_ranks)
+    for progress in iter_scan(STOCK_UNIVERSE, analyze, chunk_size):
+        print(f"[{progress['done']}/{progress['total']}] Scanning {progress['ticker']}...", end='\r')
+        df = progress['results']
+        yield progress
     
     elapsed = time.time() - start_t
     print(f"\nScan completed in {elapsed:.1f}s")
             
-    if results:
-        df = pd.DataFrame(results)
-        df = df.sort_values('Score', ascending=False)
-        fname = f"ultimate_results_{datetime.now().strftime('%Y%m%d')}.csv"
+    if not df.empty:
+        fname = f"ultimate_results_{session_date().strftime('%Y%m%d')}.csv"
         df.to_csv(fname, index=False)
         print(f"Found {len(df)} candidates. Saved to {fname}")
-        return df
-    print("No candidates found.")
-    return pd.DataFrame()
+    else:
+        print("No candidates found.")
+    yield {"done": len(STOCK_UNIVERSE), "total": len(STOCK_UNIVERSE), "results": df, "final": True}
+
+def run_ultimate():
+    df = pd.DataFrame()
+    for progress in iter_ultimate():
+        df = progress['results']
+    return df
 
 if __name__ == "__main__":
     run_ultimate()
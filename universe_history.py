@@ -0,0 +1,190 @@
+"""
+Universe History
+Point-in-time universe membership, so backtests and as-of scans screen the
+constituents that existed on each day instead of today's lists (no
+survivorship bias).
+
+universe_history.csv holds one row per membership spell:
+
+    universe,ticker,start,end
+    LQ45,WSKT.JK,2019-08-01,2023-02-01
+
+universe is an index from stock_universe.INDEX_FLAGS or a universe file
+name without extension (idx_universe); start / end are effective dates
+(end exclusive, empty = open). A universe compiles once into a compact
+boolean panel with one row per membership change, so "members as of D" is
+a searchsorted and a date x ticker mask for a backtest is a row gather.
+
+Universes without rows in the file keep their static lists (an index that
+is missing from the file still counts, statically, towards "expanded").
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from stock_universe import INDEX_FLAGS, normalize_ticker
+
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "universe_history.csv")
+ALWAYS = pd.Timestamp("1900-01-01")  # Start of spells without a start date
+
+_lock = threading.RLock()
+_file = {'path': HISTORY_PATH, 'mtime': None, 'spells': {}}
+_compiled = {}  # (names, mtime) -> compact membership panel
+
+# ========================================
+# MEMBERSHIP FILE
+# ========================================
+
+def _read(path):
+    """{UNIVERSE: DataFrame(ticker, start, end)} from a history CSV"""
+    df = pd.read_csv(path, comment='#', dtype=str, skipinitialspace=True)
+    missing = {'universe', 'ticker', 'start', 'end'} - set(df.columns)
+    if missing:
+        raise ValueError(f"missing column(s): {', '.join(sorted(missing))}")
+    df = df.dropna(subset=['universe', 'ticker'])
+    df = pd.DataFrame({
+        'universe': df['universe'].str.strip().str.upper(),
+        'ticker': df['ticker'].map(normalize_ticker),
+        'start': pd.to_datetime(df['start'], format="%Y-%m-%d").fillna(ALWAYS),
+        'end': pd.to_datetime(df['end'], format="%Y-%m-%d"),
+    })
+    bad = df[df['end'] <= df['start']]
+    if not bad.empty:
+        raise ValueError(f"end not after start for {', '.join(bad['universe'] + ' ' + bad['ticker'])}")
+    return {name: g[['ticker', 'start', 'end']].reset_index(drop=True) for name, g in df.groupby('universe')}
+
+def _spells():
+    """Spells from the history file, re-read when its mtime changes"""
+    path = _file['path']
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    with _lock:
+        if mtime == _file['mtime']:
+            return _file['spells']
+        spells = {}
+        if mtime is not None:
+            try:
+                spells = _read(path)
+            except Exception as e:
+                # Keep the last good history rather than mixing in a broken file
+                print(f"[WARN] Ignoring invalid {path}: {e}")
+                _file['mtime'] = mtime
+                return _file['spells']
+        _file.update(mtime=mtime, spells=spells)
+        _compiled.clear()
+    return spells
+
+def use_file(path):
+    """Read membership from another CSV (e.g. a vendor export)"""
+    with _lock:
+        _file.update(path=path, mtime=None, spells={})
+        _compiled.clear()
+    _spells()
+
+# ========================================
+# COMPACT PANEL
+# ========================================
+
+def _names(universe):
+    """History names a universe spec is made of (None for explicit ticker lists)"""
+    if not isinstance(universe, str):
+        return None
+    if universe == "expanded":
+        return tuple(INDEX_FLAGS)
+    if universe.startswith("file:"):
+        return (os.path.splitext(os.path.basename(universe[5:]))[0].upper(),)
+    return (universe.upper(),)
+
+def _compile(spells):
+    """
+    Boolean panel with one row per change date; row i holds from its date
+    until the next row (a ticker is in while any of its spells is open)
+    """
+    tickers = pd.Index(sorted(set(spells['ticker'])))
+    ends = spells['end'].notna().to_numpy()
+    dates = pd.DatetimeIndex(sorted(set(spells['start']) | set(spells['end'][ends])))
+    col = tickers.get_indexer(spells['ticker'])
+    delta = np.zeros((len(dates) + 1, len(tickers)), dtype=np.int32)
+    np.add.at(delta, (dates.searchsorted(pd.DatetimeIndex(spells['start'])), col), 1)
+    np.add.at(delta, (dates.searchsorted(pd.DatetimeIndex(spells['end'][ends])), col[ends]), -1)
+    return pd.DataFrame(np.cumsum(delta, axis=0)[:-1] > 0, index=dates, columns=tickers)
+
+def membership(universe):
+    """
+    Compact membership panel (change dates x tickers) for a universe spec,
+    or None when the history file has nothing for it
+    """
+    names = _names(universe)
+    if names is None:
+        return None
+    spells = _spells()
+    if not any(name in spells for name in names):
+        return None
+    key = (names, _file['mtime'])
+    with _lock:
+        table = _compiled.get(key)
+        if table is None:
+            parts = [spells[name] if name in spells else
+                     pd.DataFrame({'ticker': INDEX_FLAGS[name][1], 'start': ALWAYS, 'end': pd.NaT})
+                     for name in names]
+            table = _compiled[key] = _compile(pd.concat(parts, ignore_index=True))
+    return table
+
+def _day(date):
+    if date is None:
+        from idx_calendar import session_date
+        return pd.Timestamp(session_date())
+    date = pd.Timestamp(date)
+    return (date.tz_localize(None) if date.tz is not None else date).normalize()
+
+# ========================================
+# LOOKUPS
+# ========================================
+
+def members_as_of(universe, date=None):
+    """Tickers in universe on date (default today); None without history"""
+    table = membership(universe)
+    if table is None:
+        return None
+    row = table.index.searchsorted(_day(date), side='right') - 1
+    return [] if row < 0 else list(table.columns[table.to_numpy()[row]])
+
+def members_between(universe, start, end):
+    """Tickers in universe on any day of [start, end]; None without history"""
+    table = membership(universe)
+    if table is None:
+        return None
+    first = max(table.index.searchsorted(_day(start), side='right') - 1, 0)
+    last = table.index.searchsorted(_day(end), side='right')
+    return list(table.columns[table.to_numpy()[first:last].any(axis=0)])
+
+def membership_panel(universe, dates, tickers=None):
+    """
+    Date x ticker boolean mask (index = dates as given, columns = tickers,
+    default every ticker ever in the universe); None without history
+    """
+    table = membership(universe)
+    if table is None:
+        return None
+    rows = table.index.searchsorted(pd.DatetimeIndex([_day(d) for d in dates]), side='right')
+    values = np.vstack([np.zeros((1, table.shape[1]), dtype=bool), table.to_numpy()])[rows]
+    out = pd.DataFrame(values, index=pd.Index(dates), columns=table.columns)
+    return out if tickers is None else out.reindex(columns=tickers, fill_value=False)
+
+if __name__ == "__main__":
+    import sys
+    universe = sys.argv[1] if len(sys.argv) > 1 else "expanded"
+    table = membership(universe)
+    if table is None:
+        print(f"No history for {universe} in {_file['path']} (static list in use)")
+    else:
+        print(f"{universe}: {table.shape[1]} tickers, {len(table)} membership changes "
+              f"({table.index[0].date()} .. {table.index[-1].date()})")
+        for date in sys.argv[2:]:
+            members = members_as_of(universe, date)
+            print(f"  {date}: {len(members)} members")
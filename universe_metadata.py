@@ -0,0 +1,130 @@
+"""
+Universe Metadata & Group Aggregates
+Ticker -> sector / index membership / lot size table, plus sector and
+index level summaries over screener outputs
+"""
+
+import pandas as pd
+import numpy as np
+
+from stock_universe import (
+    EXPANDED_UNIVERSE, INDEX_FLAGS, LOT_SIZE, TICKER_INDEX_MASK, TICKER_SECTOR,
+    UNCLASSIFIED_SECTOR, get_sector, normalize_ticker
+)
+
+_metadata_table = None
+
+def get_metadata_table():
+    """
+    Metadata table for the universe (built once, then cached)
+
+    Columns: Ticker, Sector, IndexMask, LotSize
+    Index membership stays a bitmask; test with (IndexMask & INDEX_LQ45) != 0.
+    """
+    global _metadata_table
+    if _metadata_table is None:
+        tickers = sorted(set(EXPANDED_UNIVERSE) | set(TICKER_INDEX_MASK))
+        _metadata_table = pd.DataFrame({
+            'Ticker': tickers,
+            'Sector': pd.Categorical([get_sector(t) for t in tickers]),
+            'IndexMask': np.array([TICKER_INDEX_MASK.get(t, 0) for t in tickers], dtype=np.int64),
+            'LotSize': LOT_SIZE,
+        })
+    return _metadata_table
+
+def attach_metadata(df):
+    """
+    Join Sector / IndexMask / LotSize onto a screener result table
+
+    Accepts both 'BBCA' and 'BBCA.JK' ticker forms.
+    """
+    if df is None or df.empty or 'Ticker' not in df.columns:
+        return df
+    keys = df['Ticker'].map(normalize_ticker)
+    out = df.copy()
+    out['Sector'] = keys.map(TICKER_SECTOR).fillna(UNCLASSIFIED_SECTOR)
+    out['IndexMask'] = keys.map(TICKER_INDEX_MASK).fillna(0).astype(np.int64)
+    out['LotSize'] = LOT_SIZE
+    return out
+
+def _rs_column(df):
+    for col in ['RS_Rank', 'RS_Rating']:
+        if col in df.columns:
+            return col
+    return None
+
+def _flags(df):
+    """Vectorized helper columns used by the aggregates"""
+    flags = pd.DataFrame(index=df.index)
+    if 'Decision' in df.columns:
+        flags['is_ready'] = df['Decision'].astype(str).str.contains('READY', na=False)
+    else:
+        flags['is_ready'] = np.nan
+    if 'TrendOK' in df.columns:
+        flags['is_up'] = df['TrendOK'].astype(bool)
+    elif 'Change%' in df.columns:
+        flags['is_up'] = df['Change%'] > 0
+    else:
+        flags['is_up'] = np.nan
+    flags['score'] = df['Score'] if 'Score' in df.columns else np.nan
+    rs_col = _rs_column(df)
+    flags['rs'] = pd.to_numeric(df[rs_col], errors='coerce') if rs_col else np.nan
+    return flags
+
+def _summarize(grouped):
+    out = grouped.agg(
+        Count=('score', 'size'),
+        Breadth_pct=('is_up', 'mean'),
+        READY_pct=('is_ready', 'mean'),
+        Avg_Score=('score', 'mean'),
+        Avg_RS=('rs', 'mean'),
+    )
+    out['Breadth_pct'] = (out['Breadth_pct'] * 100).round(1)
+    out['READY_pct'] = (out['READY_pct'] * 100).round(1)
+    out['Avg_Score'] = out['Avg_Score'].round(2)
+    out['Avg_RS'] = out['Avg_RS'].round(1)
+    return out.rename(columns={'Breadth_pct': 'Breadth_%', 'READY_pct': 'READY_%'})
+
+def sector_summary(df):
+    """
+    Sector-level aggregates over a screener result table
+
+    Returns one row per sector: Count, Breadth_% (TrendOK or Change% > 0),
+    READY_%, Avg_Score, Avg_RS (RS_Rank if present, else RS_Rating).
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = attach_metadata(df)
+    flags = _flags(df)
+    flags['Sector'] = df['Sector'].to_numpy()
+    out = _summarize(flags.groupby('Sector', observed=True))
+    return out.sort_values('Count', ascending=False)
+
+def index_summary(df):
+    """
+    Index-level aggregates (LQ45, IDX80, ...) over a screener result table
+
+    A ticker counts towards every index it belongs to; membership comes
+    from the bitmask, so no list scans are involved.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = attach_metadata(df)
+    flags = _flags(df)
+    masks = df['IndexMask'].to_numpy()
+    rows = {}
+    for name, (flag, _) in INDEX_FLAGS.items():
+        member = (masks & flag) != 0
+        if not member.any():
+            continue
+        sub = flags[member].assign(Index=name)
+        rows[name] = _summarize(sub.groupby('Index')).iloc[0]
+    out = pd.DataFrame(rows).T
+    if not out.empty:
+        out['Count'] = out['Count'].astype(int)
+    return out
+
+if __name__ == "__main__":
+    meta = get_metadata_table()
+    print(f"Metadata: {len(meta)} tickers, {meta['Sector'].nunique()} sectors")
+    print(meta['Sector'].value_counts().to_string())
@@ -0,0 +1,273 @@
+"""
+Intraday Volume Profile
+Cumulative intraday volume curves built from stored 1m history, used to
+project the full-day volume (and so RVOL) from the volume traded so far.
+IDX volume is front-loaded, so a straight-line projection overstates RVOL
+in the opening minutes.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from idx_calendar import WIB, market_status, session_date, sessions
+
+PROFILE_BINS = 100         # Curve resolution: cumulative share at each 1% of session time
+HISTORY_DAYS = 20          # Sessions of 1m volume kept in the store
+MIN_PROFILE_DAYS = 3       # Fewer complete days -> use the liquidity-bucket curve
+LIQUIDITY_BUCKETS = 3      # Volume terciles for tickers without their own curve
+MIN_FRACTION = 0.02        # Floor on the expected share so the first minutes do not explode
+COMPLETE_DAY_FRACTION = 0.95  # A stored day must reach this far into the session to count
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MINUTE_STORE = os.path.join(_BASE_DIR, "intraday_volume_1m.pkl")
+PROFILE_CACHE = os.path.join(_BASE_DIR, "volume_profiles.pkl")
+
+# Linear curve: the old minutes-elapsed projection
+_LINEAR = np.arange(1, PROFILE_BINS + 1) / PROFILE_BINS
+
+# {'date', 'curves': {ticker: array}, 'bucket_of': {ticker: int}, 'bucket_curves': {int: array}, 'market': array}
+_profiles = None
+_lock = threading.Lock()
+
+# ========================================
+# SESSION TIME
+# ========================================
+
+def elapsed_fraction(times):
+    """
+    Share of the day's trading time elapsed at the end of each 1m bar
+
+    Lunch breaks do not count; bars after the close map to 1.0.
+
+    Args:
+        times: DatetimeIndex of bar start times within one trading day
+    """
+    times = pd.DatetimeIndex(times)
+    times = times.tz_localize(WIB) if times.tz is None else times.tz_convert(WIB)
+    day = sessions(times[0].date())
+    if not day:
+        return np.full(len(times), np.nan)
+    end = (times + pd.Timedelta(minutes=1)).tz_convert('UTC').tz_localize(None)
+    end = np.asarray(end, dtype='datetime64[ns]').view('i8')
+    done = np.zeros(len(times))
+    total = 0.0
+    for start, stop in day:
+        s, e = pd.Timestamp(start).value, pd.Timestamp(stop).value
+        done += np.clip(end, s, e) - s
+        total += e - s
+    return done / total
+
+def _bin(fraction):
+    return np.clip(np.ceil(np.asarray(fraction) * PROFILE_BINS).astype(int) - 1, 0, PROFILE_BINS - 1)
+
+# ========================================
+# 1M HISTORY STORE
+# ========================================
+
+def load_minute_history(path=MINUTE_STORE):
+    """Stored 1m volume panel (index = WIB timestamps, columns = tickers)"""
+    if os.path.exists(path):
+        try:
+            return pd.read_pickle(path)
+        except Exception as e:
+            print(f"[WARN] Could not read {path}: {e}")
+    return pd.DataFrame()
+
+def complete_days(volume):
+    """Session dates of a 1m volume panel whose bars reach COMPLETE_DAY_FRACTION"""
+    if volume is None or volume.empty:
+        return set()
+    done = set()
+    for day, frame in volume.groupby(volume.index.date):
+        frac = elapsed_fraction(frame.index)
+        if not np.isnan(frac).all() and np.nanmax(frac) >= COMPLETE_DAY_FRACTION:
+            done.add(day)
+    return done
+
+def last_finished_session(ts=None):
+    """Latest session that has closed (yesterday's while today's is still trading)"""
+    if market_status(ts) in ("OPEN", "BREAK"):
+        return session_date(sessions(session_date(ts))[0][0] - pd.Timedelta(minutes=1))
+    return session_date(ts)
+
+def update_minute_history(tickers, period="5d", path=MINUTE_STORE):
+    """
+    Merge recent 1m volume into the store, keeping the last HISTORY_DAYS
+    sessions
+
+    While the store holds MIN_PROFILE_DAYS complete sessions including the
+    last finished one, only the current session is merged, from
+    bar_resampler's shared 1m panel (the request the screeners make
+    anyway). Otherwise one period download (Yahoo keeps about a week of 1m
+    bars) backfills it, which also replaces days stored while still
+    trading.
+    """
+    from bar_resampler import load_minute_panel
+
+    stored = load_minute_history(path)
+    done = complete_days(stored)
+    if len(done) < MIN_PROFILE_DAYS or last_finished_session() not in done:
+        from market_utils import download_panel
+        panel = download_panel(tickers, period=period, interval="1m", validate=False)
+    else:
+        panel = load_minute_panel(tickers)
+    if not panel or 'Volume' not in panel:
+        return stored
+    fresh = panel['Volume']
+    fresh = fresh.set_axis(fresh.index.tz_localize(WIB) if fresh.index.tz is None else fresh.index.tz_convert(WIB))
+
+    merged = fresh if stored.empty else fresh.combine_first(stored)
+    merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+    days = pd.Index(merged.index.date).unique()
+    merged = merged[merged.index.date >= days[-HISTORY_DAYS]] if len(days) > HISTORY_DAYS else merged
+    merged.to_pickle(path)
+    return merged
+
+# ========================================
+# CURVES
+# ========================================
+
+def build_profiles(volume, today=None):
+    """
+    Per-ticker cumulative volume curves from a 1m volume panel
+
+    Each complete session gives, per ticker, the share of that day's volume
+    traded by the end of every 1% of session time; the curve is the median
+    over days. Tickers with fewer than MIN_PROFILE_DAYS usable days get the
+    curve of their liquidity bucket.
+
+    Returns:
+        dict with curves, bucket_of, bucket_curves and market (see _profiles)
+    """
+    if today is None:
+        today = session_date()
+    empty = {'date': today, 'curves': {}, 'bucket_of': {}, 'bucket_curves': {}, 'market': _LINEAR}
+    if volume is None or volume.empty:
+        return empty
+
+    grid = np.arange(1, PROFILE_BINS + 1) / PROFILE_BINS
+    day_curves, day_totals = [], []
+    for day, frame in volume.groupby(volume.index.date):
+        if day == today and market_status() in ("OPEN", "BREAK"):
+            continue  # Today's bars are still forming (weekends / pre-open: today is the last full session)
+        frac = elapsed_fraction(frame.index)
+        if np.isnan(frac).all() or np.nanmax(frac) < COMPLETE_DAY_FRACTION:
+            continue
+        v = np.nan_to_num(frame.to_numpy(dtype=float))
+        cum = np.cumsum(v, axis=0)
+        total = cum[-1]
+        # Last bar ending at or before each grid point
+        idx = np.searchsorted(frac, grid, side='right') - 1
+        at = np.where(idx[:, None] >= 0, cum[np.clip(idx, 0, None)], 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = at / total
+        share[:, total <= 0] = np.nan
+        day_curves.append(share)
+        day_totals.append(np.where(total > 0, total, np.nan))
+    if not day_curves:
+        return empty
+
+    stack = np.stack(day_curves)                    # days x bins x tickers
+    usable = (~np.isnan(stack[:, -1, :])).sum(axis=0)
+    with np.errstate(all='ignore'):
+        median = np.nanmedian(stack, axis=0)        # bins x tickers
+        median = np.maximum.accumulate(np.nan_to_num(median), axis=0)
+        typical_vol = np.nanmedian(np.stack(day_totals), axis=0)
+
+    tickers = np.asarray(volume.columns)
+    own = usable >= MIN_PROFILE_DAYS
+    curves = {t: median[:, i] for i, t in enumerate(tickers) if own[i]}
+
+    ranked = pd.Series(typical_vol, index=tickers).rank(pct=True)
+    bucket = np.ceil(ranked.fillna(0.5).to_numpy() * LIQUIDITY_BUCKETS).clip(1, LIQUIDITY_BUCKETS).astype(int)
+    bucket_curves = {}
+    for b in range(1, LIQUIDITY_BUCKETS + 1):
+        members = own & (bucket == b)
+        if members.any():
+            bucket_curves[b] = np.median(median[:, members], axis=1)
+    market = np.median(median[:, own], axis=1) if own.any() else _LINEAR
+
+    return {
+        'date': today,
+        'curves': curves,
+        'bucket_of': dict(zip(tickers, bucket.tolist())),
+        'bucket_curves': bucket_curves,
+        'market': market,
+    }
+
+def load_profiles(tickers=None, refresh=False, path=PROFILE_CACHE):
+    """
+    Today's volume profiles: memory, then the on-disk cache, else rebuilt
+    from the 1m store (after downloading recent bars for tickers)
+
+    Curves are rebuilt at most once per session date.
+    """
+    global _profiles
+    today = session_date()
+    with _lock:
+        if not refresh and _profiles is not None and _profiles['date'] == today:
+            return _profiles
+        if not refresh and os.path.exists(path):
+            try:
+                cached = pd.read_pickle(path)
+                if cached.get('date') == today:
+                    _profiles = cached
+                    return _profiles
+            except Exception as e:
+                print(f"[WARN] Could not read {path}: {e}")
+
+        volume = load_minute_history()
+        if tickers is not None:
+            try:
+                volume = update_minute_history(tickers)
+            except Exception as e:
+                print(f"[WARN] 1m history update failed: {e}")
+        _profiles = build_profiles(volume, today)
+        try:
+            pd.to_pickle(_profiles, path)
+        except Exception as e:
+            print(f"[WARN] Could not write {path}: {e}")
+        return _profiles
+
+# ========================================
+# LIVE LOOKUP
+# ========================================
+
+def expected_share(ticker, fraction):
+    """Expected share of the day's volume traded by fraction of session time"""
+    profiles = _profiles
+    if profiles is None:
+        curve = _LINEAR
+    else:
+        curve = profiles['curves'].get(ticker)
+        if curve is None:
+            bucket = profiles['bucket_of'].get(ticker)
+            curve = profiles['bucket_curves'].get(bucket, profiles['market'])
+    return max(float(curve[_bin(fraction)]), MIN_FRACTION)
+
+def project_volume(ticker, current_vol, last_bar):
+    """
+    Full-day volume projected from volume traded up to the 1m bar starting
+    at last_bar, using the ticker's curve (linear if profiles are not loaded)
+    """
+    fraction = elapsed_fraction(pd.DatetimeIndex([last_bar]))[0]
+    if np.isnan(fraction) or fraction <= 0:
+        return float(current_vol)
+    return float(current_vol) / expected_share(ticker, fraction)
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from stock_universe import LQ45_TICKERS
+
+    tickers = sys.argv[1:] or LQ45_TICKERS
+    t0 = time.perf_counter()
+    profiles = load_profiles(tickers, refresh=True)
+    print(f"Built {len(profiles['curves'])} ticker curves in {time.perf_counter() - t0:.1f}s")
+    checkpoints = [5, 10, 25, 50, 75]
+    print("Market curve (share of volume by % of session):")
+    for p in checkpoints:
+        print(f"  {p:>3}% of session: {profiles['market'][p - 1] * 100:5.1f}% of volume")
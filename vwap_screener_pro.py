@@ -1,10 +1,14 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
-import datetime
 import os
 import time
 
+from market_utils import iter_scan, SCAN_CHUNK_SIZE
+from idx_calendar import session_date
+from data_quality import clean_bars, MIN_HEALTH
+from corporate_actions import get_bars
+from indicators import compute as compute_indicators
+
 # --- Configuration (OPTIMIZED) ---
 # Hard Filters
 MIN_PRICE = 100
@@ -36,39 +40,42 @@ def get_all_tickers():
         return ["BBCA.JK", "BBRI.JK", "BMRI.JK", "ASII.JK"]
 
 def fetch_data(ticker, period="1y"):
-    """Fetches daily data from Yahoo Finance."""
+    """Fetches daily data (split-adjusted, dividends not) from the shared bar store."""
     try:
-        df = yf.download(ticker, period=period, progress=False, auto_adjust=False)
+        df = get_bars(ticker, period=period, adjust="split")
         if df.empty: return None
         if isinstance(df.columns, pd.MultiIndex): df.columns = [c[0] for c in df.columns]
-        return df
+        df, health = clean_bars(df, ticker)
+        return df if health >= MIN_HEALTH else None
     except:
         return None
 
 # --- 2. Feature Engineering ---
 def compute_features(df):
     df = df.copy()
+    ind = compute_indicators(df, ['Value', f'VolSum{VWMA_WINDOW}', f'VWMA{VWMA_WINDOW}', 'Vol_SMA20', 'RelVol20',
+                                  'AvgValue20', 'Range', 'RangePct', 'ADR20', 'EMA20', 'EMA50'])
     
     # 1. VWMA 20
-    df['PV'] = df['Close'] * df['Volume']
-    df['VolSum20'] = df['Volume'].rolling(VWMA_WINDOW).sum()
-    df['VWMA20'] = df['PV'].rolling(VWMA_WINDOW).sum() / df['VolSum20']
+    df['PV'] = ind['Value']
+    df['VolSum20'] = ind[f'VolSum{VWMA_WINDOW}']
+    df['VWMA20'] = ind[f'VWMA{VWMA_WINDOW}']
     
     # 2. VWMA Dist %
     df['VWMA_Dist_%'] = (df['Close'] / df['VWMA20'] - 1) * 100
     
     # 3. Relative Volume (SMA20)
-    df['VolSMA20'] = df['Volume'].rolling(20).mean()
-    df['Rel_Vol'] = df['Volume'] / df['VolSMA20']
+    df['VolSMA20'] = ind['Vol_SMA20']
+    df['Rel_Vol'] = ind['RelVol20']
     
     # 4. Avg Value (Liquidity)
-    df['Value'] = df['Close'] * df['Volume']
-    df['AvgValue20D_IDR'] = df['Value'].rolling(20).mean()
+    df['Value'] = ind['Value']
+    df['AvgValue20D_IDR'] = ind['AvgValue20']
     
     # 5. ADR & Range
-    df['Range'] = df['High'] - df['Low']
-    df['DailyRangePct'] = (df['Range'] / df['Close']) * 100
-    df['ADR20_%'] = df['DailyRangePct'].rolling(20).mean()
+    df['Range'] = ind['Range']
+    df['DailyRangePct'] = ind['RangePct']
+    df['ADR20_%'] = ind['ADR20']
     
     
     # 6. Candle Metrics (FIXED: Safe division for Range=0)
@@ -80,8 +87,8 @@ def compute_features(df):
     
     
     # 7. Trend
-    df['EMA20'] = df['Close'].ewm(span=20, adjust=False).mean()
-    df['EMA50'] = df['Close'].ewm(span=50, adjust=False).mean()
+    df['EMA20'] = ind['EMA20']
+    df['EMA50'] = ind['EMA50']
     df['TrendOK'] = (df['Close'] > df['EMA20']) & (df['EMA20'] > df['EMA50'])
     
     return df
@@ -150,52 +157,60 @@ def compute_score(row, status):
     return max(0, min(100, s))
 
 # --- Main Runner ---
-def run_daily_scan():
+def analyze_ticker(t):
+    """Fetch, compute features and evaluate the latest bar for one ticker"""
+    df = fetch_data(t, period="6mo") # Live scan needs less data
+    if df is None or len(df) < MIN_HISTORY_DAYS: return None
+    
+    df = compute_features(df)
+    row = df.iloc[-1]
+    
+    dec, reason, score = evaluate_decision(row)
+    
+    return {
+        'Date': row.name.strftime("%Y-%m-%d"),
+        'Ticker': t,
+        'Close': row['Close'],
+        'VWMA20': round(row['VWMA20'], 0),
+        'VWMA_Dist_%': round(row['VWMA_Dist_%'], 2),
+        'Rel_Vol': round(row['Rel_Vol'], 2),
+        'AvgValue20D_IDR': round(row['AvgValue20D_IDR'], 0),
+        'ADR20_%': round(row['ADR20_%'], 2),
+        'CloseLocation': round(row['CloseLocation'], 2),
+        'BodyRatio': round(row['BodyRatio'], 2),
+        'TrendOK': row['TrendOK'],
+        'Decision': dec,
+        'Score': score,
+        'ReasonCodes': reason
+    }
+
+def rank_results(df_res):
+    """Sort by Decision (READY first) then Score, and add Rank_ALL / Rank_READY"""
+    df_res = df_res.copy()
+    df_res['DecPriority'] = df_res['Decision'].map({'READY': 0, 'WAIT': 1, 'AVOID': 2})
+    df_res = df_res.sort_values(by=['DecPriority', 'Score'], ascending=[True, False])
+    df_res['Rank_ALL'] = range(1, len(df_res) + 1)
+    df_res['Rank_READY'] = np.where(df_res['Decision']=='READY', df_res.groupby('Decision').cumcount() + 1, '')
+    return df_res
+
+def iter_daily_scan(chunk_size=SCAN_CHUNK_SIZE):
+    """Scan the universe, yielding partial results every chunk_size tickers"""
     print("Running VWAP Production Screener...")
     tickers = get_all_tickers()
-    results = []
+    df_res = pd.DataFrame()
     
     print(f"Scanning {len(tickers)} tickers...")
     
-    for t in tickers:
-        df = fetch_data(t, period="6mo") # Live scan needs less data
-        if df is None or len(df) < MIN_HISTORY_DAYS: continue
-        
-        df = compute_features(df)
-        row = df.iloc[-1]
-        
-        dec, reason, score = evaluate_decision(row)
-        
-        results.append({
-            'Date': row.name.strftime("%Y-%m-%d"),
-            'Ticker': t,
-            'Close': row['Close'],
-            'VWMA20': round(row['VWMA20'], 0),
-            'VWMA_Dist_%': round(row['VWMA_Dist_%'], 2),
-            'Rel_Vol': round(row['Rel_Vol'], 2),
-            'AvgValue20D_IDR': round(row['AvgValue20D_IDR'], 0),
-            'ADR20_%': round(row['ADR20_%'], 2),
-            'CloseLocation': round(row['CloseLocation'], 2),
-            'BodyRatio': round(row['BodyRatio'], 2),
-            'TrendOK': row['TrendOK'],
-            'Decision': dec,
-            'Score': score,
-            'ReasonCodes': reason
-        })
-        
-    if results:
-        df_res = pd.DataFrame(results)
+    for progress in iter_scan(tickers, analyze_ticker, chunk_size):
+        df_res = progress['results']
+        yield progress
         
+    if not df_res.empty:
         # Rank: Sort by Decision (READY first) then Score (Desc)
-        df_res['DecPriority'] = df_res['Decision'].map({'READY': 0, 'WAIT': 1, 'AVOID': 2})
-        df_res = df_res.sort_values(by=['DecPriority', 'Score'], ascending=[True, False])
-        
-        # Add Rank
-        df_res['Rank_ALL'] = range(1, len(df_res) + 1)
-        df_res['Rank_READY'] = np.where(df_res['Decision']=='READY', df_res.groupby('Decision').cumcount() + 1, '')
+        df_res = rank_results(df_res)
         
         # Save
-        today = datetime.datetime.now().strftime("%Y%m%d")
+        today = session_date().strftime("%Y%m%d")
         fname = f"{OUTPUT_DIR}/idx_vwap_daily_{today}.csv"
         df_res.to_csv(fname, index=False)
         print(f"\nSaved Daily Report to {fname}")
@@ -205,6 +220,13 @@ def run_daily_scan():
         print(df_res[df_res['Decision'] == 'READY'][['Ticker', 'Close', 'Score', 'Rel_Vol', 'ReasonCodes']].head(10))
     else:
         print("No results found.")
+    yield {"done": len(tickers), "total": len(tickers), "results": df_res, "final": True}
+
+def run_daily_scan():
+    df_res = pd.DataFrame()
+    for progress in iter_daily_scan():
+        df_res = progress['results']
+    return df_res
 
 if __name__ == "__main__":
     run_daily_scan()